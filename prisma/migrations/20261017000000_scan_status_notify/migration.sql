@@ -0,0 +1,22 @@
+-- Scan status events: NOTIFY scan_status on every status transition
+-- Consumed by scripts/scan_events.py (LISTEN) instead of per-scan status polling.
+-- Payload: {"id": "<uuid>", "status": "COMPLETED", "riskScore": 42}
+-- Delivered on COMMIT (rolled back updates send nothing).
+
+-- Step 1: Trigger function
+CREATE OR REPLACE FUNCTION "notify_scan_status"() RETURNS trigger AS $$
+BEGIN
+  PERFORM pg_notify(
+    'scan_status',
+    json_build_object('id', NEW.id, 'status', NEW.status, 'riskScore', NEW."riskScore")::text
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 2: Fire only when the status column actually changes
+CREATE TRIGGER "Scan_status_notify"
+AFTER UPDATE OF status ON "Scan"
+FOR EACH ROW
+WHEN (OLD.status IS DISTINCT FROM NEW.status)
+EXECUTE FUNCTION "notify_scan_status"();
@@ -0,0 +1,74 @@
+-- Scan status counters: per-status row counts maintained by triggers
+-- Replaces COUNT(*) over "Scan" in the orchestrators' queue status (scripts/scan_counters.py).
+-- Sharded: every transition updates slot pg_backend_pid() % 16, so concurrent
+-- workers do not serialize on one hot row lock. Read: SUM(count) GROUP BY status
+-- (at most 16 rows per status, independent of the "Scan" table size).
+
+-- Step 1: Counter table
+CREATE TABLE "ScanStatusCounter" (
+    "status" TEXT NOT NULL,
+    "slot" INTEGER NOT NULL,
+    "count" BIGINT NOT NULL DEFAULT 0,
+
+    CONSTRAINT "ScanStatusCounter_pkey" PRIMARY KEY ("status", "slot")
+);
+
+-- Step 2: Row trigger function (INSERT +1 new, DELETE -1 old, UPDATE both)
+CREATE OR REPLACE FUNCTION "scan_status_counter"() RETURNS trigger AS $$
+DECLARE
+  counter_slot INTEGER := pg_backend_pid() % 16;
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    INSERT INTO "ScanStatusCounter" ("status", "slot", "count")
+    VALUES (OLD.status, counter_slot, -1)
+    ON CONFLICT ("status", "slot") DO UPDATE SET "count" = "ScanStatusCounter"."count" - 1;
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO "ScanStatusCounter" ("status", "slot", "count")
+    VALUES (NEW.status, counter_slot, 1)
+    ON CONFLICT ("status", "slot") DO UPDATE SET "count" = "ScanStatusCounter"."count" + 1;
+  END IF;
+
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 3: Triggers (UPDATE only when the status actually changes)
+CREATE TRIGGER "Scan_status_counter_insert_delete"
+AFTER INSERT OR DELETE ON "Scan"
+FOR EACH ROW
+EXECUTE FUNCTION "scan_status_counter"();
+
+CREATE TRIGGER "Scan_status_counter_update"
+AFTER UPDATE OF status ON "Scan"
+FOR EACH ROW
+WHEN (OLD.status IS DISTINCT FROM NEW.status)
+EXECUTE FUNCTION "scan_status_counter"();
+
+-- Step 4: TRUNCATE "Scan" → empty counters
+CREATE OR REPLACE FUNCTION "scan_status_counter_truncate"() RETURNS trigger AS $$
+BEGIN
+  DELETE FROM "ScanStatusCounter";
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER "Scan_status_counter_truncate"
+AFTER TRUNCATE ON "Scan"
+FOR EACH STATEMENT
+EXECUTE FUNCTION "scan_status_counter_truncate"();
+
+-- Step 5: Rebuild (backfill + drift repair): blocks "Scan" writes while recounting,
+-- then folds everything into slot 0
+CREATE OR REPLACE FUNCTION "rebuild_scan_status_counter"() RETURNS void AS $$
+BEGIN
+  LOCK TABLE "Scan" IN SHARE ROW EXCLUSIVE MODE;
+  DELETE FROM "ScanStatusCounter";
+  INSERT INTO "ScanStatusCounter" ("status", "slot", "count")
+  SELECT status, 0, COUNT(*) FROM "Scan" GROUP BY status;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Step 6: Backfill existing scans
+SELECT "rebuild_scan_status_counter"();
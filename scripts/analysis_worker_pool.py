@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Persistent TypeScript Analysis Worker Pool
+==========================================
+
+A process_scan_full() (turbo) és a call_worker() (speed) eddig MINDEN
+scanhez új `npx tsx src/worker/index*.ts --scan-id ... --url ...`
+processt indított → npx feloldás + tsx transpile + 40+ analyzer modul
+betöltése + új Prisma kapcsolat, scanenként másodpercek.
+
+Helyette N hosszan élő worker (`... --serve`, src/worker/serve.ts):
+
+1. Protokoll: soronként egy JSON frame stdin / stdout-on
+   ({"id", "scanId", "url", "crawlResult"?} → {"id", "ok", "error",
+   "durationMs", "rssMb"}), a worker console kimenete stderr-re megy
+   (utolsó sorai a hibaüzenetben)
+2. Hand-off: a Python crawl eredménye (HTML-lel együtt) a frame-ben megy
+   át a workerhez - nincs Scan.metadata UPDATE + visszaolvasás, a DB csak
+   a végeredményt látja
+3. Egy worker egyszerre egy scant kap (szabad workerek sora)
+4. Worker csere: crash (EOF / exit), timeout vagy a hívó cancel-je
+   (process group kill - egy félbehagyott scan nem futhat tovább, és a
+   következő scan nem várhat mögötte), RSS > WORKER_RSS_LIMIT_MB, vagy
+   WORKER_MAX_SCANS scan után
+5. A csere lusta: az új worker a következő kiosztáskor indul el
+
+Usage:
+    from analysis_worker_pool import AnalysisWorkerPool
+
+    pool = AnalysisWorkerPool(size=4, cwd=PROJECT_DIR)
+    await pool.start()
+    result = await pool.analyze(scan_id, url, timeout=110)   # {"ok", "error", ...}
+    result = await pool.analyze(scan_id, url, timeout=110, crawl_result=crawl_result)
+    await pool.close()
+"""
+
+import asyncio
+import json
+import os
+import signal
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+WORKER_COMMAND = ["npx", "tsx"]
+WORKER_SCRIPT = "src/worker/index.ts"
+ANALYSIS_WORKERS = max(2, (os.cpu_count() or 4) // 2)  # Node analysis is single-threaded per worker
+WORKER_START_TIMEOUT = 60        # Seconds until the "ready" frame (tsx transpiles every analyzer once)
+WORKER_RSS_LIMIT_MB = 1536       # Reported RSS above this → recycle after the scan
+WORKER_MAX_SCANS = 500           # Scans per worker before a fresh process
+WORKER_STOP_TIMEOUT = 5          # Seconds for a graceful exit (stdin closed)
+STDERR_TAIL_LINES = 40
+FRAME_LIMIT = 1024 * 1024        # Longest stdout line accepted (pre-ready console output)
+
+
+class WorkerCrashed(Exception):
+    """The worker process exited / closed stdout with a scan in flight"""
+
+
+# ════════════════════════════════════════════════════════════════════
+# ONE WORKER PROCESS
+# ════════════════════════════════════════════════════════════════════
+
+class AnalysisWorker:
+    """A long-lived `npx tsx <script> --serve` process (one scan in flight)"""
+
+    def __init__(self, index: int, script: str, cwd: Optional[str], command: List[str]):
+        self.index = index
+        self.script = script
+        self.cwd = cwd
+        self.command = command
+
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.reader_task = None
+        self.stderr_task = None
+        self.ready: Optional[asyncio.Future] = None
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+        self.next_id = 0
+        self.scans = 0
+        self.last_rss_mb = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self) -> float:
+        """Spawn and wait for the ready frame → startup ms"""
+        started = time.perf_counter()
+        self.ready = asyncio.get_running_loop().create_future()
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command, self.script, "--serve",
+            cwd=self.cwd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=FRAME_LIMIT,
+            start_new_session=True,  # npx → tsx → node: killed together (process group)
+        )
+        self.reader_task = asyncio.create_task(self._read_frames())
+        self.stderr_task = asyncio.create_task(self._drain_stderr())
+
+        try:
+            frame = await asyncio.wait_for(asyncio.shield(self.ready), WORKER_START_TIMEOUT)
+        except (asyncio.TimeoutError, WorkerCrashed):
+            await self.stop(kill=True)
+            raise
+        self.last_rss_mb = frame.get("rssMb", 0)
+        return (time.perf_counter() - started) * 1000
+
+    async def _read_frames(self):
+        try:
+            while True:
+                line = await self.process.stdout.readline()
+                if not line:
+                    break
+                try:
+                    frame = json.loads(line)
+                except ValueError:
+                    continue  # Console output before serve mode took over stdout
+                if not isinstance(frame, dict):
+                    continue
+                if frame.get("type") == "ready" and not self.ready.done():
+                    self.ready.set_result(frame)
+                elif frame.get("id") in self.pending:
+                    future = self.pending.pop(frame["id"])
+                    if not future.done():
+                        future.set_result(frame)
+        except (asyncio.LimitOverrunError, ValueError):
+            pass  # Oversized line - treat like a broken worker
+        finally:
+            returncode = await self._wait_exit()
+            error = WorkerCrashed(f"worker exited ({returncode}): " + " | ".join(list(self.stderr_tail)[-3:]))
+            if not self.ready.done():
+                self.ready.set_exception(error)
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.pending.clear()
+
+    async def _wait_exit(self):
+        try:
+            return await asyncio.wait_for(self.process.wait(), WORKER_STOP_TIMEOUT)
+        except asyncio.TimeoutError:
+            return None  # stdout closed, process still around → stop() kills it
+
+    async def _drain_stderr(self):
+        """Keep the pipe flowing (a full stderr pipe blocks the worker) + a short tail"""
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                return
+            self.stderr_tail.append(line.decode("utf-8", "replace").rstrip()[:300])
+
+    async def analyze(self, scan_id: str, url: str, timeout: float,
+                      crawl_result: Optional[Dict] = None) -> Dict:
+        """Send one scan, wait for its frame (TimeoutError / WorkerCrashed propagate)"""
+        self.next_id += 1
+        request_id = f"{self.index}-{self.next_id}"
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+
+        request = {"id": request_id, "scanId": scan_id, "url": url}
+        if crawl_result is not None:
+            request["crawlResult"] = crawl_result  # Hand-off: the worker skips the DB read + crawl
+        try:
+            self.process.stdin.write((json.dumps(request) + "\n").encode())
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError) as e:
+            self.pending.pop(request_id, None)
+            raise WorkerCrashed(f"worker stdin closed: {e}")
+
+        try:
+            frame = await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(request_id, None)
+        self.scans += 1
+        self.last_rss_mb = frame.get("rssMb", self.last_rss_mb)
+        return frame
+
+    async def stop(self, kill: bool = False):
+        """Close stdin (graceful: finish + exit), or kill the whole process group"""
+        if self.process is None:
+            return
+        if self.alive and not kill:
+            try:
+                self.process.stdin.close()
+                await asyncio.wait_for(self.process.wait(), WORKER_STOP_TIMEOUT)
+            except (asyncio.TimeoutError, BrokenPipeError, ConnectionResetError):
+                kill = True
+        if kill:
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            await self.process.wait()
+
+        if self.ready is not None and not self.ready.done():
+            self.ready.cancel()
+        for task in (self.reader_task, self.stderr_task):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(*(task for task in (self.reader_task, self.stderr_task) if task),
+                             return_exceptions=True)
+        self.process = None
+
+
+# ════════════════════════════════════════════════════════════════════
+# WORKER POOL (dispatch + recycling + stats)
+# ════════════════════════════════════════════════════════════════════
+
+class AnalysisWorkerPool:
+    """N persistent analysis workers; analyze() = one frame to a free worker"""
+
+    def __init__(self, size: int = ANALYSIS_WORKERS, script: str = WORKER_SCRIPT,
+                 cwd: Optional[str] = None, rss_limit_mb: float = WORKER_RSS_LIMIT_MB,
+                 max_scans: int = WORKER_MAX_SCANS, command: List[str] = None):
+        self.size = max(1, size)
+        self.script = script
+        self.cwd = cwd
+        self.rss_limit_mb = rss_limit_mb
+        self.max_scans = max_scans
+        self.command = list(command or WORKER_COMMAND)
+
+        self.idle: asyncio.Queue = asyncio.Queue()
+        self.workers: List[AnalysisWorker] = []
+        self.stopping = set()  # Background stop() of retired workers
+        self.stats = {
+            "scans": 0,
+            "ok": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "starts": 0,
+            "start_failures": 0,
+            "start_ms_total": 0.0,
+            "analysis_ms_total": 0.0,
+            "wait_ms_total": 0.0,
+            "recycled": {"crash": 0, "timeout": 0, "cancelled": 0, "memory": 0, "scans": 0},
+        }
+
+    async def start(self):
+        """Spawn every worker up front (startup cost paid once, in parallel)"""
+        self.workers = [AnalysisWorker(index, self.script, self.cwd, self.command)
+                        for index in range(self.size)]
+        await asyncio.gather(*(self._ensure_started(worker) for worker in self.workers),
+                             return_exceptions=True)
+        for worker in self.workers:
+            self.idle.put_nowait(worker)
+        return sum(1 for worker in self.workers if worker.alive)
+
+    async def _ensure_started(self, worker: AnalysisWorker):
+        if worker.alive:
+            return
+        try:
+            start_ms = await worker.start()
+        except Exception:
+            self.stats["start_failures"] += 1
+            raise
+        self.stats["starts"] += 1
+        self.stats["start_ms_total"] += start_ms
+
+    async def analyze(self, scan_id: str, url: str, timeout: float,
+                      crawl_result: Optional[Dict] = None) -> Dict:
+        """
+        Run one scan's analysis on a free worker (crawl_result: handed over in the frame)
+
+        Returns: {"ok", "error", "durationMs", "waitMs", "rssMb",
+                  "timeout": bool, "crashed": bool}
+        """
+        wait_started = time.perf_counter()
+        worker = await self.idle.get()
+        wait_ms = (time.perf_counter() - wait_started) * 1000
+        self.stats["scans"] += 1
+        self.stats["wait_ms_total"] += wait_ms
+
+        retire = "cancelled"  # Until the scan is settled: a cancel mid-start / mid-scan kills the worker
+        try:
+            try:
+                await self._ensure_started(worker)
+            except Exception as e:
+                retire = None  # start() already killed it, the next analyze() retries
+                self.stats["failed"] += 1
+                return {"ok": False, "error": f"worker start failed: {e}", "waitMs": wait_ms,
+                        "timeout": False, "crashed": True}
+
+            started = time.perf_counter()
+            try:
+                frame = await worker.analyze(scan_id, url, timeout, crawl_result)
+                result = {"ok": bool(frame.get("ok")), "error": frame.get("error"),
+                          "durationMs": frame.get("durationMs"), "rssMb": frame.get("rssMb"),
+                          "timeout": False, "crashed": False}
+                retire = None
+                if worker.last_rss_mb > self.rss_limit_mb:
+                    retire = "memory"
+                elif worker.scans >= self.max_scans:
+                    retire = "scans"
+            except asyncio.TimeoutError:
+                result = {"ok": False, "error": f"analysis timeout after {timeout:.0f}s",
+                          "timeout": True, "crashed": False}
+                retire = "timeout"
+                self.stats["timeouts"] += 1
+            except WorkerCrashed as e:
+                result = {"ok": False, "error": str(e), "timeout": False, "crashed": True}
+                retire = "crash"
+
+            self.stats["analysis_ms_total"] += (time.perf_counter() - started) * 1000
+            self.stats["ok" if result["ok"] else "failed"] += 1
+            result["waitMs"] = round(wait_ms, 1)
+            return result
+
+        finally:
+            # No await here: a cancelled caller must not lose the worker slot
+            if retire:
+                self.stats["recycled"][retire] += 1
+                worker = self._replace(worker, kill=retire in ("timeout", "crash", "cancelled"))
+            self.idle.put_nowait(worker)
+
+    def _replace(self, worker: AnalysisWorker, kill: bool) -> AnalysisWorker:
+        """Stop a worker in the background; its replacement starts lazily on the next analyze()"""
+        task = asyncio.ensure_future(worker.stop(kill=kill))
+        self.stopping.add(task)
+        task.add_done_callback(self.stopping.discard)
+        replacement = AnalysisWorker(worker.index, self.script, self.cwd, self.command)
+        self.workers[worker.index] = replacement
+        return replacement
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats, recycled=dict(self.stats["recycled"]))
+        scans = stats["scans"] or 1
+        stats["analysis_ms_avg"] = round(stats.pop("analysis_ms_total") / scans, 1)
+        stats["wait_ms_avg"] = round(stats.pop("wait_ms_total") / scans, 1)
+        stats["start_ms_avg"] = round(stats.pop("start_ms_total") / (stats["starts"] or 1), 1)
+        stats["alive"] = sum(1 for worker in self.workers if worker.alive)
+        stats["size"] = self.size
+        stats["rss_mb"] = sum(worker.last_rss_mb for worker in self.workers if worker.alive)
+        return stats
+
+    def summary_line(self) -> str:
+        stats = self.get_stats()
+        recycled = stats["recycled"]
+        return (f"{stats['alive']}/{stats['size']} workers ({stats['rss_mb']}MB) | "
+                f"{stats['ok']} ok / {stats['failed']} failed | avg {stats['analysis_ms_avg']:.0f}ms, "
+                f"wait {stats['wait_ms_avg']:.0f}ms | start {stats['start_ms_avg']:.0f}ms × {stats['starts']} | "
+                f"recycled: crash {recycled['crash']}, timeout {recycled['timeout']}, "
+                f"cancelled {recycled['cancelled']}, memory {recycled['memory']}, scans {recycled['scans']}")
+
+    async def close(self):
+        await asyncio.gather(*(worker.stop() for worker in self.workers), *self.stopping,
+                             return_exceptions=True)
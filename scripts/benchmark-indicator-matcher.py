@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+needs_browser Indicator Matcher Benchmark
+=========================================
+
+Összehasonlítja a régi (indikátoronként html.lower()) detektáló ciklust
+az új, egy menetes IndicatorMatcher-rel (curl_cffi_fetch.py).
+
+Először ellenőrzi, hogy a két implementáció ugyanazt a
+(needs_browser, detection_reason) eredményt adja, utána méri a sebességet.
+
+Usage:
+    python3 benchmark-indicator-matcher.py [page.html ...]
+
+Fájl nélkül szintetikus oldalakat használ (50 KB, 500 KB, 2 MB).
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from curl_cffi_fetch import (  # noqa: E402
+    CLOUDFLARE_INDICATORS,
+    JS_REQUIRED_INDICATORS,
+    classify_html,
+)
+
+# Colors
+class Colors:
+    RESET = '\033[0m'
+    BOLD = '\033[1m'
+    RED = '\033[91m'
+    GREEN = '\033[92m'
+    YELLOW = '\033[93m'
+    CYAN = '\033[96m'
+    MAGENTA = '\033[95m'
+
+
+def classify_html_legacy(html: str) -> tuple:
+    """The original detection block of fetch_with_curl_cffi() (for comparison)"""
+    needs_browser = False
+    detection_reason = None
+
+    for indicator in CLOUDFLARE_INDICATORS:
+        if indicator.lower() in html.lower():
+            needs_browser = True
+            detection_reason = f"Cloudflare challenge detected: {indicator}"
+            break
+
+    if not needs_browser:
+        for indicator in JS_REQUIRED_INDICATORS:
+            if indicator.lower() in html.lower():
+                needs_browser = True
+                detection_reason = f"JavaScript required: {indicator}"
+                break
+
+    if not needs_browser:
+        clean_html = html.strip()
+        if len(clean_html) < 500:
+            needs_browser = True
+            detection_reason = f"Minimal HTML ({len(clean_html)} chars) - likely SPA"
+        elif "<body></body>" in clean_html.replace(" ", "").replace("\n", ""):
+            needs_browser = True
+            detection_reason = "Empty body tag - likely SPA"
+        elif '<div id="root"></div>' in clean_html or '<div id="app"></div>' in clean_html:
+            if clean_html.count("<div") < 5:
+                needs_browser = True
+                detection_reason = "SPA root div detected with minimal content"
+
+    return needs_browser, detection_reason
+
+
+def synthetic_page(size: int, marker: str = "") -> str:
+    """Plain content page of ~size bytes (marker appended near the end)"""
+    block = '<div class="item"><p>Lorem ipsum dolor sit amet, consectetur adipiscing elit.</p></div>\n'
+    body = block * (size // len(block) + 1)
+    return f"<!DOCTYPE html><html><head><title>Test</title></head><body>{body[:size]}{marker}</body></html>"
+
+
+def sample_pages() -> list:
+    """(name, html) pairs - every branch of the classifier is covered"""
+    return [
+        ("50KB clean", synthetic_page(50_000)),
+        ("500KB clean", synthetic_page(500_000)),
+        ("2MB clean", synthetic_page(2_000_000)),
+        ("2MB noscript at end", synthetic_page(2_000_000, "<NOSCRIPT>enable js</NOSCRIPT>")),
+        ("2MB cloudflare + js", synthetic_page(2_000_000, "please enable javascript _cf_chl_opt")),
+        ("challenge page", "<html><title>Just a moment...</title>" + "x" * 2000 + "</html>"),
+        ("minimal SPA", '<html><body><div id="root"></div></body></html>'),
+        ("empty body", "<html><head>" + "<meta>" * 200 + "</head><body> \n </body></html>"),
+        ("root div", "<html><head>" + "<meta>" * 200 + '</head><body><div id="app"></div></body></html>'),
+    ]
+
+
+def bench(func, html: str, rounds: int) -> float:
+    """Average ms per call"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(html)
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = []
+        for path in sys.argv[1:]:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((os.path.basename(path), f.read()))
+    else:
+        pages = sample_pages()
+
+    print(f"\n{Colors.CYAN}{'='*80}{Colors.RESET}")
+    print(f"{Colors.BOLD}{Colors.MAGENTA}{'🔬 needs_browser MATCHER BENCHMARK':^80}{Colors.RESET}")
+    print(f"{Colors.CYAN}{'='*80}{Colors.RESET}\n")
+
+    mismatches = 0
+    print(f"{'Page':<24} {'Size':>10} {'Legacy ms':>11} {'Matcher ms':>11} {'Speedup':>9}  Result")
+    print(f"{'─'*80}")
+
+    for name, html in pages:
+        legacy = classify_html_legacy(html)
+        current = classify_html(html)
+        if legacy != current:
+            mismatches += 1
+
+        rounds = max(3, min(200, 20_000_000 // max(len(html), 1)))
+        legacy_ms = bench(classify_html_legacy, html, rounds)
+        current_ms = bench(classify_html, html, rounds)
+        speedup = legacy_ms / current_ms if current_ms > 0 else 0
+
+        status = f"{Colors.GREEN}✓{Colors.RESET}" if legacy == current else f"{Colors.RED}✗ {legacy} != {current}{Colors.RESET}"
+        print(f"{name[:24]:<24} {len(html):>10,} {legacy_ms:>11.3f} {current_ms:>11.3f} {speedup:>8.1f}x  {status}")
+
+    print(f"{'─'*80}")
+    if mismatches:
+        print(f"{Colors.RED}✗ {mismatches} classification mismatch(es)!{Colors.RESET}")
+        sys.exit(1)
+    print(f"{Colors.GREEN}✓ Identical classification on all {len(pages)} pages{Colors.RESET}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Compiled Context-Level Blocklist Routing (Playwright)
+=====================================================
+
+Eddig a resource blocking egy page.route('**/*', block_resources) Python
+handler volt → MINDEN subrequest átment a Playwright IPC-n Pythonba,
+csak hogy eldőljön: abort vagy continue_.
+
+Helyette contextenként EGYSZER telepített, előre fordított szabályok:
+
+1. Ad / tracker / analytics hostok - suffix trie (címkénként, fordítva),
+   a trie-ből faktorizált regex → a Playwright driver illeszti (nem Python)
+2. Statikus resource kiterjesztések (képek, fontok, media, CSS) - regex
+3. Opcionális resource type fallback ('**/*' Python handler) - csak ha
+   a kiterjesztés nélküli képeket is blokkolni kell (RESOURCE_TYPE_FALLBACK)
+
+Regex route → a nem illeszkedő (engedett) kérések el sem érik Pythont;
+a handler csak a blokkolt kéréseket abortálja ('blockedbyclient').
+Document kérés (pl. maga a szkennelt hotjar.com) soha nincs blokkolva.
+
+Per-scan blocked / allowed: NetworkCapture.summary() (net::ERR_BLOCKED_BY_CLIENT).
+
+Usage:
+    from blocklist import BlocklistRouter
+
+    router = BlocklistRouter()
+    await router.install(context)        # context létrehozásakor, egyszer
+    router.get_stats()                   # {"blocked": n, "by_rule": {...}, ...}
+"""
+
+import re
+from typing import Dict, Iterable, Optional
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+BLOCKED_RESOURCE_TYPES = {'image', 'media', 'font', 'stylesheet', 'websocket'}
+RESOURCE_TYPE_FALLBACK = False   # True → '**/*' Python handler again (per-request IPC!)
+ABORT_ERROR_CODE = "blockedbyclient"
+
+# Extensions of the blocked resource types (matched on the URL path)
+BLOCKED_EXTENSIONS = [
+    "png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp", "tif", "tiff",
+    "woff", "woff2", "ttf", "otf", "eot",
+    "mp4", "webm", "ogg", "ogv", "mp3", "wav", "m4a", "m4v", "mov", "flac",
+    "css",
+]
+
+# Ad / tracker / analytics hosts (suffix match: the host and all its subdomains).
+# NOT listed: tag managers (googletagmanager.com, tealium) - they inject AI chat widgets.
+BLOCKED_HOSTS = {
+    "ads": [
+        "doubleclick.net", "googlesyndication.com", "googleadservices.com",
+        "adservice.google.com", "2mdn.net", "adnxs.com", "adsrvr.org",
+        "amazon-adsystem.com", "criteo.com", "criteo.net", "taboola.com",
+        "outbrain.com", "pubmatic.com", "rubiconproject.com", "openx.net",
+        "casalemedia.com", "moatads.com", "advertising.com", "adform.net",
+        "smartadserver.com", "yieldmo.com", "sharethrough.com", "teads.tv",
+        "media.net", "33across.com", "bidswitch.net", "contextweb.com",
+        "indexww.com", "lijit.com", "sovrn.com", "adroll.com", "quantserve.com",
+        "serving-sys.com", "zemanta.com", "revcontent.com", "mgid.com",
+        "propellerads.com", "popads.net", "exoclick.com", "gemini.yahoo.com",
+        "ads.linkedin.com", "ads-twitter.com", "ads.pinterest.com",
+        "adsafeprotected.com", "doubleverify.com", "innovid.com", "spotxchange.com",
+        "stackadapt.com", "tapad.com", "bidr.io", "gumgum.com", "triplelift.com",
+    ],
+    "analytics": [
+        "google-analytics.com", "analytics.google.com", "stats.g.doubleclick.net",
+        "hotjar.com", "hotjar.io", "mixpanel.com", "segment.io", "segment.com",
+        "amplitude.com", "heap.io", "heapanalytics.com", "fullstory.com",
+        "mouseflow.com", "crazyegg.com", "luckyorange.com", "luckyorange.net",
+        "clarity.ms", "newrelic.com", "nr-data.net", "quantcount.com",
+        "chartbeat.com", "chartbeat.net", "parsely.com", "kissmetrics.com",
+        "matomo.cloud", "statcounter.com", "woopra.com", "smartlook.com",
+        "inspectlet.com", "logrocket.com", "lr-ingest.io", "mc.yandex.ru",
+        "metrika.yandex.ru", "cloudflareinsights.com", "plausible.io",
+        "pendo.io", "contentsquare.net", "decibelinsight.net", "glassboxdigital.io",
+        "sentry-cdn.com", "browser-intake-datadoghq.com", "bugsnag.com",
+    ],
+    "trackers": [
+        "facebook.net", "connect.facebook.net", "pixel.facebook.com",
+        "analytics.tiktok.com", "snap.licdn.com", "px.ads.linkedin.com",
+        "bat.bing.com", "ct.pinterest.com", "analytics.twitter.com",
+        "static.ads-twitter.com", "sc-static.net", "tr.snapchat.com",
+        "scorecardresearch.com", "krxd.net", "bluekai.com", "demdex.net",
+        "omtrdc.net", "everesttech.net", "rlcdn.com", "agkn.com",
+        "mathtag.com", "exelator.com", "eyeota.net", "crwdcntrl.net",
+        "adsymptotic.com", "id5-sync.com", "liadm.com", "pippio.com",
+        "addthis.com", "sharethis.com", "onesignal.com", "pushcrew.com",
+        "clickcease.com", "hs-analytics.net", "hsadspixel.net",
+        "bounceexchange.com", "wunderkind.co", "optimizely.com", "vwo.com",
+        "visualwebsiteoptimizer.com", "abtasty.com", "kameleoon.eu",
+    ],
+}
+
+
+# ════════════════════════════════════════════════════════════════════
+# HOST SUFFIX TRIE
+# ════════════════════════════════════════════════════════════════════
+
+class HostSuffixTrie:
+    """
+    Suffix trie over reversed host labels (com → doubleclick → ...)
+
+    A terminal node blocks its whole subtree (the host + every subdomain),
+    so longer entries under it are dropped when the trie is built.
+    """
+
+    def __init__(self, hosts: Iterable[str] = ()):
+        self.root: Dict = {}
+        self.size = 0
+        for host in hosts:
+            self.add(host)
+
+    @staticmethod
+    def _labels(host: str):
+        return reversed(host.lower().strip(".").split("."))
+
+    def add(self, host: str):
+        node = self.root
+        for label in self._labels(host):
+            if node.get(True):
+                return  # A shorter suffix already blocks this host
+            node = node.setdefault(label, {})
+        if not node.get(True):
+            node.clear()  # Subdomain entries are now redundant
+            node[True] = True
+            self.size += 1
+
+    def match(self, host: str) -> Optional[str]:
+        """Blocked suffix of the host (None → not listed)"""
+        node = self.root
+        matched = []
+        for label in self._labels(host):
+            node = node.get(label)
+            if node is None:
+                return None
+            matched.append(label)
+            if node.get(True):
+                return ".".join(reversed(matched))
+        return None
+
+    def to_regex(self) -> str:
+        """Host suffix alternation factored along the trie (JS-compatible syntax)"""
+        def expression(node: Dict, label: str) -> str:
+            if node.get(True):
+                return re.escape(label)
+            children = [expression(child, child_label)
+                        for child_label, child in sorted(node.items(), key=lambda item: item[0])]
+            return f"(?:{'|'.join(children)})\\.{re.escape(label)}"
+
+        alternatives = [expression(child, label) for label, child in sorted(self.root.items())]
+        return f"(?:{'|'.join(alternatives)})" if alternatives else "(?!)"
+
+
+def compile_host_pattern(trie: HostSuffixTrie):
+    """URL regex: scheme://[userinfo@][sub.]<listed host>[:port](/|?|#|end)"""
+    return re.compile(
+        r"^[a-z][a-z0-9+.-]*://(?:[^/?#@]*@)?(?:[^/?#:@]*\.)?"
+        + trie.to_regex()
+        + r"(?::\d+)?(?:[/?#]|$)",
+        re.IGNORECASE,
+    )
+
+
+def compile_extension_pattern(extensions: Iterable[str]):
+    """URL regex: path ending in one of the extensions (query / fragment allowed)"""
+    alternatives = "|".join(sorted(re.escape(extension) for extension in extensions))
+    return re.compile(rf"^[^?#]*\.(?:{alternatives})(?:[?#]|$)", re.IGNORECASE)
+
+
+# ════════════════════════════════════════════════════════════════════
+# BLOCKLIST ROUTER (installed once per browser context)
+# ════════════════════════════════════════════════════════════════════
+
+class BlocklistRouter:
+    """Compiled host / extension / resource type rules as context routes"""
+
+    def __init__(self, hosts: Optional[Dict[str, list]] = None,
+                 extensions: Iterable[str] = BLOCKED_EXTENSIONS,
+                 resource_types: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+                 resource_type_fallback: bool = RESOURCE_TYPE_FALLBACK):
+        hosts = BLOCKED_HOSTS if hosts is None else hosts
+        self.trie = HostSuffixTrie(host for group in hosts.values() for host in group)
+        self.categories = {host.lower(): category
+                           for category, group in hosts.items() for host in group}
+        self.host_pattern = compile_host_pattern(self.trie)
+        self.extension_pattern = compile_extension_pattern(extensions)
+        self.resource_types = set(resource_types)
+        self.resource_type_fallback = resource_type_fallback
+
+        self.stats = {
+            "contexts": 0,
+            "blocked": 0,
+            "by_rule": {"host": 0, "extension": 0, "type": 0},
+            "by_category": {category: 0 for category in hosts},
+            "fallback_allowed": 0,  # Requests that crossed IPC and were continued
+            "documents_allowed": 0,  # Listed host / extension, but a document
+        }
+
+    def category_of(self, url: str) -> Optional[str]:
+        """ads / analytics / trackers category of a URL (None → not a listed host)"""
+        match = re.match(r"^[a-z][a-z0-9+.-]*://(?:[^/?#@]*@)?([^/?#:]*)", url, re.IGNORECASE)
+        suffix = self.trie.match(match.group(1)) if match else None
+        return self.categories.get(suffix) if suffix else None
+
+    def is_blocked(self, url: str, resource_type: str = "") -> Optional[str]:
+        """Rule that blocks the request (host / extension / type), or None"""
+        if self.host_pattern.match(url):
+            return "host"
+        if self.extension_pattern.match(url):
+            return "extension"
+        if self.resource_type_fallback and resource_type in self.resource_types:
+            return "type"
+        return None
+
+    async def install(self, context):
+        """
+        Register the routes on a context (later routes take precedence:
+        host → extension → optional resource type fallback)
+        """
+        if self.resource_type_fallback:
+            await context.route("**/*", self._by_resource_type)
+        await context.route(self.extension_pattern, self._abort_extension)
+        await context.route(self.host_pattern, self._abort_host)
+        self.stats["contexts"] += 1
+
+    async def _abort(self, route, rule: str, category: Optional[str] = None):
+        if route.request.resource_type == "document":
+            # The scanned site itself (e.g. hotjar.com) or an iframe document → never blocked
+            self.stats["documents_allowed"] += 1
+            try:
+                await route.continue_()
+            except Exception:
+                pass
+            return
+
+        self.stats["blocked"] += 1
+        self.stats["by_rule"][rule] += 1
+        if category:
+            self.stats["by_category"][category] += 1
+        try:
+            await route.abort(ABORT_ERROR_CODE)
+        except Exception:
+            pass  # Page closed / request already handled
+
+    async def _abort_host(self, route):
+        await self._abort(route, "host", self.category_of(route.request.url))
+
+    async def _abort_extension(self, route):
+        await self._abort(route, "extension")
+
+    async def _by_resource_type(self, route):
+        if route.request.resource_type in self.resource_types:
+            await self._abort(route, "type")
+            return
+        self.stats["fallback_allowed"] += 1
+        try:
+            await route.continue_()
+        except Exception:
+            pass
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["hosts"] = self.trie.size
+        return stats
+
+    def summary_line(self) -> str:
+        by_rule = self.stats["by_rule"]
+        by_category = ", ".join(f"{category}: {count}"
+                                for category, count in sorted(self.stats["by_category"].items()))
+        return (f"{self.stats['blocked']} blocked (host {by_rule['host']}, "
+                f"extension {by_rule['extension']}, type {by_rule['type']}) | {by_category}")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+RSS-Aware Browser / Context Recycling (Chromium)
+================================================
+
+A context poolok eddig CSAK darabszám alapján cseréltek contextet
+(CONTEXT_REUSE_LIMIT, ill. egy beégetett 50) - a memóriát soha nem nézték.
+Hosszú (224k domain) futásoknál a Chromium felhízik → lassul, swapol,
+végül OOM.
+
+Ez a modul:
+
+1. Mintavételezi a Chromium process fa RSS-ét (psutil, a saját child
+   processeink közül: browser / renderer / gpu / utility --type szerint)
+2. Renderer RSS > RENDERER_RSS_LIMIT_MB → a legtöbbet használt contextek
+   nyugdíjba (RETIRE_BATCH / minta; a renderereik velük együtt zárnak be)
+3. Teljes fa RSS > BROWSER_RSS_LIMIT_MB, vagy a browser lecsatlakozott
+   (crash) → az egész browser újraindítása (a pool drain-eli)
+4. Crash-elt page → a contextje is nyugdíjba (nem csak a page)
+5. Pool health metrikák (RSS, nyugdíjazások oka, restartok) a status
+   képernyőknek / shard status üzeneteknek
+
+Megjegyzés: RSS összeg → a megosztott lapok processenként számolódnak,
+tehát felső becslés (USS mérés túl drága minden mintánál).
+
+Usage:
+    from browser_recycler import BrowserRecycler
+
+    recycler = BrowserRecycler(reuse_limit=CONTEXT_REUSE_LIMIT)
+    recycler.maybe_sample(context_usage)             # acquire-kor (időzített)
+    reason = recycler.retire_reason(context, uses, crashed)   # usage / memory / crash
+    if recycler.restart_pending: ...                 # pool: drain + új browser
+    recycler.health()                                # metrikák
+"""
+
+import os
+import time
+from typing import Dict, List, Optional
+
+import psutil
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+RSS_SAMPLE_INTERVAL = 15         # seconds between process tree samples
+RENDERER_RSS_LIMIT_MB = 4096     # All renderers together → retire the busiest contexts
+BROWSER_RSS_LIMIT_MB = 8192      # Whole Chromium tree → restart the browser
+RETIRE_BATCH = 2                 # Contexts retired per over-limit sample
+CHROMIUM_PROCESS_NAMES = ("chrome", "chromium", "headless_shell")
+
+MB = 1024 * 1024
+
+
+# ════════════════════════════════════════════════════════════════════
+# CHROMIUM MEMORY SAMPLER
+# ════════════════════════════════════════════════════════════════════
+
+def chromium_processes(root_pid: int = None) -> List[psutil.Process]:
+    """Chromium processes below this Python process (driver → browser → renderers)"""
+    try:
+        children = psutil.Process(root_pid or os.getpid()).children(recursive=True)
+    except psutil.Error:
+        return []
+    return [process for process in children
+            if any(name in _process_name(process) for name in CHROMIUM_PROCESS_NAMES)]
+
+
+def _process_name(process: psutil.Process) -> str:
+    try:
+        return process.name().lower()
+    except psutil.Error:
+        return ""
+
+
+def process_type(process: psutil.Process) -> str:
+    """browser / renderer / gpu-process / utility / ... (Chromium --type flag)"""
+    try:
+        for arg in process.cmdline():
+            if arg.startswith("--type="):
+                return arg.split("=", 1)[1]
+    except psutil.Error:
+        pass
+    return "browser"
+
+
+def sample_chromium_memory(root_pid: int = None) -> Dict:
+    """
+    RSS of our Chromium process tree (MB)
+
+    Returns: {"browser_mb", "renderer_mb", "renderer_max_mb", "renderers",
+              "other_mb", "total_mb", "processes"}
+    """
+    sample = {"browser_mb": 0.0, "renderer_mb": 0.0, "renderer_max_mb": 0.0,
+              "renderers": 0, "other_mb": 0.0, "total_mb": 0.0, "processes": 0}
+
+    for process in chromium_processes(root_pid):
+        try:
+            rss_mb = process.memory_info().rss / MB
+        except psutil.Error:
+            continue  # Exited between listing and sampling
+
+        kind = process_type(process)
+        if kind == "renderer":
+            sample["renderer_mb"] += rss_mb
+            sample["renderer_max_mb"] = max(sample["renderer_max_mb"], rss_mb)
+            sample["renderers"] += 1
+        elif kind == "browser":
+            sample["browser_mb"] += rss_mb
+        else:
+            sample["other_mb"] += rss_mb
+        sample["total_mb"] += rss_mb
+        sample["processes"] += 1
+
+    return {key: round(value, 1) if isinstance(value, float) else value
+            for key, value in sample.items()}
+
+
+# ════════════════════════════════════════════════════════════════════
+# BROWSER RECYCLER (decisions + health metrics)
+# ════════════════════════════════════════════════════════════════════
+
+class BrowserRecycler:
+    """Decides which contexts (or the whole browser) to retire"""
+
+    def __init__(self, reuse_limit: int = 50,
+                 renderer_limit_mb: float = RENDERER_RSS_LIMIT_MB,
+                 browser_limit_mb: float = BROWSER_RSS_LIMIT_MB,
+                 sample_interval: float = RSS_SAMPLE_INTERVAL,
+                 restart_browser: bool = True,
+                 sampler=sample_chromium_memory):
+        self.reuse_limit = reuse_limit
+        self.restart_browser = restart_browser  # False → pool can't relaunch: retire contexts instead
+        self.renderer_limit_mb = renderer_limit_mb
+        self.browser_limit_mb = browser_limit_mb
+        self.sample_interval = sample_interval
+        self.sampler = sampler
+
+        self.memory_marked = set()          # contexts to retire on their next acquire
+        self.restart_pending: Optional[str] = None  # "memory" | "crash"
+        self.last_sample: Dict = {}
+        self.last_sample_at = 0.0
+        self.stats = {
+            "samples": 0,
+            "peak_total_mb": 0.0,
+            "retired": {"usage": 0, "memory": 0, "crash": 0},
+            "browser_restarts": {"memory": 0, "crash": 0},
+        }
+
+    def maybe_sample(self, context_usage: Dict) -> Optional[Dict]:
+        """
+        Sample the process tree if RSS_SAMPLE_INTERVAL elapsed
+
+        context_usage: {context: uses} of the live contexts (busiest = retired first)
+        """
+        now = time.monotonic()
+        if now - self.last_sample_at < self.sample_interval:
+            return None
+        self.last_sample_at = now
+
+        sample = self.sampler()
+        self.last_sample = sample
+        self.stats["samples"] += 1
+        self.stats["peak_total_mb"] = max(self.stats["peak_total_mb"], sample["total_mb"])
+
+        if sample["total_mb"] > self.browser_limit_mb and self.restart_browser:
+            self.restart_pending = self.restart_pending or "memory"
+        elif sample["total_mb"] > self.browser_limit_mb or sample["renderer_mb"] > self.renderer_limit_mb:
+            candidates = sorted((context for context in context_usage if context not in self.memory_marked),
+                                key=lambda context: context_usage[context], reverse=True)
+            self.memory_marked.update(candidates[:RETIRE_BATCH])
+        return sample
+
+    def retire_reason(self, context, uses: int, crashed: bool = False) -> Optional[str]:
+        """crash / memory / usage → retire this context now (None → keep it)"""
+        if crashed:
+            return "crash"
+        if context in self.memory_marked:
+            return "memory"
+        if uses >= self.reuse_limit:
+            return "usage"
+        return None
+
+    def retired(self, context, reason: str):
+        self.memory_marked.discard(context)
+        self.stats["retired"][reason] += 1
+
+    def forget(self, context):
+        """Context closed for another reason (pool shutdown / failed cleanup)"""
+        self.memory_marked.discard(context)
+
+    def browser_crashed(self):
+        self.restart_pending = "crash"
+
+    def browser_restarted(self):
+        self.stats["browser_restarts"][self.restart_pending or "memory"] += 1
+        self.restart_pending = None
+        self.memory_marked.clear()
+        self.last_sample_at = 0.0  # Fresh baseline on the next acquire
+
+    def health(self) -> Dict:
+        """Pool health metrics (last RSS sample + recycling counters)"""
+        return {
+            **self.last_sample,
+            "sample_age_s": round(time.monotonic() - self.last_sample_at, 1) if self.last_sample_at else None,
+            "peak_total_mb": round(self.stats["peak_total_mb"], 1),
+            "samples": self.stats["samples"],
+            "retired": dict(self.stats["retired"]),
+            "browser_restarts": dict(self.stats["browser_restarts"]),
+            "marked": len(self.memory_marked),
+            "restart_pending": self.restart_pending,
+        }
+
+    def summary_line(self) -> str:
+        sample = self.last_sample
+        retired = self.stats["retired"]
+        restarts = self.stats["browser_restarts"]
+        memory = (f"RSS {sample['total_mb']:.0f}MB (renderers {sample['renderer_mb']:.0f}MB × "
+                  f"{sample['renderers']}) | " if sample else "RSS not sampled yet | ")
+        return (memory + f"retired: usage {retired['usage']}, memory {retired['memory']}, "
+                f"crash {retired['crash']} | browser restarts: {restarts['memory'] + restarts['crash']}")
@@ -5,6 +5,9 @@ DIRECT SCAN - Egyszerű, átlátható bulk scanner
 - Minden kiírva a terminálba
 - Folytatás támogatás
 - Tiszta, követhető működés
+- Státusz események (Postgres LISTEN scan_status, scan_events.py) →
+  nincs scanenkénti GET /api/scan/{id} polling; ha a LISTEN nem
+  elérhető, marad a polling
 """
 
 import requests
@@ -14,6 +17,7 @@ import json
 import os
 from datetime import datetime
 import signal
+from scan_events import ScanEventListener, EVENT_RECONCILE_INTERVAL
 
 # ========================================
 # KONFIGURÁCIÓ
@@ -21,7 +25,7 @@ import signal
 API_URL = "http://localhost:3000/api/scan"
 PROGRESS_FILE = "direct-scan-progress.json"
 BATCH_SIZE = 5  # Egyszerre ennyi scan fut
-POLL_INTERVAL = 3  # 3 másodpercenként ellenőrzi a státuszt
+POLL_INTERVAL = 3  # 3 másodpercenként ellenőrzi a státuszt (LISTEN mellett: max várakozás eseményre)
 SCAN_TIMEOUT = 90  # Max 90 másodperc per scan
 
 # Színes output
@@ -103,36 +107,37 @@ def create_scan(domain):
         print(f"  {Colors.RED}✗{Colors.END} Hiba: {domain} - {str(e)[:50]}")
         return None
 
+def apply_scan_status(scan, status, risk):
+    """Státusz (API válasz vagy NOTIFY esemény) alkalmazása egy scanre"""
+    if status != scan['status']:
+        # Státusz változott
+        scan['status'] = status
+
+        if status == 'SCANNING':
+            print(f"  {Colors.BLUE}⚙{Colors.END}  Scanning: {scan['domain']}")
+        elif status == 'COMPLETED':
+            elapsed = int(time.time() - scan['start_time'])
+            print(f"  {Colors.GREEN}✅{Colors.END} Kész: {scan['domain']} (Risk: {risk or 0}, Idő: {elapsed}s)")
+            return 'COMPLETED'
+        elif status == 'FAILED':
+            print(f"  {Colors.RED}❌{Colors.END} Sikertelen: {scan['domain']}")
+            return 'FAILED'
+
+    # Timeout ellenőrzés
+    if time.time() - scan['start_time'] > SCAN_TIMEOUT:
+        print(f"  {Colors.YELLOW}⏱{Colors.END}  Timeout: {scan['domain']}")
+        return 'TIMEOUT'
+
+    return status
+
 def check_scan_status(scan):
-    """Ellenőrzi egy scan státuszát"""
+    """Ellenőrzi egy scan státuszát (API)"""
     try:
         resp = requests.get(f"{API_URL}/{scan['scan_id']}", timeout=5)
 
         if resp.status_code == 200:
             data = resp.json()
-            status = data.get('status')
-
-            if status != scan['status']:
-                # Státusz változott
-                scan['status'] = status
-
-                if status == 'SCANNING':
-                    print(f"  {Colors.BLUE}⚙{Colors.END}  Scanning: {scan['domain']}")
-                elif status == 'COMPLETED':
-                    risk = data.get('riskScore', 0)
-                    elapsed = int(time.time() - scan['start_time'])
-                    print(f"  {Colors.GREEN}✅{Colors.END} Kész: {scan['domain']} (Risk: {risk}, Idő: {elapsed}s)")
-                    return 'COMPLETED'
-                elif status == 'FAILED':
-                    print(f"  {Colors.RED}❌{Colors.END} Sikertelen: {scan['domain']}")
-                    return 'FAILED'
-
-            # Timeout ellenőrzés
-            if time.time() - scan['start_time'] > SCAN_TIMEOUT:
-                print(f"  {Colors.YELLOW}⏱{Colors.END}  Timeout: {scan['domain']}")
-                return 'TIMEOUT'
-
-            return status
+            return apply_scan_status(scan, data.get('status'), data.get('riskScore', 0))
 
     except Exception as e:
         print(f"  {Colors.RED}!{Colors.END} Ellenőrzés hiba: {scan['domain'][:30]}")
@@ -170,6 +175,15 @@ def process_domains(domains_file):
     print(f"  Kezdés: index {start_index}")
     print(f"\n{Colors.CYAN}{'='*60}{Colors.END}\n")
 
+    # Státusz események (LISTEN) - ha nem elérhető, API polling
+    events = ScanEventListener()
+    if events.connect():
+        print(f"{Colors.GREEN}✓ Státusz események: LISTEN {events.channel}{Colors.END}\n")
+    else:
+        print(f"{Colors.YELLOW}⚠️  LISTEN nem elérhető → API polling ({POLL_INTERVAL}s){Colors.END}\n")
+    last_reconcile = 0.0
+    event_updates = {}  # scan_id → esemény (még nem feldolgozva)
+
     # Aktív scan-ek
     active_scans = []
     domain_index = start_index
@@ -203,9 +217,21 @@ def process_domains(domains_file):
         if active_scans:
             print(f"\n{Colors.CYAN}[Aktív: {len(active_scans)}]{Colors.END}")
 
+            # API lekérdezés csak polling módban / egyeztetéskor (elveszett események)
+            reconcile = (not events.connected or events.needs_resync()
+                         or time.time() - last_reconcile >= EVENT_RECONCILE_INTERVAL)
+            if reconcile:
+                last_reconcile = time.time()
+
             completed_scans = []
             for scan in active_scans:
-                status = check_scan_status(scan)
+                event = event_updates.pop(scan['scan_id'], None)
+                if reconcile:
+                    status = check_scan_status(scan)
+                elif event:
+                    status = apply_scan_status(scan, event.get('status'), event.get('riskScore'))
+                else:
+                    status = apply_scan_status(scan, scan['status'], None)
 
                 if status in ['COMPLETED', 'FAILED', 'TIMEOUT', 'ERROR']:
                     completed_scans.append(scan)
@@ -226,14 +252,18 @@ def process_domains(domains_file):
                 save_progress(progress)
                 print(f"\n  {Colors.GREEN}💾 Progress mentve{Colors.END}")
 
-            # Várakozás következő ellenőrzésig
-            time.sleep(POLL_INTERVAL)
+            # Várakozás következő ellenőrzésig (esemény azonnal felébreszt)
+            active_ids = {scan['scan_id'] for scan in active_scans}
+            for event in events.wait(POLL_INTERVAL):
+                if event['id'] in active_ids:
+                    event_updates[event['id']] = event
 
         # Statisztika kiírás
         if domain_index % 20 == 0 or not active_scans:
             print(f"\n{Colors.CYAN}📊 Eddig: {len(progress['processed'])}/{len(all_domains)} | Siker: {stats['success']} | Hiba: {stats['failed']}{Colors.END}")
 
     # Végső mentés
+    events.close()
     save_progress(progress)
 
     # Összegzés
@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+DNS Pre-Resolution + Negative Cache
+===================================
+
+A halott / NXDOMAIN domainek eddig csak a Playwright navigáció 30s-os
+timeout-ja után derültek ki → foglalták a context slotokat.
+
+Ez a modul a scanner kurzor ELŐTT aszinkron feloldja a következő
+domaineket, és egy TTL-es pozitív/negatív cache-t tart lemezen.
+A feloldhatatlan domainek böngésző nélkül FAILED-re állíthatók.
+
+Usage (orchestratorból):
+    from dns_cache import DnsCache, DnsResolver
+
+    resolver = DnsResolver(DnsCache("dns-cache.json"))
+    task = asyncio.create_task(resolver.run_ahead(lambda: upcoming_domains))
+
+    entry = await resolver.resolve("example.com")
+    if entry["status"] == "dead":
+        ...  # mark FAILED, no browser
+
+Standalone (cache előmelegítés):
+    python3 dns_cache.py domains.txt
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+DNS_CACHE_FILE = "dns-cache.json"
+DNS_CONCURRENCY = 100        # Parallel lookups (thread pool size)
+DNS_TIMEOUT = 5.0            # Seconds per lookup
+DNS_POSITIVE_TTL = 6 * 3600  # Resolved domains: 6 hours
+DNS_NEGATIVE_TTL = 24 * 3600 # NXDOMAIN / no address: 24 hours
+DNS_UNKNOWN_TTL = 60         # Timeout / SERVFAIL / EAI_AGAIN: retry after a minute, not in a loop
+DNS_LOOKAHEAD = 500          # Domains resolved ahead of the scanner cursor
+DNS_SAVE_INTERVAL = 60       # Seconds between cache flushes
+
+# getaddrinfo errors that mean "this name does not resolve" (not a transient failure)
+DEAD_ERRNOS = {
+    socket.EAI_NONAME,
+    getattr(socket, "EAI_NODATA", socket.EAI_NONAME),
+    getattr(socket, "EAI_ADDRFAMILY", socket.EAI_NONAME),
+}
+
+
+def extract_hostname(domain: str) -> str:
+    """Hostname from a bare domain or URL"""
+    if "://" in domain:
+        return (urlparse(domain).hostname or domain).lower()
+    return domain.split("/")[0].split(":")[0].lower()
+
+
+# ════════════════════════════════════════════════════════════════════
+# DNS CACHE (on disk, TTL'd)
+# ════════════════════════════════════════════════════════════════════
+
+class DnsCache:
+    """
+    TTL'd positive/negative DNS cache persisted as JSON
+
+    Entry: {"status": "ok" | "dead" | "unknown", "addresses": [...], "reason": ..., "expires": ts}
+    """
+
+    def __init__(self, path: str = DNS_CACHE_FILE):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        """Load cache from disk (expired entries dropped)"""
+        self.entries = self._read_file()
+
+    def _read_file(self) -> Dict[str, Dict]:
+        """Unexpired entries of the on-disk copy ({} if missing / unreadable)"""
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        now = time.time()
+        return {host: entry for host, entry in entries.items()
+                if isinstance(entry, dict) and entry.get("expires", 0) > now}
+
+    def save(self) -> bool:
+        """
+        Merge with the on-disk copy (later expiry wins) + atomic write
+
+        Several processes (turbo-master-scanner.py --shards) share the file:
+        per-process tmp file, and what the others saved meanwhile is kept.
+        A failed save is reported, not raised (False, retried next time).
+        """
+        if not self.dirty:
+            return True
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            for host, entry in self._read_file().items():
+                mine = self.entries.get(host)
+                if mine is None or entry["expires"] > mine["expires"]:
+                    self.entries[host] = entry
+
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  DNS cache save failed ({self.path}): {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+        self.dirty = False
+        return True
+
+    def get(self, host: str) -> Optional[Dict]:
+        """Cached entry, or None if missing / expired"""
+        entry = self.entries.get(host)
+        if entry is None:
+            return None
+        if entry["expires"] <= time.time():
+            del self.entries[host]
+            self.dirty = True
+            return None
+        return entry
+
+    def put(self, host: str, status: str, addresses: List[str] = None, reason: str = None):
+        """Store a lookup result (TTL depends on status)"""
+        ttl = {"ok": DNS_POSITIVE_TTL, "unknown": DNS_UNKNOWN_TTL}.get(status, DNS_NEGATIVE_TTL)
+        entry = {
+            "status": status,
+            "addresses": addresses or [],
+            "reason": reason,
+            "expires": time.time() + ttl,
+        }
+        self.entries[host] = entry
+        self.dirty = True
+        return entry
+
+
+# ════════════════════════════════════════════════════════════════════
+# ASYNC RESOLVER
+# ════════════════════════════════════════════════════════════════════
+
+class DnsResolver:
+    """
+    Async resolver on top of getaddrinfo (dedicated thread pool)
+
+    status:
+      - "ok":      resolves → go ahead and crawl
+      - "dead":    NXDOMAIN / no address → mark FAILED, no browser
+      - "unknown": timeout / SERVFAIL → cached for DNS_UNKNOWN_TTL only, crawl normally
+    """
+
+    def __init__(self, cache: DnsCache, concurrency: int = DNS_CONCURRENCY,
+                 timeout: float = DNS_TIMEOUT):
+        self.cache = cache
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="dns")
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.last_save = time.time()
+        self.stats = {
+            "lookups": 0,
+            "cache_hits": 0,
+            "resolved": 0,
+            "dead": 0,
+            "unknown": 0,
+        }
+
+    async def resolve(self, domain: str) -> Dict:
+        """Resolve one domain (cache first, concurrent calls share one lookup)"""
+        host = extract_hostname(domain)
+
+        entry = self.cache.get(host)
+        if entry is not None:
+            self.stats["cache_hits"] += 1
+            return entry
+
+        if host in self.in_flight:
+            return await asyncio.shield(self.in_flight[host])
+
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[host] = future
+        try:
+            entry = await self._lookup(host)
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Nobody else awaiting → don't leave "exception never retrieved" noise
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[host]
+
+    async def _lookup(self, host: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        self.stats["lookups"] += 1
+
+        async with self.semaphore:
+            try:
+                infos = await asyncio.wait_for(
+                    loop.run_in_executor(
+                        self.executor, socket.getaddrinfo, host, 443, 0, socket.SOCK_STREAM
+                    ),
+                    timeout=self.timeout
+                )
+            except socket.gaierror as e:
+                if e.errno in DEAD_ERRNOS:
+                    self.stats["dead"] += 1
+                    return self.cache.put(host, "dead", reason=f"DNS resolution failed: {e.strerror}")
+                self.stats["unknown"] += 1
+                return self.cache.put(host, "unknown", reason=str(e))
+            except (asyncio.TimeoutError, OSError) as e:
+                self.stats["unknown"] += 1
+                return self.cache.put(host, "unknown", reason=f"DNS lookup error: {e!r}")
+
+        addresses = sorted({info[4][0] for info in infos})
+        if not addresses:
+            self.stats["dead"] += 1
+            return self.cache.put(host, "dead", reason="DNS resolution failed: no address")
+
+        self.stats["resolved"] += 1
+        return self.cache.put(host, "ok", addresses=addresses)
+
+    async def resolve_many(self, domains: Iterable[str]) -> Dict[str, Dict]:
+        """Resolve many domains concurrently → {domain: entry}"""
+        domains = list(domains)
+        entries = await asyncio.gather(*[self.resolve(d) for d in domains])
+        return dict(zip(domains, entries))
+
+    def is_dead(self, domain: str) -> bool:
+        """Cached negative answer? (no lookup)"""
+        entry = self.cache.get(extract_hostname(domain))
+        return entry is not None and entry["status"] == "dead"
+
+    def maybe_save(self):
+        """Flush cache to disk every DNS_SAVE_INTERVAL seconds"""
+        if time.time() - self.last_save > DNS_SAVE_INTERVAL:
+            self.cache.save()
+            self.last_save = time.time()
+
+    async def run_ahead(self, get_upcoming: Callable[[], List[str]], interval: float = 1.0):
+        """
+        Background task: keep the next domains (ahead of the cursor) resolved
+
+        get_upcoming() returns the domains right after the scanner cursor.
+        Every round is followed by `interval` of sleep, so a window of
+        unresolvable names cannot spin the loop. Cancel the task to stop.
+        """
+        while True:
+            upcoming = [d for d in get_upcoming()
+                        if self.cache.get(extract_hostname(d)) is None]
+            if upcoming:
+                await self.resolve_many(upcoming)
+                self.maybe_save()
+            await asyncio.sleep(interval)
+
+    def hit_rate(self) -> float:
+        total = self.stats["cache_hits"] + self.stats["lookups"]
+        return self.stats["cache_hits"] / total if total else 0.0
+
+    def close(self):
+        """Save cache and stop the thread pool"""
+        self.cache.save()
+        self.executor.shutdown(wait=False)
+
+
+# ════════════════════════════════════════════════════════════════════
+# MAIN (cache warm-up)
+# ════════════════════════════════════════════════════════════════════
+
+async def warm_cache(domains_file: str):
+    with open(domains_file, 'r') as f:
+        domains = [line.strip() for line in f
+                   if line.strip() and not line.startswith('#')]
+
+    resolver = DnsResolver(DnsCache(DNS_CACHE_FILE))
+    start = time.time()
+
+    for i in range(0, len(domains), DNS_LOOKAHEAD):
+        await resolver.resolve_many(domains[i:i + DNS_LOOKAHEAD])
+        resolver.maybe_save()
+        print(f"  {min(i + DNS_LOOKAHEAD, len(domains))}/{len(domains)} "
+              f"(dead: {resolver.stats['dead']}, unknown: {resolver.stats['unknown']})")
+
+    resolver.close()
+    print(f"✓ DNS cache warmed in {time.time() - start:.1f}s → {DNS_CACHE_FILE}")
+    print(f"  Stats: {resolver.stats}")
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2:
+        print("Usage: python3 dns_cache.py domains.txt")
+        sys.exit(1)
+
+    asyncio.run(warm_cache(sys.argv[1]))
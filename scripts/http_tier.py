@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+HTTP Tier of the Tiered Crawl Pipeline (curl_cffi first, browser on demand)
+===========================================================================
+
+A turbo-master-scanner.py eddig MINDEN domainre teljes Playwright
+navigációt indított - a statikus oldalak többségénél a Chromium
+fölösleges. Az olcsó curl_cffi tier csak a TS workerben létezett
+(curl-cffi-wrapper.ts).
+
+Két tier:
+
+1. HTTP tier (ez a modul): egy perzisztens curl_cffi AsyncSession,
+   HTTP_TIER_CONCURRENCY párhuzamos fetch, Chrome TLS fingerprint
+2. Browser tier (ContextPool): CSAK az eszkalált oldalak -
+   needs_browser (challenge / JS-required / SPA), bot-fal státusz
+   (ESCALATE_STATUSES), csonkolt body, nem ellenőrizhető TLS tanúsítvány,
+   vagy sikertelen fetch
+
+Mindkét tier ugyanazt a CrawlerResult formát adja (camelCase, mint a
+scan_with_playwright()): html, title, cookies, sslCertificate
+(Playwright security_details alak), timingBreakdown, networkRequests
+(a document kérés), scripts, inlineScripts (CSP sha256), links, metaTags,
+responseHeaders.
+A különbség: crawlTier = "http" | "browser".
+
+Korlát: JS-ből beállított cookie-k / dinamikusan betöltött scriptek
+(pl. tag manager által injektált widgetek) csak a browser tierben látszanak.
+
+Usage:
+    from http_tier import HttpTier
+
+    tier = HttpTier()
+    await tier.start()
+    crawl_result, escalation = await tier.crawl(url, domain)
+    if crawl_result is None:                 # → browser tier (escalation = ok)
+        crawl_result = await scan_with_playwright(...)
+    await tier.close()
+"""
+
+import asyncio
+import html as html_lib
+import re
+import socket
+import ssl
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+from curl_cffi_fetch import IMPERSONATE, StageHistograms, fetch_async, transfer_curl_infos
+from network_capture import MAX_INLINE_SCRIPTS, MAX_INLINE_SCRIPT_BYTES, compact_headers, csp_hash
+from page_extract import MAX_LINKS, MAX_META, MAX_META_CONTENT
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+HTTP_TIER_CONCURRENCY = 64       # In-flight curl_cffi fetches (no browser memory per fetch)
+CERT_TIMEOUT = 5                 # Seconds for the TLS certificate handshake
+ESCALATE_STATUSES = {403, 429, 503}  # Typical bot-wall answers → let Chromium try
+USER_AGENT = "TURBO Scanner v5 (curl_cffi/Python)"
+
+TITLE_PATTERN = re.compile(r"<title[^>]*>([^<]*)</title>", re.IGNORECASE)
+SCRIPT_PATTERN = re.compile(r"<script\b([^>]*)>(.*?)</script\s*>", re.IGNORECASE | re.DOTALL)
+LINK_PATTERN = re.compile(r"<(a|link)\b([^>]*)>", re.IGNORECASE)
+META_PATTERN = re.compile(r"<meta\b([^>]*)>", re.IGNORECASE)
+ATTRIBUTE_PATTERNS = {
+    name: re.compile(rf"""(?<![\w:-]){name}\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""", re.IGNORECASE)
+    for name in ("src", "type", "href", "rel", "name", "property", "http-equiv", "content", "charset")
+}
+SAMESITE_VALUES = {"strict": "Strict", "lax": "Lax", "none": "None"}
+
+
+def _attribute(name: str, attributes: str) -> Optional[str]:
+    match = ATTRIBUTE_PATTERNS[name].search(attributes)
+    return next((group for group in match.groups() if group is not None), "") if match else None
+
+
+def extract_scripts(html: str, base_url: str) -> Dict:
+    """
+    Script elements of the static HTML (same output as collect_scripts()):
+    {"scripts": [external src URLs], "inlineScripts": [{"hash", "type", "length"}]}
+    """
+    external: List[str] = []
+    inline_scripts: List[Dict] = []
+    for match in SCRIPT_PATTERN.finditer(html):
+        attributes, text = match.group(1), match.group(2)
+        src = _attribute("src", attributes)
+        if src:
+            external.append(urljoin(base_url, html_lib.unescape(src.strip())))
+        elif src is None and len(inline_scripts) < MAX_INLINE_SCRIPTS:
+            inline_scripts.append({
+                "hash": csp_hash(text) if len(text) <= MAX_INLINE_SCRIPT_BYTES else None,
+                "type": _attribute("type", attributes) or "text/javascript",
+                "length": len(text),
+            })
+    return {"scripts": list(dict.fromkeys(external)), "inlineScripts": inline_scripts}
+
+
+def extract_links_and_meta(html: str, base_url: str) -> Dict:
+    """<a> / <link> hrefs and <meta> tags of the static HTML (same as page_extract.py)"""
+    links: List[Dict] = []
+    for match in LINK_PATTERN.finditer(html):
+        if len(links) >= MAX_LINKS:
+            break
+        href = _attribute("href", match.group(2))
+        if href is not None:
+            links.append({
+                "tag": match.group(1).lower(),
+                "href": urljoin(base_url, html_lib.unescape(href.strip())),
+                "rel": html_lib.unescape(_attribute("rel", match.group(2)) or ""),
+            })
+
+    meta_tags: List[Dict] = []
+    for match in META_PATTERN.finditer(html):
+        if len(meta_tags) >= MAX_META:
+            break
+        attributes = match.group(1)
+        charset = _attribute("charset", attributes)
+        name = (_attribute("name", attributes) or _attribute("property", attributes)
+                or _attribute("http-equiv", attributes) or ("charset" if charset is not None else ""))
+        if not name:
+            continue
+        content = _attribute("content", attributes)
+        content = html_lib.unescape(content if content is not None else charset or "")
+        meta_tags.append({"name": html_lib.unescape(name), "content": content[:MAX_META_CONTENT]})
+
+    return {"links": links, "metaTags": meta_tags}
+
+
+def fetch_certificate(host: str, port: int = 443, timeout: float = CERT_TIMEOUT) -> Dict:
+    """
+    Verified TLS certificate of a host, in Playwright's security_details() shape:
+    {"issuer", "protocol", "subjectName", "validFrom", "validTo"} (unix seconds)
+
+    Raises ssl.SSLError / OSError when the chain can't be verified or reached.
+    """
+    context = ssl.create_default_context()
+    with socket.create_connection((host, port), timeout=timeout) as sock:
+        with context.wrap_socket(sock, server_hostname=host) as tls:
+            cert = tls.getpeercert()
+            protocol = tls.version() or ""
+
+    def common_name(field) -> str:
+        for rdn in cert.get(field, ()):
+            for key, value in rdn:
+                if key == "commonName":
+                    return value
+        return ""
+
+    return {
+        "issuer": common_name("issuer"),
+        "protocol": protocol.replace("TLSv", "TLS "),
+        "subjectName": common_name("subject"),
+        "validFrom": ssl.cert_time_to_seconds(cert["notBefore"]),
+        "validTo": ssl.cert_time_to_seconds(cert["notAfter"]),
+    }
+
+
+def escalation_reason(fetched: Dict) -> Optional[str]:
+    """Why a fetch result can't be served by the HTTP tier (None → serve it)"""
+    if not fetched.get("success"):
+        return f"fetch failed: {(fetched.get('error') or 'unknown')[:120]}"
+    if fetched.get("needs_browser"):
+        return fetched.get("detection_reason") or "needs browser"
+    if fetched.get("status_code") in ESCALATE_STATUSES:
+        return f"HTTP {fetched['status_code']}"
+    if fetched.get("truncated"):
+        return "body truncated"
+    return None
+
+
+def _crawler_cookies(fetched: Dict, default_domain: str) -> List[Dict]:
+    cookies = []
+    for cookie in fetched.get("cookies") or []:
+        cookies.append({
+            "name": cookie["name"],
+            "value": cookie["value"],
+            "domain": cookie.get("domain") or default_domain,
+            "path": cookie.get("path") or "/",
+            "httpOnly": bool(cookie.get("httpOnly")),
+            "secure": bool(cookie.get("secure")),
+            "sameSite": SAMESITE_VALUES.get(str(cookie.get("sameSite", "")).lower(), "Lax"),
+        })
+    return cookies
+
+
+def crawler_result_from_fetch(fetched: Dict, url: str, domain: str,
+                              certificate: Optional[Dict]) -> Dict:
+    """curl_cffi fetch result → TS CrawlerResult (same keys as scan_with_playwright)"""
+    html = fetched.get("html") or ""
+    final_url = fetched.get("final_url") or url
+    title = TITLE_PATTERN.search(html)
+    timing = fetched.get("timing") or {}
+    headers = compact_headers(fetched.get("headers") or {})
+    scripts = extract_scripts(html, final_url)
+    page_lists = extract_links_and_meta(html, final_url)
+
+    document_request = {
+        "url": final_url,
+        "method": "GET",
+        "resourceType": "document",
+        "timestamp": int(time.time() * 1000) - int(fetched.get("elapsed_ms") or 0),
+        "status": fetched.get("status_code"),
+        "responseHeaders": headers,
+    }
+    if timing.get("total_ms"):
+        document_request["durationMs"] = timing["total_ms"]
+
+    return {
+        "success": True,
+        "url": url,
+        "finalUrl": final_url,
+        "statusCode": fetched.get("status_code"),
+        "html": html,
+        "title": html_lib.unescape(title.group(1)).strip() if title else "",
+        "cookies": _crawler_cookies(fetched, urlparse(final_url).hostname or domain),
+        "sslCertificate": certificate,
+        "loadTime": int(fetched.get("elapsed_ms") or 0),
+        "timingBreakdown": dict(timing, redirect_count=fetched.get("redirect_count") or 0),
+        "timestamp": datetime.now().isoformat(),
+        "userAgent": USER_AGENT,
+        "crawlTier": "http",
+
+        "domain": domain,
+        "networkRequests": [document_request],
+        "networkCapture": {"captured": 1, "dropped": 0, "failed": 0, "blocked": 0, "allowed": 1},
+        "scripts": scripts["scripts"],
+        "inlineScripts": scripts["inlineScripts"],
+        "links": page_lists["links"],
+        "metaTags": page_lists["metaTags"],
+        "responseHeaders": headers,
+    }
+
+
+# ════════════════════════════════════════════════════════════════════
+# HTTP TIER (persistent AsyncSession + escalation stats)
+# ════════════════════════════════════════════════════════════════════
+
+class HttpTier:
+    """curl_cffi fetch pool in front of the browser ContextPool"""
+
+    def __init__(self, concurrency: int = HTTP_TIER_CONCURRENCY):
+        self.concurrency = concurrency
+        self.session = None
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.timing = StageHistograms()
+        self.stats = {
+            "fetched": 0,
+            "served": 0,       # CrawlerResult from the HTTP tier (no browser)
+            "escalated": 0,    # Sent on to the browser tier
+            "prefetched": 0,   # Reused the conditional rescan's fetch
+            "by_reason": {},   # Escalation reason (first words) → count
+        }
+
+    async def start(self) -> bool:
+        """Open the shared AsyncSession (False → curl_cffi missing, browser only)"""
+        try:
+            from curl_cffi.requests import AsyncSession
+        except ImportError:
+            return False
+        self.session = AsyncSession(impersonate=IMPERSONATE, max_clients=self.concurrency,
+                                    curl_infos=transfer_curl_infos())  # timing read at transfer end
+        return True
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def crawl(self, url: str, domain: str,
+                    prefetched: Optional[Dict] = None) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        HTTP tier crawl → (CrawlerResult, None), or (None, reason) to escalate
+
+        prefetched: a full fetch of the same URL (e.g. the conditional rescan
+        precheck) - classified and converted without fetching again
+        """
+        if prefetched:
+            fetched = prefetched
+            self.stats["prefetched"] += 1
+        elif self.session is None:
+            return None, "http tier disabled"
+        else:
+            async with self.semaphore:
+                fetched = await fetch_async(self.session, url)
+            self.stats["fetched"] += 1
+            self.timing.add(fetched)
+
+        reason = escalation_reason(fetched)
+        certificate = None
+        if reason is None and urlparse(fetched.get("final_url") or url).scheme == "https":
+            host = urlparse(fetched.get("final_url") or url).hostname
+            try:
+                certificate = await asyncio.to_thread(fetch_certificate, host)
+            except (OSError, ValueError, KeyError) as e:  # ssl.SSLError is an OSError
+                reason = f"certificate not verifiable: {str(e)[:120]}"
+
+        if reason:
+            self.escalated(reason)
+            return None, reason
+
+        self.stats["served"] += 1
+        return crawler_result_from_fetch(fetched, url, domain, certificate), None
+
+    def escalated(self, reason: str):
+        self.stats["escalated"] += 1
+        key = " ".join(reason.split(":")[0].split()[:3])
+        self.stats["by_reason"][key] = self.stats["by_reason"].get(key, 0) + 1
+
+    def get_stats(self) -> Dict:
+        stats = dict(self.stats, by_reason=dict(self.stats["by_reason"]))
+        total = stats["served"] + stats["escalated"]
+        stats["served_rate"] = round(stats["served"] / total, 3) if total else 0.0
+        return stats
+
+    def summary_line(self) -> str:
+        stats = self.get_stats()
+        top = sorted(stats["by_reason"].items(), key=lambda item: item[1], reverse=True)[:3]
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in top) or "-"
+        return (f"HTTP {stats['served']} ({stats['served_rate'] * 100:.0f}%) | "
+                f"browser {stats['escalated']} | escalated by: {reasons}")
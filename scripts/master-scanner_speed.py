@@ -21,9 +21,13 @@ import os
 import json
 import uuid
 import time
+import psutil
 from datetime import datetime
 from typing import Dict, List, Optional, Set
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from pool_autoscaler import host_pool_bounds
+from analysis_worker_pool import AnalysisWorkerPool, ANALYSIS_WORKERS
+from scan_counters import read_status_counts
 
 # ════════════════════════════════════════════════════════════════════
 # KONFIGURÁCIÓ - M4 PRO OPTIMIZED
@@ -31,14 +35,18 @@ from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 
 DB_URL = os.environ.get("DATABASE_URL", "postgresql://localhost/ai_security_scanner")
 
-# i9 24-core + 128GB RAM optimization
-# Calculation: 100 workers × 400MB = 40GB RAM (31% usage)
-#              100 workers @ 50% CPU = 104% of 48 logical cores (optimal!)
-MAX_WORKERS = 100  # i9 24-core optimized (sweet spot: CPU+RAM balanced)
+# Host-derived worker count (was 100, hand-tuned for an i9 24-core + 128GB):
+# Calculation: ~2 workers per logical core (100 workers @ 50% CPU ≈ 48 logical cores)
+#              × 400MB each, within 31% of the RAM (100 × 400MB = 40GB of 128GB)
+WORKER_MEMORY_MB = 400
+MAX_WORKERS = max(4, min(2 * (psutil.cpu_count() or 2),
+                         int(psutil.virtual_memory().total / (1024 ** 2) * 0.31 / WORKER_MEMORY_MB)))
 SCAN_TIMEOUT = 300          # 5min per scan (full 30+ analyzers need time!)
 CLEANUP_INTERVAL = 300      # 5 min cleanup
 BATCH_SIZE = 10             # Batch insert size
 RESOURCE_BLOCKING = True    # Block images/fonts/CSS (TURBO v5)
+WORKER_CWD = '/home/aiq/Asztal/10_M_USD/ai-security-scanner'
+WORKER_SCRIPT = 'src/worker/index-sqlite.ts'   # FULL 30+ analyzers (--serve: persistent worker)
 
 # Színek
 class Colors:
@@ -152,6 +160,10 @@ class MasterScannerSpeed:
         self.browser: Optional[Browser] = None
         self.context_pool: Optional[BrowserContextPool] = None
 
+        # Persistent TS analysis workers (started on the first call_worker())
+        self.analysis_pool: Optional[AnalysisWorkerPool] = None
+        self.analysis_pool_ready = None
+
         # Control
         self.running = True
 
@@ -369,45 +381,33 @@ class MasterScannerSpeed:
 
     async def call_worker(self, scan_id: str, domain: str) -> bool:
         """
-        Call TypeScript worker via subprocess
+        TypeScript analysis on a persistent worker (AnalysisWorkerPool)
         Worker will detect pre-crawled data and skip crawling (FAST PATH!)
 
         IMPORTANT: Uses index-sqlite.ts (FULL 30+ analyzers) NOT index.ts (only 7 analyzers)
         This ensures ZERO quality loss - same analyzers as manual scans!
         """
         try:
-            # Worker command (TURBO v5 HYBRID CLI mode)
-            # FIXED: Use index-sqlite.ts for FULL analysis (30+ analyzers)
-            proc = await asyncio.create_subprocess_exec(
-                'npx', 'tsx', 'src/worker/index-sqlite.ts',
-                '--scan-id', scan_id,
-                '--url', f'https://{domain}',
-                cwd='/home/aiq/Asztal/10_M_USD/ai-security-scanner',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            # Pool started once, on first use (queue mode never analyzes here)
+            if self.analysis_pool is None:
+                self.analysis_pool = AnalysisWorkerPool(size=ANALYSIS_WORKERS, script=WORKER_SCRIPT,
+                                                        cwd=WORKER_CWD)
+                self.analysis_pool_ready = asyncio.create_task(self.analysis_pool.start())
+            await self.analysis_pool_ready
+
+            result = await self.analysis_pool.analyze(
+                scan_id, f'https://{domain}',
+                timeout=SCAN_TIMEOUT - 10  # Leave 10s buffer
             )
-
-            # Wait with timeout
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    proc.communicate(),
-                    timeout=SCAN_TIMEOUT - 10  # Leave 10s buffer
-                )
-
-                if proc.returncode == 0:
-                    return True
-                else:
-                    error_msg = stderr.decode()[:200] if stderr else "Unknown error"
-                    print(f"{Colors.RED}✗ Worker failed: {domain} - {error_msg}{Colors.RESET}")
-                    return False
-
-            except asyncio.TimeoutError:
-                proc.kill()
-                await proc.wait()
-                return False
+            if result["ok"]:
+                return True
+            if not result["timeout"]:
+                error_msg = (result["error"] or "Unknown error")[:200]
+                print(f"{Colors.RED}✗ Worker failed: {domain} - {error_msg}{Colors.RESET}")
+            return False
 
         except Exception as e:
-            print(f"{Colors.RED}✗ Worker spawn failed: {domain} - {e}{Colors.RESET}")
+            print(f"{Colors.RED}✗ Worker dispatch failed: {domain} - {e}{Colors.RESET}")
             return False
 
     async def process_scan_with_timeout(self, scan_id: str, domain: str):
@@ -427,22 +427,16 @@ class MasterScannerSpeed:
 
     def get_queue_status(self) -> Dict:
         """
-        OPTIMIZATION #4: Batch query (1 query instead of 2!)
-        Saves ~25ms × 1000 iterations = 25s
+        OPTIMIZATION #4: Trigger-maintained counters (ScanStatusCounter)
+        O(1) read instead of COUNT(*) over the whole "Scan" table
         """
         cur = self.conn.cursor()
-        cur.execute('''
-            SELECT
-                COUNT(*) FILTER (WHERE status = 'PENDING') as pending,
-                COUNT(*) FILTER (WHERE status = 'SCANNING') as scanning
-            FROM "Scan"
-        ''')
-        result = cur.fetchone()
+        counts = read_status_counts(cur)
         cur.close()
 
         return {
-            'pending': result[0] or 0,
-            'scanning': result[1] or 0
+            'pending': counts['pending'],
+            'scanning': counts['scanning']
         }
 
     def cleanup_stuck_scans(self):
@@ -514,7 +508,8 @@ class MasterScannerSpeed:
         print(f"{Colors.GREEN}✓ Browser launched (shared instance){Colors.RESET}")
 
         # Create context pool
-        self.context_pool = BrowserContextPool(self.browser, MAX_WORKERS)
+        # Contexts sized by the host (cores * 0.85, memory bound), not by the worker count
+        self.context_pool = BrowserContextPool(self.browser, host_pool_bounds()["initial"])
         await self.context_pool.initialize()
 
         print(f"\n{Colors.GREEN}🚀 MASTER SCANNER SPEED starting{Colors.RESET}")
@@ -603,6 +598,10 @@ class MasterScannerSpeed:
             if self.context_pool:
                 await self.context_pool.close_all()
 
+            if self.analysis_pool:
+                print(f"  Analysis workers: {self.analysis_pool.summary_line()}")
+                await self.analysis_pool.close()
+
             if self.browser:
                 await self.browser.close()
 
@@ -650,7 +649,7 @@ if __name__ == '__main__':
     print(f"  ✅ Direct DB operations (NO HTTP overhead)")
     print(f"  ✅ Batch processing & smart pooling")
     print(f"  ✅ Resource blocking (images/CSS/fonts)")
-    print(f"  ✅ M4 Pro ARM optimized ({MAX_WORKERS} workers)")
+    print(f"  ✅ Host-sized ({MAX_WORKERS} workers, {psutil.cpu_count()} logical cores)")
     print(f"  ✅ ZERO quality loss (all 62 analyzers run!)")
     print(f"\n{Colors.GREEN}Expected: 3-4x faster than master-scanner.py{Colors.RESET}\n")
 
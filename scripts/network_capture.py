@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Network + Script Capture for the Python Crawler (Playwright)
+============================================================
+
+A scan_with_playwright() crawl result eddig networkRequests: [] és
+scripts: [] TODO-kkal ment a TypeScript workernek → az analyzerek vagy
+lefedettséget vesztettek, vagy regex-szel bányászták ki a HTML-ből.
+
+Ez a modul EGY navigáció alatt gyűjti:
+
+- networkRequests: url, method, resourceType, status, request headers
+  (alap böngésző headerek nélkül), response headers (API / script /
+  document kéréseknél), timestamp, durationMs, failure
+- scripts: külső script URL-ek (TS CrawlerResult.scripts: string[])
+- inlineScripts: inline scriptek CSP-kompatibilis sha256 hash-e + mérete
+- main document headers: response.all_headers() (Set-Cookie, CSP is)
+
+Korlátok (kompakt crawl_result JSON): MAX_NETWORK_REQUESTS kérés,
+MAX_HEADER_VALUE hosszú header értékek, MAX_URL_LENGTH hosszú URL-ek.
+
+Usage:
+    from network_capture import NetworkCapture, collect_scripts
+
+    capture = NetworkCapture(page)          # goto ELŐTT
+    response = await page.goto(url)
+    ...
+    capture.detach()                        # warm (pooled) page: listeners off
+    crawl_result["networkRequests"] = capture.serialize()
+    scripts = await collect_scripts(page)   # {"scripts": [...], "inlineScripts": [...]}
+"""
+
+import base64
+import hashlib
+import time
+from typing import Dict, List
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+MAX_NETWORK_REQUESTS = 400       # Further requests are only counted (dropped)
+MAX_URL_LENGTH = 2048
+MAX_HEADER_VALUE = 512
+MAX_INLINE_SCRIPTS = 100
+MAX_INLINE_SCRIPT_BYTES = 256 * 1024  # Larger inline scripts: length only, no hash
+
+# Request headers every browser request carries → not worth storing per request
+DEFAULT_REQUEST_HEADERS = {
+    "user-agent", "accept", "accept-language", "accept-encoding", "referer",
+    "sec-ch-ua", "sec-ch-ua-mobile", "sec-ch-ua-platform",
+    "sec-fetch-dest", "sec-fetch-mode", "sec-fetch-site", "sec-fetch-user",
+    "upgrade-insecure-requests", "connection", "cache-control", "pragma",
+}
+
+# requestfailed text of requests aborted by the BlocklistRouter ('blockedbyclient')
+BLOCKED_FAILURE = "ERR_BLOCKED_BY_CLIENT"
+
+# Resource types whose response headers are kept (API calls, scripts, documents)
+RESPONSE_HEADER_TYPES = {"document", "xhr", "fetch", "script", "eventsource", "websocket", "other"}
+
+# In-page: script elements (inline text only up to the byte cap)
+SCRIPTS_SCRIPT = """
+({maxInline, maxBytes}) => {
+    const external = [];
+    const inline = [];
+    for (const script of document.scripts) {
+        if (script.src) {
+            external.push(script.src);
+        } else if (inline.length < maxInline) {
+            const text = script.textContent || '';
+            inline.push({
+                type: script.type || 'text/javascript',
+                length: text.length,
+                text: text.length <= maxBytes ? text : null,
+            });
+        }
+    }
+    return {external, inline, total: document.scripts.length};
+}
+"""
+
+
+def compact_headers(headers: Dict[str, str], skip: set = None) -> Dict[str, str]:
+    """Lowercased headers, long values truncated, skipped names dropped"""
+    result = {}
+    for name, value in (headers or {}).items():
+        name = name.lower()
+        if skip and name in skip:
+            continue
+        result[name] = value if len(value) <= MAX_HEADER_VALUE else value[:MAX_HEADER_VALUE] + "…"
+    return result
+
+
+def csp_hash(text: str) -> str:
+    """CSP source expression of an inline script ('sha256-<base64>')"""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return "sha256-" + base64.b64encode(digest).decode("ascii")
+
+
+# ════════════════════════════════════════════════════════════════════
+# NETWORK CAPTURE (one per page navigation)
+# ════════════════════════════════════════════════════════════════════
+
+class NetworkCapture:
+    """Bounded request/response capture via Playwright page events"""
+
+    def __init__(self, page, max_requests: int = MAX_NETWORK_REQUESTS):
+        self.page = page
+        self.max_requests = max_requests
+        self.entries: Dict[object, Dict] = {}  # request -> entry (insertion = start order)
+        self.dropped = 0
+
+        self.handlers = (
+            ("request", self._on_request),
+            ("response", self._on_response),
+            ("requestfinished", self._on_finished),
+            ("requestfailed", self._on_failed),
+        )
+        for event, handler in self.handlers:
+            self.page.on(event, handler)
+
+    def _on_request(self, request):
+        url = request.url
+        if url.startswith("data:"):
+            return
+        if len(self.entries) >= self.max_requests:
+            self.dropped += 1
+            return
+
+        entry = {
+            "url": url if len(url) <= MAX_URL_LENGTH else url[:MAX_URL_LENGTH],
+            "method": request.method,
+            "resourceType": request.resource_type,
+            "timestamp": int(time.time() * 1000),
+        }
+        headers = compact_headers(request.headers, DEFAULT_REQUEST_HEADERS)
+        if headers:
+            entry["headers"] = headers
+        self.entries[request] = entry
+
+    def _on_response(self, response):
+        entry = self.entries.get(response.request)
+        if entry is None:
+            return
+        entry["status"] = response.status
+        if entry["resourceType"] in RESPONSE_HEADER_TYPES:
+            entry["responseHeaders"] = compact_headers(response.headers)
+
+    def _on_finished(self, request):
+        entry = self.entries.get(request)
+        if entry is None:
+            return
+        timing = request.timing or {}
+        if timing.get("responseEnd", -1) >= 0:
+            entry["durationMs"] = round(timing["responseEnd"], 1)
+
+    def _on_failed(self, request):
+        entry = self.entries.get(request)
+        if entry is not None:
+            entry["failure"] = request.failure or "failed"
+
+    def detach(self):
+        """Remove the listeners (the page is reused by a PagePool)"""
+        for event, handler in self.handlers:
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+
+    def serialize(self) -> List[Dict]:
+        """networkRequests for the crawl result (TS NetworkRequest + extras)"""
+        return list(self.entries.values())
+
+    def summary(self) -> Dict:
+        """captured / dropped / failed + blocked (BlocklistRouter abort) / allowed"""
+        failures = [entry["failure"] for entry in self.entries.values() if "failure" in entry]
+        blocked = sum(1 for failure in failures if BLOCKED_FAILURE in failure)
+        return {
+            "captured": len(self.entries),
+            "dropped": self.dropped,
+            "failed": len(failures) - blocked,
+            "blocked": blocked,
+            "allowed": len(self.entries) - blocked,
+        }
+
+
+async def collect_scripts(page) -> Dict:
+    """
+    Script elements of the settled page:
+    {"scripts": [external src URLs], "inlineScripts": [{"hash", "type", "length"}]}
+    """
+    try:
+        found = await page.evaluate(SCRIPTS_SCRIPT, {
+            "maxInline": MAX_INLINE_SCRIPTS,
+            "maxBytes": MAX_INLINE_SCRIPT_BYTES,
+        })
+    except Exception:
+        return {"scripts": [], "inlineScripts": []}
+    return summarize_scripts(found)
+
+
+def summarize_scripts(found: Dict) -> Dict:
+    """In-page script lists ({"external", "inline"}) → scripts + hashed inlineScripts"""
+    inline_scripts = []
+    for script in found["inline"]:
+        inline_scripts.append({
+            "hash": csp_hash(script["text"]) if script["text"] is not None else None,
+            "type": script["type"],
+            "length": script["length"],
+        })
+
+    return {
+        "scripts": list(dict.fromkeys(found["external"])),  # de-duplicated, in order
+        "inlineScripts": inline_scripts,
+    }
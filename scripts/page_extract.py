@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Concurrent Page Data Extraction (Playwright)
+============================================
+
+A scan_with_playwright() navigáció után egymás után várta meg:
+page.content() → collect_scripts() → page.title() → context.cookies()
+→ response.security_details() → response.all_headers() - hat soros
+Playwright IPC kör minden egyes scannél.
+
+Helyette EGY lépés:
+
+1. Egyetlen page.evaluate() → kompakt payload: HTML (ugyanaz, mint a
+   page.content(): doctype + documentElement.outerHTML), title, URL,
+   script / link / meta listák (előre kinyerve, korlátozva)
+2. Vele PÁRHUZAMOSAN (asyncio.gather): context.cookies(),
+   response.security_details(), response.all_headers()
+3. Részidők (evaluate / cookies / security / headers / total ms) →
+   ExtractionStats (status képernyő: párhuzamos total vs részidők összege)
+
+Ha az evaluate elbukik (pl. kliens oldali redirect közben), visszaesik
+page.content() + page.title()-ra (script / link / meta listák nélkül).
+
+Usage:
+    from page_extract import extract_page_data, ExtractionStats
+
+    extracted = await extract_page_data(page, context, response)
+    extracted["html"], extracted["cookies"], extracted["securityDetails"], ...
+    stats.add(extracted)                 # extracted["timing"]
+"""
+
+import asyncio
+import time
+from typing import Dict
+
+from network_capture import MAX_INLINE_SCRIPTS, MAX_INLINE_SCRIPT_BYTES, summarize_scripts
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+MAX_LINKS = 300                  # <a href> + <link href> entries kept
+MAX_META = 100
+MAX_META_CONTENT = 512
+EXTRACT_PARTS = ["evaluate_ms", "cookies_ms", "security_ms", "headers_ms"]
+
+# In-page: everything the crawl result needs from the DOM in one round trip
+EXTRACT_SCRIPT = """
+({maxInline, maxBytes, maxLinks, maxMeta, maxMetaContent}) => {
+    let html = '';
+    if (document.doctype) html = new XMLSerializer().serializeToString(document.doctype);
+    if (document.documentElement) html += document.documentElement.outerHTML;
+
+    const external = [];
+    const inline = [];
+    for (const script of document.scripts) {
+        if (script.src) {
+            external.push(script.src);
+        } else if (inline.length < maxInline) {
+            const text = script.textContent || '';
+            inline.push({
+                type: script.type || 'text/javascript',
+                length: text.length,
+                text: text.length <= maxBytes ? text : null,
+            });
+        }
+    }
+
+    const links = [];
+    for (const element of document.querySelectorAll('a[href], link[href]')) {
+        if (links.length >= maxLinks) break;
+        links.push({
+            tag: element.localName,
+            href: typeof element.href === 'string' ? element.href : element.getAttribute('href'),
+            rel: element.getAttribute('rel') || '',
+        });
+    }
+
+    const meta = [];
+    for (const element of document.querySelectorAll('meta')) {
+        if (meta.length >= maxMeta) break;
+        const name = element.getAttribute('name') || element.getAttribute('property') ||
+                     element.getAttribute('http-equiv') || (element.hasAttribute('charset') ? 'charset' : '');
+        if (!name) continue;
+        const content = element.getAttribute('content') ?? element.getAttribute('charset') ?? '';
+        meta.push({name, content: content.slice(0, maxMetaContent)});
+    }
+
+    return {html, title: document.title, url: location.href, external, inline, links, meta};
+}
+"""
+
+
+async def _timed(timing: Dict, part: str, awaitable):
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timing[part] = round((time.perf_counter() - start) * 1000, 1)
+
+
+async def _evaluate_page(page) -> Dict:
+    """The in-page payload, or the page.content() / page.title() fallback"""
+    try:
+        return await page.evaluate(EXTRACT_SCRIPT, {
+            "maxInline": MAX_INLINE_SCRIPTS,
+            "maxBytes": MAX_INLINE_SCRIPT_BYTES,
+            "maxLinks": MAX_LINKS,
+            "maxMeta": MAX_META,
+            "maxMetaContent": MAX_META_CONTENT,
+        })
+    except Exception:
+        # Execution context destroyed (client-side redirect) → page.content() waits it out
+        html = await page.content()
+        return {"html": html, "title": await page.title(), "url": page.url,
+                "external": [], "inline": [], "links": [], "meta": [], "fallback": True}
+
+
+async def _resolved(value):
+    return value
+
+
+async def extract_page_data(page, context, response) -> Dict:
+    """
+    Page data of a settled navigation, gathered concurrently
+
+    Returns: {"html", "title", "url", "scripts", "inlineScripts", "links",
+              "metaTags", "cookies", "securityDetails", "headers",
+              "fallback", "timing": {evaluate_ms, cookies_ms, security_ms,
+              headers_ms, total_ms}}
+    """
+    timing: Dict[str, float] = {}
+    start = time.perf_counter()
+
+    found, cookies, security_details, headers = await asyncio.gather(
+        _timed(timing, "evaluate_ms", _evaluate_page(page)),
+        _timed(timing, "cookies_ms", context.cookies()),
+        _timed(timing, "security_ms", response.security_details() if response else _resolved(None)),
+        _timed(timing, "headers_ms", response.all_headers() if response else _resolved({})),
+    )
+    timing["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+
+    scripts = summarize_scripts(found)
+    return {
+        "html": found["html"],
+        "title": found["title"],
+        "url": found["url"],
+        "scripts": scripts["scripts"],
+        "inlineScripts": scripts["inlineScripts"],
+        "links": found["links"],
+        "metaTags": found["meta"],
+        "cookies": cookies,
+        "securityDetails": security_details,
+        "headers": headers,  # all_headers(): Set-Cookie / CSP included
+        "fallback": found.get("fallback", False),
+        "timing": timing,
+    }
+
+
+class ExtractionStats:
+    """Aggregated extraction times (mean per part vs. the concurrent total)"""
+
+    def __init__(self):
+        self.pages = 0
+        self.fallbacks = 0
+        self.sums = {part: 0.0 for part in EXTRACT_PARTS + ["total_ms"]}
+        self.max_ms = 0.0
+
+    def add(self, extracted: Dict):
+        timing = extracted["timing"]
+        self.pages += 1
+        self.fallbacks += 1 if extracted.get("fallback") else 0
+        for part in self.sums:
+            self.sums[part] += timing.get(part, 0.0)
+        self.max_ms = max(self.max_ms, timing["total_ms"])
+
+    def summary(self) -> Dict:
+        means = {part: round(total / self.pages, 1) if self.pages else 0.0
+                 for part, total in self.sums.items()}
+        return {"pages": self.pages, "fallbacks": self.fallbacks,
+                "max_ms": round(self.max_ms, 1), "mean": means}
+
+    def summary_line(self) -> str:
+        if not self.pages:
+            return "no pages yet"
+        mean = self.summary()["mean"]
+        parts = " | ".join(f"{part[:-3]} {mean[part]:.0f}" for part in EXTRACT_PARTS)
+        parts_sum = sum(mean[part] for part in EXTRACT_PARTS)
+        return (f"avg {mean['total_ms']:.0f}ms (parts sum {parts_sum:.0f}ms) | {parts} | "
+                f"max {self.max_ms:.0f}ms | fallbacks {self.fallbacks}")
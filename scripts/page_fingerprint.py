@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Parked / Placeholder Page Fingerprinting
+========================================
+
+A bulk domainek jelentős része regisztrátor parking oldal vagy hosting
+placeholder - mégis megkapták a teljes Playwright crawl-t ÉS mind a
+40+ TypeScript analyzert.
+
+Ez a modul az első fetch után eldönti, hogy az oldal parking/placeholder-e:
+
+1. SimHash (64 bit) a normalizált oldalról (látható szöveg + tag struktúra,
+   a domain neve kicserélve → ugyanaz a template más domainen is egyezik)
+2. LSH index ismert template-ekre (8 × 8 bites band → Hamming ≤ 7 jelöltek)
+3. Marker szabályok - egyetlen szó soha nem elég (egy "cPanel and WHM
+   consulting" vagy egy Afternic-et említő broker oldal valódi site):
+   - parking: regisztrátor-specifikus marker (pl. "sedoparking",
+     "parkingpage.namecheap.com") + pici oldal + a title a domain maga /
+     eladásra kínálja ("for sale")
+   - placeholder: szerver default title (pl. "Welcome to nginx!") + pici oldal
+   A marker találatok NEM kerülnek az indexbe - template csak kézzel
+   (CLI add) vehető fel.
+
+Találat esetén az orchestrator (turbo-master-scanner.py record_parked())
+a scant rögtön COMPLETED / scanType=PARKED-re állítja, üres findings-szel
+és a teljesült jelekkel ("reason") a metadata-ban - analysis worker nélkül.
+
+Usage (orchestratorból):
+    from page_fingerprint import ParkedPageIndex
+
+    index = ParkedPageIndex()
+    match = index.classify(html, domain)
+    if match:
+        ...  # COMPLETED / PARKED, no analysis worker (match["reason"] → metadata)
+
+CLI:
+    python3 page_fingerprint.py add <label> page.html [domain]   # template felvétele
+    python3 page_fingerprint.py check page.html [domain]         # teszt
+    python3 page_fingerprint.py list
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+PARKED_TEMPLATES_FILE = "parked-templates.json"
+MAX_DISTANCE = 4             # Hamming distance (of 64 bits) to count as the same template
+BANDS = 8                    # LSH bands (8 × 8 bits → any distance ≤ 7 shares a band)
+MAX_TEXT_LENGTH = 6000       # Larger visible text → real site, skip fingerprinting
+SHINGLE_SIZE = 3             # Word shingles
+
+PARKED_MAX_TEXT = 1500       # Marker rules: visible text of a parking / placeholder page is tiny
+
+# Registrar / parking provider specific markers (one signal of three: + tiny page + title)
+PARKING_MARKERS = [
+    ("sedo", ["sedoparking", "sedo.com/search/details"]),
+    ("parkingcrew", ["parkingcrew.net", "parkingcrew.com"]),
+    ("bodis", ["bodis.com/", "bodiscdn"]),
+    ("afternic", ["afternic.com/forsale", "afternic.com/domain/"]),
+    ("dan.com", ["dan.com/buy-domain", "this domain is for sale on dan.com"]),
+    ("hugedomains", ["hugedomains.com/domain_profile", "hugedomains.com/domain/"]),
+    ("godaddy-parked", ["parked free, courtesy of godaddy", "img1.wsimg.com/parking-lander"]),
+    ("namecheap-parked", ["parkingpage.namecheap.com"]),
+]
+# Title signal: the page offers the domain itself (besides title == domain)
+SALE_TITLE_PHRASES = ["for sale", "buy this domain", "domain parked", "is parked", "parked domain"]
+# Server / panel default page titles (+ tiny page)
+PLACEHOLDER_TITLE_MARKERS = [
+    ("apache-default", ["apache2 ubuntu default page", "apache2 debian default page", "test page for the apache http server"]),
+    ("nginx-default", ["welcome to nginx!", "test page for the nginx http server"]),
+    ("iis-default", ["iis windows server", "iis7", "iis8"]),
+    ("cpanel-default", ["future home of something quite cool", "default web site page"]),
+    ("plesk-default", ["domain default page"]),
+]
+
+SCRIPT_STYLE_PATTERN = re.compile(r"<(script|style|noscript)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+TAG_PATTERN = re.compile(r"<\s*(/?)\s*([a-zA-Z][a-zA-Z0-9]*)[^>]*>")
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+WORD_PATTERN = re.compile(r"[a-z0-9{}]+")
+DIGITS_PATTERN = re.compile(r"\d+")
+
+
+# ════════════════════════════════════════════════════════════════════
+# SIMHASH
+# ════════════════════════════════════════════════════════════════════
+
+def visible_text(html: str) -> str:
+    """Lowercased visible text (scripts/styles/tags removed)"""
+    text = SCRIPT_STYLE_PATTERN.sub(" ", html)
+    text = TAG_PATTERN.sub(" ", text)
+    return " ".join(text.split()).lower()
+
+
+def page_tokens(html: str, text: str, domain: str = "") -> List[str]:
+    """
+    Template tokens: visible words (+ tag structure), domain-independent
+
+    The domain (and its first label) is replaced by "{domain}", digits by "0" -
+    parking templates differ only in these between domains.
+    """
+    if domain:
+        domain = domain.lower().replace("https://", "").replace("http://", "").split("/")[0]
+        for name in sorted({domain, domain.split(".")[0]}, key=len, reverse=True):
+            if len(name) >= 3:
+                text = text.replace(name, "{domain}")
+    text = DIGITS_PATTERN.sub("0", text)
+
+    words = WORD_PATTERN.findall(text)
+    shingles = [" ".join(words[i:i + SHINGLE_SIZE])
+                for i in range(max(1, len(words) - SHINGLE_SIZE + 1))] if words else []
+
+    # Tag structure (open/close + name) - JS-only parking shells have little text
+    tags = [f"<{slash}{name.lower()}" for slash, name in TAG_PATTERN.findall(html)]
+    return shingles + tags
+
+
+def simhash(tokens: List[str]) -> int:
+    """64-bit SimHash of a token list"""
+    weights = [0] * 64
+    for token in tokens:
+        h = int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            if h >> bit & 1:
+                weights[bit] += 1
+            else:
+                weights[bit] -= 1
+
+    value = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            value |= 1 << bit
+    return value
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def bands_of(value: int) -> List[str]:
+    """LSH band keys ("<band index>:<band bits>")"""
+    width = 64 // BANDS
+    mask = (1 << width) - 1
+    return [f"{i}:{(value >> (i * width)) & mask}" for i in range(BANDS)]
+
+
+# ════════════════════════════════════════════════════════════════════
+# TEMPLATE INDEX
+# ════════════════════════════════════════════════════════════════════
+
+class ParkedPageIndex:
+    """
+    SimHash index of known parking / placeholder templates (JSON on disk)
+
+    Template: {"simhash": "<hex>", "label": ..., "source": "seed", "hits": n}
+    """
+
+    def __init__(self, path: str = PARKED_TEMPLATES_FILE):
+        self.path = path
+        self.templates: List[Dict] = []
+        self.bands: Dict[str, List[int]] = {}  # band key -> template indexes
+        self.new_hits: Dict[str, int] = {}  # simhash -> hits since the last save (merged into the file)
+        self.dirty = False
+        self.stats = {
+            "checked": 0,
+            "parked": 0,
+            "by_marker": 0,
+            "by_simhash": 0,
+            "skipped_large": 0,
+        }
+        self.load()
+
+    def load(self):
+        for template in self._read_file():
+            self._index(template)
+
+    def _read_file(self) -> List[Dict]:
+        """Templates of the on-disk copy ([] if missing / unreadable)"""
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, 'r') as f:
+                templates = json.load(f)
+        except (OSError, ValueError):
+            return []
+        if not isinstance(templates, list):
+            return []
+        return [t for t in templates if isinstance(t, dict) and "simhash" in t]
+
+    def save(self) -> bool:
+        """
+        Merge with the on-disk copy + atomic write
+
+        Several processes (turbo-master-scanner.py --shards) share the file:
+        per-process tmp file, templates added elsewhere are kept and hit
+        counters add up (only this process' new hits are added). A failed
+        save is reported, not raised (False, retried next time).
+        """
+        if not self.dirty:
+            return True
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            merged = {t["simhash"]: t for t in self._read_file()}
+            for template in self.templates:
+                on_disk = merged.get(template["simhash"])
+                if on_disk is None:
+                    merged[template["simhash"]] = dict(template)
+                else:
+                    on_disk["hits"] = on_disk.get("hits", 0) + self.new_hits.get(template["simhash"], 0)
+            templates = list(merged.values())
+
+            with open(tmp_path, 'w') as f:
+                json.dump(templates, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️  Parked template save failed ({self.path}): {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+
+        self.templates = []
+        self.bands = {}
+        for template in templates:
+            self._index(template)
+        self.new_hits = {}
+        self.dirty = False
+        return True
+
+    def _index(self, template: Dict):
+        position = len(self.templates)
+        self.templates.append(template)
+        for key in bands_of(int(template["simhash"], 16)):
+            self.bands.setdefault(key, []).append(position)
+
+    def add(self, value: int, label: str, source: str = "seed") -> Dict:
+        """Add a template (no-op if an equivalent one is already indexed)"""
+        existing = self.nearest(value)
+        if existing:
+            return existing[0]
+
+        template = {
+            "simhash": f"{value:016x}",
+            "label": label,
+            "source": source,
+            "hits": 0,
+            "added": time.strftime("%Y-%m-%d"),
+        }
+        self._index(template)
+        self.dirty = True
+        return template
+
+    def nearest(self, value: int) -> Optional[tuple]:
+        """(template, distance) of the closest template within MAX_DISTANCE"""
+        best = None
+        seen = set()
+        for key in bands_of(value):
+            for position in self.bands.get(key, []):
+                if position in seen:
+                    continue
+                seen.add(position)
+                template = self.templates[position]
+                distance = hamming(value, int(template["simhash"], 16))
+                if distance <= MAX_DISTANCE and (best is None or distance < best[1]):
+                    best = (template, distance)
+        return best
+
+    @staticmethod
+    def match_markers(html: str, text: str, domain: str = "") -> Optional[tuple]:
+        """
+        (label, reason) when every signal of a marker rule holds, or None
+
+        Parking: registrar marker + tiny page + title is the domain / a sale
+        offer. Placeholder: server default title + tiny page.
+        """
+        if len(text) > PARKED_MAX_TEXT:
+            return None
+        tiny = f"tiny-page:{len(text)}"
+
+        title_match = TITLE_PATTERN.search(html)
+        title = " ".join(title_match.group(1).split()).lower() if title_match else ""
+
+        for label, markers in PLACEHOLDER_TITLE_MARKERS:
+            marker = next((m for m in markers if title.startswith(m)), None)
+            if marker:
+                return label, [f"default-title:{marker}", tiny]
+
+        host = domain.lower().split("://")[-1].split("/")[0]
+        host = host[4:] if host.startswith("www.") else host
+        if host and title.strip(" .") in (host, f"www.{host}"):
+            title_signal = "title:domain"
+        else:
+            phrase = next((p for p in SALE_TITLE_PHRASES if p in title), None)
+            if not phrase:
+                return None
+            title_signal = f"title:{phrase}"
+
+        html_lower = html.lower()
+        for label, markers in PARKING_MARKERS:
+            marker = next((m for m in markers if m in html_lower), None)
+            if marker:
+                return label, [f"marker:{marker}", tiny, title_signal]
+        return None
+
+    def classify(self, html: str, domain: str = "") -> Optional[Dict]:
+        """
+        Parked / placeholder check
+
+        Returns {"label", "method", "distance", "simhash", "reason"} or None
+        (real site). Marker hits are never added to the index.
+        """
+        self.stats["checked"] += 1
+
+        text = visible_text(html)
+        if len(text) > MAX_TEXT_LENGTH:
+            self.stats["skipped_large"] += 1
+            return None
+
+        value = simhash(page_tokens(html, text, domain))
+
+        found = self.nearest(value)
+        if found:
+            template, distance = found
+            template["hits"] = template.get("hits", 0) + 1
+            self.new_hits[template["simhash"]] = self.new_hits.get(template["simhash"], 0) + 1
+            self.dirty = True
+            self.stats["parked"] += 1
+            self.stats["by_simhash"] += 1
+            return {"label": template["label"], "method": "simhash", "distance": distance,
+                    "simhash": f"{value:016x}", "reason": [f"template:{template['simhash']}"]}
+
+        matched = self.match_markers(html, text, domain)
+        if matched:
+            label, reason = matched
+            self.stats["parked"] += 1
+            self.stats["by_marker"] += 1
+            return {"label": label, "method": "marker", "distance": None,
+                    "simhash": f"{value:016x}", "reason": reason}
+
+        return None
+
+
+# ════════════════════════════════════════════════════════════════════
+# MAIN (template management)
+# ════════════════════════════════════════════════════════════════════
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ("add", "check", "list"):
+        print("Usage:")
+        print("  python3 page_fingerprint.py add <label> page.html [domain]")
+        print("  python3 page_fingerprint.py check page.html [domain]")
+        print("  python3 page_fingerprint.py list")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    index = ParkedPageIndex()
+
+    if command == "list":
+        for template in index.templates:
+            print(f"  {template['simhash']}  {template['label']:<20} {template['source']:<8} hits: {template.get('hits', 0)}")
+        print(f"✓ {len(index.templates)} templates in {index.path}")
+        return
+
+    if command == "add":
+        if len(sys.argv) < 4:
+            print("Usage: python3 page_fingerprint.py add <label> page.html [domain]")
+            sys.exit(1)
+        label, html_file = sys.argv[2], sys.argv[3]
+        domain = sys.argv[4] if len(sys.argv) > 4 else ""
+        with open(html_file, 'r', encoding='utf-8', errors='replace') as f:
+            html = f.read()
+        template = index.add(simhash(page_tokens(html, visible_text(html), domain)), label)
+        index.save()
+        print(f"✓ Template {template['simhash']} ({template['label']})")
+        return
+
+    html_file = sys.argv[2]
+    domain = sys.argv[3] if len(sys.argv) > 3 else ""
+    with open(html_file, 'r', encoding='utf-8', errors='replace') as f:
+        html = f.read()
+    match = index.classify(html, domain)
+    print(json.dumps(match) if match else "Not parked")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Pre-Warmed Page Pool (Playwright)
+=================================
+
+A ContextPool újrahasznosítja a contextet, de minden scan eddig
+context.new_page()-et hívott, ÉS minden alkalommal új
+page.route('**/*', ...) handlert telepített → scan-enkénti setup költség.
+
+Ez a pool contextenként EGY meleg page-et tart:
+
+- A route handler (resource blocking) egyszer települ, a page létrehozásakor
+- Scan után: about:blank (DOM / JS állapot eldobva), a popup page-ek bezárva
+- Crash / bezárt / reset hiba → a page eldobva, a következő acquire újat hoz létre
+- Acquire latency mérés (warm hit vs. új page) → látszik a setup idő eltűnése
+
+Usage:
+    from page_pool import PagePool
+
+    page_pool = PagePool()                      # route_handler=... → per-page route (optional)
+    await page_pool.warm(context)               # context létrehozásakor (opcionális)
+
+    page = await page_pool.acquire(context)
+    try:
+        await page.goto(url)
+        ...
+        await page_pool.release(context, page)
+    except Exception:
+        await page_pool.release(context, page, broken=True)
+
+    page_pool.forget(context)                   # context bezárása előtt
+"""
+
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+RESET_URL = "about:blank"
+RESET_TIMEOUT_MS = 5000
+
+
+class PagePool:
+    """One warm, pre-routed page per browser context"""
+
+    def __init__(self, route_handler: Optional[Callable] = None, route_pattern: str = "**/*"):
+        self.route_handler = route_handler
+        self.route_pattern = route_pattern
+        self.idle: Dict[object, object] = {}  # context -> warm Page
+        self.crashed = set()                  # pages that emitted "crash"
+        self.crashed_contexts = set()         # contexts whose page crashed (→ retire the context)
+        self.stats = {
+            "acquired": 0,
+            "warm_hits": 0,
+            "created": 0,
+            "recycled": 0,        # crashed / closed / failed reset → replaced
+            "reset_failures": 0,
+            "acquire_ms_total": 0.0,
+            "acquire_ms_max": 0.0,
+            "reset_ms_total": 0.0,
+            "resets": 0,
+        }
+
+    async def _create_page(self, context):
+        """New page with the route handler installed (the only per-page setup)"""
+        page = await context.new_page()
+        page.on("crash", lambda crashed_page=page: self._on_crash(crashed_page, context))
+        if self.route_handler is not None:
+            await page.route(self.route_pattern, self.route_handler)
+        self.stats["created"] += 1
+        return page
+
+    def _on_crash(self, page, context):
+        self.crashed.add(page)
+        self.crashed_contexts.add(context)
+
+    def _usable(self, page) -> bool:
+        return page is not None and page not in self.crashed and not page.is_closed()
+
+    async def warm(self, context):
+        """Pre-create the warm page of a (new) context"""
+        if context not in self.idle:
+            self.idle[context] = await self._create_page(context)
+
+    async def acquire(self, context):
+        """Warm page of this context (a new one if missing / crashed)"""
+        start = time.perf_counter()
+
+        page = self.idle.pop(context, None)
+        if self._usable(page):
+            self.stats["warm_hits"] += 1
+        else:
+            if page is not None:
+                await self._discard(page)
+            page = await self._create_page(context)
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.stats["acquired"] += 1
+        self.stats["acquire_ms_total"] += elapsed_ms
+        self.stats["acquire_ms_max"] = max(self.stats["acquire_ms_max"], elapsed_ms)
+        return page
+
+    async def release(self, context, page, broken: bool = False):
+        """
+        Reset the page to about:blank and keep it warm for the next scan
+
+        broken=True (or a crash / failed reset) → the page is closed instead.
+        Popups the scanned site opened in this context are closed either way.
+        """
+        for other in list(context.pages):
+            if other is not page:
+                try:
+                    await other.close()
+                except Exception:
+                    pass
+
+        if broken or not self._usable(page):
+            await self._discard(page)
+            return
+
+        start = time.perf_counter()
+        try:
+            await page.goto(RESET_URL, timeout=RESET_TIMEOUT_MS)
+        except Exception:
+            self.stats["reset_failures"] += 1
+            await self._discard(page)
+            return
+
+        self.stats["resets"] += 1
+        self.stats["reset_ms_total"] += (time.perf_counter() - start) * 1000
+        self.idle[context] = page
+
+    async def _discard(self, page):
+        self.stats["recycled"] += 1
+        self.crashed.discard(page)
+        try:
+            if not page.is_closed():
+                await page.close()
+        except Exception:
+            pass
+
+    def forget(self, context):
+        """Drop the warm page of a context that is about to be closed"""
+        self.crashed_contexts.discard(context)
+        page = self.idle.pop(context, None)
+        if page is not None:
+            self.crashed.discard(page)
+
+    def get_stats(self) -> dict:
+        """Counters + average acquire / reset latency (ms)"""
+        stats = dict(self.stats)
+        stats["acquire_ms_avg"] = round(stats["acquire_ms_total"] / stats["acquired"], 2) if stats["acquired"] else 0.0
+        stats["reset_ms_avg"] = round(stats["reset_ms_total"] / stats["resets"], 2) if stats["resets"] else 0.0
+        stats["warm_hit_rate"] = round(stats["warm_hits"] / stats["acquired"], 3) if stats["acquired"] else 0.0
+        stats["acquire_ms_max"] = round(stats["acquire_ms_max"], 2)
+        del stats["acquire_ms_total"], stats["reset_ms_total"]
+        return stats
+
+    async def close_all(self):
+        """Close every idle warm page"""
+        pages = list(self.idle.values())
+        self.idle.clear()
+        self.crashed.clear()
+        self.crashed_contexts.clear()
+        await asyncio.gather(*[page.close() for page in pages if not page.is_closed()],
+                             return_exceptions=True)
@@ -14,7 +14,6 @@ USAGE:
 """
 
 import requests
-import psycopg2
 import time
 import sys
 import json
@@ -25,6 +24,8 @@ from datetime import datetime
 from typing import Dict, List
 from queue import Queue
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from scanner_db import ScannerDB
+from scan_counters import STATUS_COUNTS_SQL, CounterWindow, status_counts
 
 # ════════════════════════════════════════════════════════════════════
 # CONFIGURATION
@@ -77,6 +78,9 @@ stats = {
 }
 stats_lock = threading.Lock()
 
+# Shared pooled DB access (no connect / close per helper call)
+db = ScannerDB(DB_URL)
+
 def signal_handler(sig, frame):
     """Ctrl+C handler"""
     global running
@@ -91,33 +95,23 @@ signal.signal(signal.SIGINT, signal_handler)
 # DATABASE
 # ════════════════════════════════════════════════════════════════════
 
+# PENDING és SCANNING: NINCS időszűrő - MINDEN aktív scan számít!
+# COMPLETED és FAILED: csak utolsó 1 óra (statisztikához) - számláló pillanatképek különbsége
+# Trigger-maintained counters (ScanStatusCounter): O(1), no COUNT(*) over "Scan"
+STATUS_COUNTS = db.statement("status_counts", STATUS_COUNTS_SQL)
+finished_last_hour = CounterWindow(3600)
+
 def get_queue_status() -> Dict:
     """Get current queue status"""
     try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-
-        # PENDING és SCANNING: NINCS időszűrő - MINDEN aktív scan számít!
-        # COMPLETED és FAILED: csak utolsó 1 óra (statisztikához)
-        cur.execute("""
-            SELECT
-                (SELECT COUNT(*) FROM "Scan" WHERE status = 'PENDING') as pending,
-                (SELECT COUNT(*) FROM "Scan" WHERE status = 'SCANNING') as scanning,
-                COUNT(*) FILTER (WHERE status = 'COMPLETED') as completed,
-                COUNT(*) FILTER (WHERE status = 'FAILED') as failed
-            FROM "Scan"
-            WHERE "createdAt" > NOW() - INTERVAL '1 hour'
-        """)
-        
-        row = cur.fetchone()
-        cur.close()
-        conn.close()
-        
+        counts = status_counts(db.fetchall(STATUS_COUNTS))
+        finished = finished_last_hour.update(counts)
+
         return {
-            'pending': row[0] or 0,
-            'scanning': row[1] or 0,
-            'completed': row[2] or 0,
-            'failed': row[3] or 0
+            'pending': counts['pending'],
+            'scanning': counts['scanning'],
+            'completed': finished['completed'],
+            'failed': finished['failed']
         }
     except Exception as e:
         print(f"❌ DB Error: {e}")
@@ -126,41 +120,36 @@ def get_queue_status() -> Dict:
 def cleanup_stuck_scans(timeout_seconds: int = 120) -> int:
     """Clean up scans stuck in SCANNING status for more than timeout_seconds"""
     try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-
-        # Find stuck SCANNING scans
-        cur.execute("""
-            SELECT COUNT(*)
-            FROM "Scan"
-            WHERE status = 'SCANNING'
-            AND "createdAt" < NOW() - make_interval(secs => %s)
-        """, (timeout_seconds,))
-
-        stuck_count = cur.fetchone()[0]
-
-        if stuck_count > 0:
-            # Update stuck scans to FAILED
+        with db.transaction() as cur:
+            # Find stuck SCANNING scans
             cur.execute("""
-                UPDATE "Scan"
-                SET
-                    status = 'FAILED',
-                    "completedAt" = NOW(),
-                    error = jsonb_build_object(
-                        'error', 'Scan timeout',
-                        'message', 'Scan exceeded maximum allowed time (' || %s || 's) and was automatically cleaned up',
-                        'cleanedUpAt', NOW()::text
-                    )
+                SELECT COUNT(*)
+                FROM "Scan"
                 WHERE status = 'SCANNING'
                 AND "createdAt" < NOW() - make_interval(secs => %s)
-            """, (timeout_seconds, timeout_seconds))
+            """, (timeout_seconds,))
+
+            stuck_count = cur.fetchone()[0]
+
+            if stuck_count > 0:
+                # Update stuck scans to FAILED
+                cur.execute("""
+                    UPDATE "Scan"
+                    SET
+                        status = 'FAILED',
+                        "completedAt" = NOW(),
+                        error = jsonb_build_object(
+                            'error', 'Scan timeout',
+                            'message', 'Scan exceeded maximum allowed time (' || %s || 's) and was automatically cleaned up',
+                            'cleanedUpAt', NOW()::text
+                        )
+                    WHERE status = 'SCANNING'
+                    AND "createdAt" < NOW() - make_interval(secs => %s)
+                """, (timeout_seconds, timeout_seconds))
 
-            conn.commit()
+        if stuck_count > 0:
             print(f"  🧹 Cleaned up {stuck_count} stuck SCANNING scans (older than {timeout_seconds}s)")
 
-        cur.close()
-        conn.close()
-
         return stuck_count
 
     except Exception as e:
@@ -216,40 +205,35 @@ def wait_for_internet() -> None:
 def cleanup_stuck_pending(timeout_seconds: int = 300) -> int:
     """Clean up scans stuck in PENDING status for more than timeout_seconds (default 5 min)"""
     try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
+        with db.transaction() as cur:
+            # Find stuck PENDING scan IDs
+            cur.execute("""
+                SELECT id
+                FROM "Scan"
+                WHERE status = 'PENDING'
+                AND "createdAt" < NOW() - make_interval(secs => %s)
+            """, (timeout_seconds,))
 
-        # Find stuck PENDING scan IDs
-        cur.execute("""
-            SELECT id
-            FROM "Scan"
-            WHERE status = 'PENDING'
-            AND "createdAt" < NOW() - make_interval(secs => %s)
-        """, (timeout_seconds,))
+            stuck_scan_ids = [row[0] for row in cur.fetchall()]
+            stuck_count = len(stuck_scan_ids)
 
-        stuck_scan_ids = [row[0] for row in cur.fetchall()]
-        stuck_count = len(stuck_scan_ids)
+            if stuck_count > 0:
+                # Delete Jobs that reference these Scans (by scanId in data JSON)
+                cur.execute("""
+                    DELETE FROM "Job"
+                    WHERE data->>'scanId' = ANY(%s)
+                """, (stuck_scan_ids,))
+                jobs_deleted = cur.rowcount
 
-        if stuck_count > 0:
-            # Delete Jobs that reference these Scans (by scanId in data JSON)
-            cur.execute("""
-                DELETE FROM "Job"
-                WHERE data->>'scanId' = ANY(%s)
-            """, (stuck_scan_ids,))
-            jobs_deleted = cur.rowcount
+                # Delete the stuck PENDING scans
+                cur.execute("""
+                    DELETE FROM "Scan"
+                    WHERE id = ANY(%s)
+                """, (stuck_scan_ids,))
 
-            # Delete the stuck PENDING scans
-            cur.execute("""
-                DELETE FROM "Scan"
-                WHERE id = ANY(%s)
-            """, (stuck_scan_ids,))
-
-            conn.commit()
+        if stuck_count > 0:
             print(f"  🗑️ Deleted {stuck_count} stuck PENDING scans + {jobs_deleted} orphan jobs (older than {timeout_seconds}s)")
 
-        cur.close()
-        conn.close()
-
         return stuck_count
 
     except Exception as e:
@@ -461,6 +445,7 @@ def run_parallel_scanner(domain_file: str):
                 print(f"    🗑️ Deleted: {pending_cleaned} stuck PENDING (>5min)")
             if workers_killed > 0:
                 print(f"    ☠️ Killed: {workers_killed} stuck workers (>120s)")
+            print(f"  🗄️  DB pool: {db.summary_line()}")
             print("─" * 80)
             
             if scans_to_create == 0:
@@ -517,6 +502,7 @@ def run_parallel_scanner(domain_file: str):
     print("═" * 80 + "\n")
     
     save_progress()
+    db.close()
 
 # ════════════════════════════════════════════════════════════════════
 # ENTRY POINT
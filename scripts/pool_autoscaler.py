@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Autoscaling for the Browser Context Pool
+========================================
+
+A pool méret eddig kézzel választott konstans volt egy adott gépre
+(MAX_PARALLEL_CONTEXTS = 12 "M4 Pro", MAX_WORKERS = 100 "i9 24-core") →
+laptopon túlterhelt, a 24 magos szervereken kihasználatlan.
+
+Ez a modul:
+
+1. Host alapú határok: magok × CONTEXTS_PER_CORE (kezdő méret), a felső
+   határ a szabad memóriából is (CONTEXT_MEMORY_MB / context)
+2. Mérés a poolban: acquire várakozás (ms), context bérlési idő (busy s),
+   kihasználtság = ∫ busy dt / ∫ size dt az utolsó döntés óta
+3. Döntés AUTOSCALE_INTERVAL-onként (SCALE_STEP lépés, határok között):
+   - host CPU > CPU_HIGH vagy memória > MEMORY_HIGH → csökkentés
+   - kihasználtság ≥ cél, vagy az acquire p90 várakozás > WAIT_HIGH_MS,
+     és van CPU / memória tartalék → növelés
+   - kihasználtság < cél / 2 → csökkentés
+   - különben marad
+
+Usage:
+    from pool_autoscaler import PoolAutoscaler, host_pool_bounds
+
+    bounds = host_pool_bounds()                      # {"min", "initial", "max"}
+    autoscaler = PoolAutoscaler(bounds["min"], bounds["max"])
+    autoscaler.record_acquire(wait_ms)               # pool.acquire()
+    autoscaler.record_lease(busy_seconds)            # pool.release()
+    autoscaler.busy_changed(busy, size)              # minden acquire / release
+    new_size = autoscaler.decide(size)               # None → marad
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import psutil
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+CONTEXTS_PER_CORE = 0.85     # Initial size (the old "14 cores * 0.85 = 12" rule)
+MAX_CONTEXTS_PER_CORE = 2.0  # Upper bound (most of a scan is network wait)
+CONTEXT_MEMORY_MB = 300      # Budget per context (renderer + browser share)
+MEMORY_BUDGET = 0.7          # Share of the available memory the pool may plan for
+MIN_CONTEXTS = 2
+
+AUTOSCALE_INTERVAL = 20      # Seconds between decisions
+TARGET_UTILIZATION = 0.75    # Busy share of the pool to aim for
+SCALE_STEP = 2               # Contexts added / removed per decision
+WAIT_HIGH_MS = 250           # p90 acquire wait above this → pool is the bottleneck
+CPU_HIGH = 85                # Host CPU % → shrink
+CPU_HEADROOM = 70            # Host CPU % below which growing is allowed
+MEMORY_HIGH = 85             # Host memory % → shrink
+MEMORY_HEADROOM = 75         # Host memory % below which growing is allowed
+WAIT_SAMPLES = 512           # Acquire waits kept per decision window
+
+MB = 1024 * 1024
+
+
+def host_pool_bounds(shards: int = 1) -> Dict[str, int]:
+    """
+    Context pool bounds derived from this host (per shard)
+
+    Returns: {"min", "initial", "max"}
+    """
+    cores = psutil.cpu_count() or 1
+    memory_cap = int(psutil.virtual_memory().available / MB * MEMORY_BUDGET / CONTEXT_MEMORY_MB)
+
+    maximum = max(MIN_CONTEXTS, min(int(cores * MAX_CONTEXTS_PER_CORE), memory_cap)) // shards
+    maximum = max(1, maximum)
+    initial = max(1, min(int(cores * CONTEXTS_PER_CORE) // shards, maximum))
+    return {"min": min(MIN_CONTEXTS, initial), "initial": initial, "max": maximum}
+
+
+class PoolAutoscaler:
+    """Grows / shrinks a context pool between bounds to hit a target utilization"""
+
+    def __init__(self, min_size: int, max_size: int,
+                 target_utilization: float = TARGET_UTILIZATION,
+                 interval: float = AUTOSCALE_INTERVAL):
+        self.min_size = min_size
+        self.max_size = max(min_size, max_size)
+        self.target = target_utilization
+        self.interval = interval
+
+        psutil.cpu_percent(interval=None)  # Prime the non-blocking CPU measurement
+        self._reset_window(time.monotonic())
+        self.last_metrics: Dict = {}
+        self.stats = {"grown": 0, "shrunk": 0, "decisions": 0}
+
+    def _reset_window(self, now: float):
+        self.window_start = now
+        self.last_change = now
+        self.busy = 0
+        self.size = 0
+        self.busy_integral = 0.0
+        self.size_integral = 0.0
+        self.waits: List[float] = []
+        self.acquires = 0
+        self.lease_total = 0.0
+        self.leases = 0
+
+    def _advance(self, now: float):
+        elapsed = now - self.last_change
+        self.busy_integral += self.busy * elapsed
+        self.size_integral += self.size * elapsed
+        self.last_change = now
+
+    # ── Measurements (called by the pool) ───────────────────────────
+
+    def busy_changed(self, busy: int, size: int):
+        """Busy context count / pool size changed (acquire, release, resize)"""
+        self._advance(time.monotonic())
+        self.busy = busy
+        self.size = size
+
+    def record_acquire(self, wait_ms: float):
+        self.acquires += 1
+        if len(self.waits) < WAIT_SAMPLES:
+            self.waits.append(wait_ms)
+
+    def record_lease(self, busy_seconds: float):
+        self.lease_total += busy_seconds
+        self.leases += 1
+
+    # ── Decision ────────────────────────────────────────────────────
+
+    def window_metrics(self, now: float) -> Dict:
+        """Utilization / acquire wait / lease time / host load of the current window"""
+        self._advance(now)
+        waits = sorted(self.waits)
+        return {
+            "utilization": round(self.busy_integral / self.size_integral, 3) if self.size_integral else 0.0,
+            "acquires": self.acquires,
+            "wait_ms_avg": round(sum(waits) / len(waits), 1) if waits else 0.0,
+            "wait_ms_p90": round(waits[min(len(waits) - 1, int(len(waits) * 0.9))], 1) if waits else 0.0,
+            "lease_s_avg": round(self.lease_total / self.leases, 2) if self.leases else 0.0,
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": psutil.virtual_memory().percent,
+        }
+
+    def decide(self, current_size: int) -> Optional[int]:
+        """
+        New pool size once per interval (None → keep the current size)
+        """
+        now = time.monotonic()
+        if now - self.window_start < self.interval:
+            return None
+
+        metrics = self.window_metrics(now)
+        self.stats["decisions"] += 1
+
+        overloaded = metrics["cpu_percent"] > CPU_HIGH or metrics["memory_percent"] > MEMORY_HIGH
+        headroom = metrics["cpu_percent"] < CPU_HEADROOM and metrics["memory_percent"] < MEMORY_HEADROOM
+        saturated = metrics["utilization"] >= self.target or metrics["wait_ms_p90"] > WAIT_HIGH_MS
+
+        if overloaded:
+            new_size, action = current_size - SCALE_STEP, "shrink (host load)"
+        elif saturated and headroom:
+            new_size, action = current_size + SCALE_STEP, "grow"
+        elif metrics["acquires"] and metrics["utilization"] < self.target / 2:
+            new_size, action = current_size - SCALE_STEP, "shrink (idle)"
+        else:
+            new_size, action = current_size, "hold"
+
+        new_size = max(self.min_size, min(self.max_size, new_size))
+        if new_size > current_size:
+            self.stats["grown"] += 1
+        elif new_size < current_size:
+            self.stats["shrunk"] += 1
+        else:
+            action = "hold"
+
+        self.last_metrics = dict(metrics, size=new_size, action=action)
+
+        # New window starts with the current busy count at the new size
+        busy = self.busy
+        self._reset_window(now)
+        self.busy, self.size = busy, new_size
+        return new_size if new_size != current_size else None
+
+    def metrics(self) -> Dict:
+        """Last decision window + bounds (pool health / status screens)"""
+        return {
+            **self.last_metrics,
+            "min": self.min_size,
+            "max": self.max_size,
+            **self.stats,
+        }
+
+    def summary_line(self) -> str:
+        metrics = self.last_metrics
+        if not metrics:
+            return f"bounds {self.min_size}-{self.max_size} | first decision in {self.interval:.0f}s"
+        return (f"size {metrics['size']} ({self.min_size}-{self.max_size}) | util {metrics['utilization'] * 100:.0f}% | "
+                f"wait p90 {metrics['wait_ms_p90']:.0f}ms | lease {metrics['lease_s_avg']:.1f}s | "
+                f"CPU {metrics['cpu_percent']:.0f}% MEM {metrics['memory_percent']:.0f}% | "
+                f"{metrics['action']} (+{self.stats['grown']}/-{self.stats['shrunk']})")
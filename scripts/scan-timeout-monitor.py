@@ -4,12 +4,12 @@ SCAN TIMEOUT MONITOR
 Figyeli a SCANNING scaneket és 120 másodperc után törli őket
 """
 
-import psycopg2
 import time
 import os
 import signal
 import sys
 from datetime import datetime
+from scanner_db import ScannerDB
 
 # Config
 DB_URL = "postgresql://localhost/ai_security_scanner"
@@ -25,6 +25,16 @@ END = '\033[0m'
 
 shutdown = False
 
+# Shared pooled DB access (one connection, reused every CHECK_INTERVAL)
+db = ScannerDB(DB_URL, minconn=1, maxconn=1)
+
+SCANNING_SCANS = db.statement("scanning_scans", '''
+    SELECT id, url, "createdAt", "workerId"
+    FROM "Scan"
+    WHERE status = 'SCANNING'
+''')
+DELETE_SCAN = db.statement("delete_scan", 'DELETE FROM "Scan" WHERE id = %s')
+
 def signal_handler(sig, frame):
     global shutdown
     print(f"\n{YELLOW}Leállítás...{END}")
@@ -36,21 +46,11 @@ signal.signal(signal.SIGINT, signal_handler)
 def check_and_kill_old_scans():
     """Ellenőrzi és törli a régi SCANNING scaneket"""
     try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-
         # Keressük a SCANNING scaneket
-        cur.execute('''
-            SELECT id, url, "createdAt", "workerId"
-            FROM "Scan"
-            WHERE status = 'SCANNING'
-        ''')
-
-        scanning_scans = cur.fetchall()
+        scanning_scans = db.fetchall(SCANNING_SCANS)
 
         if not scanning_scans:
             print(f"{GREEN}✓{END} Nincs aktív SCANNING scan")
-            conn.close()
             return
 
         print(f"\n{BLUE}📊 {len(scanning_scans)} SCANNING scan található{END}")
@@ -75,8 +75,7 @@ def check_and_kill_old_scans():
                         print(f"   {YELLOW}⚠{END} Worker {worker_id} már halott")
 
                 # Töröljük a scan-t
-                cur.execute('DELETE FROM "Scan" WHERE id = %s', (scan_id,))
-                conn.commit()
+                db.execute(DELETE_SCAN, (scan_id,))
                 print(f"   {GREEN}✓{END} Scan törölve")
                 killed_count += 1
 
@@ -86,8 +85,6 @@ def check_and_kill_old_scans():
         if killed_count > 0:
             print(f"\n{GREEN}✅ {killed_count} timeout scan törölve{END}")
 
-        conn.close()
-
     except Exception as e:
         print(f"{RED}❌ Hiba: {e}{END}")
 
@@ -108,6 +105,7 @@ def main():
                 break
             time.sleep(1)
 
+    db.close()
     print(f"\n{GREEN}Monitor leállítva{END}")
 
 if __name__ == '__main__':
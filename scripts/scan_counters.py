@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Scan Status Counters (O(1) queue status)
+========================================
+
+Minden orchestrator loop get_queue_status()-a COUNT(*)-tal számolta a
+PENDING / SCANNING (/ COMPLETED / FAILED) sorokat a "Scan" táblán - a
+master-scanner_speed.py / turbo-master-scanner.py időszűrő nélkül, a
+teljes táblán (10M+ scan célméret → az admission control a tábla
+méretével lassul).
+
+Helyette: "ScanStatusCounter" tábla, triggerek tartják karban
+(prisma/migrations/..._scan_status_counter):
+
+1. INSERT / DELETE / status változás → ±1 a státusz számlálóján
+2. Shardolt: slot = pg_backend_pid() % 16 - párhuzamos workerek nem
+   várnak egyetlen "SCANNING" sor lockjára
+3. Olvasás: SUM(count) GROUP BY status - max 16 sor / státusz,
+   független a "Scan" tábla méretétől
+4. rebuild_scan_status_counter(): újraszámolás (backfill / eltérés javítás)
+
+Időablakos számok (pl. "COMPLETED az utolsó órában") COUNT(*) helyett:
+CounterWindow - a számlálók pillanatképeinek különbsége az ablakon belül.
+
+Usage:
+    from scan_counters import read_status_counts, status_counts, STATUS_COUNTS_SQL, CounterWindow
+
+    counts = read_status_counts(cur)      # {"pending", "scanning", "completed", "failed", "total"}
+    counts = status_counts(db.fetchall(db.statement("status_counts", STATUS_COUNTS_SQL)))
+
+    last_hour = CounterWindow(3600)
+    finished = last_hour.update(counts)    # {"completed": ..., "failed": ...} within the window
+"""
+
+import time
+from collections import deque
+from typing import Dict, Iterable, Tuple
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+SCAN_STATUSES = ("PENDING", "SCANNING", "COMPLETED", "FAILED")
+WINDOW_STATUSES = ("completed", "failed")
+
+STATUS_COUNTS_SQL = '''
+    SELECT status, SUM("count")::bigint
+    FROM "ScanStatusCounter"
+    GROUP BY status
+'''
+REBUILD_SQL = 'SELECT "rebuild_scan_status_counter"()'
+
+
+def status_counts(rows: Iterable[Tuple[str, int]]) -> Dict[str, int]:
+    """(status, count) rows → {"pending", "scanning", "completed", "failed", "total"}"""
+    by_status = {status: int(count or 0) for status, count in rows}
+    counts = {status.lower(): max(0, by_status.get(status, 0)) for status in SCAN_STATUSES}
+    counts["total"] = sum(max(0, count) for count in by_status.values())
+    return counts
+
+
+def read_status_counts(cur) -> Dict[str, int]:
+    """Current per-status scan counts from the counter table (no "Scan" scan)"""
+    cur.execute(STATUS_COUNTS_SQL)
+    return status_counts(cur.fetchall())
+
+
+def rebuild_status_counts(cur):
+    """Recount "Scan" into the counters (locks "Scan" writes for the recount - maintenance only)"""
+    cur.execute(REBUILD_SQL)
+
+
+class CounterWindow:
+    """Finished-scan deltas over a sliding time window, from counter snapshots"""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.snapshots = deque()  # (time, counts)
+
+    def update(self, counts: Dict[str, int]) -> Dict[str, int]:
+        """
+        Add a snapshot, return the growth of WINDOW_STATUSES within the window
+
+        Until the window is full (scanner younger than `seconds`), the
+        growth since the first snapshot.
+        """
+        now = time.time()
+        self.snapshots.append((now, counts))
+        # Keep the newest snapshot that is at least `seconds` old as the baseline
+        while len(self.snapshots) > 1 and self.snapshots[1][0] <= now - self.seconds:
+            self.snapshots.popleft()
+
+        baseline = self.snapshots[0][1]
+        return {status: max(0, counts[status] - baseline[status]) for status in WINDOW_STATUSES}
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Shared Pooled Database Access (scanner scripts)
+===============================================
+
+A parallel-scanner.py, ui-scanner-daemon.py, simple-continuous-scanner.py
+és scan-timeout-monitor.py minden helper hívásnál (get_queue_status(),
+cleanup függvények, job claim - loop körönként többször) új
+`psycopg2.connect(DB_URL)` kapcsolatot nyitott és zárt → TCP + auth
+(PgBouncer 6432) minden egyes lekérdezés előtt.
+
+Helyette egy közös réteg:
+
+1. Thread-safe pool (psycopg2 ThreadedConnectionPool + semaphore →
+   kimerült pool esetén VÁR, nem PoolError), törött kapcsolat eldobva
+2. Tranzakció context manager: commit / rollback + visszaadás a poolba
+3. Statement timeout minden tranzakcióra (DB_STATEMENT_TIMEOUT_MS)
+4. Hot query-k nevesített statementként (PREPARE / EXECUTE) - csak
+   direkt Postgres kapcsolaton: PgBouncer transaction pooling mellett a
+   PREPARE egy másik szerver kapcsolatra kerülhet, ott sima SQL megy
+5. Pool metrikák: acquire-ok, várakozás (átlag / max), használatban /
+   csúcs, timeoutok, eldobott kapcsolatok
+
+Usage:
+    from scanner_db import ScannerDB
+
+    db = ScannerDB(DB_URL)
+    QUEUE_STATUS = db.statement("queue_status", "SELECT ... WHERE status = %s")
+
+    row = db.fetchone(QUEUE_STATUS, ("PENDING",))
+    rows = db.fetchall('SELECT id FROM "Scan" WHERE status = %s', ("SCANNING",))
+    cleaned = db.execute('UPDATE "Scan" SET ... WHERE ...', (120,))   # rowcount
+
+    with db.transaction() as cur:                                    # several statements
+        cur.execute(...)
+        db.run(cur, QUEUE_STATUS, ("PENDING",))
+
+    print(db.summary_line())
+    db.close()
+"""
+
+import os
+import threading
+import time
+import weakref
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Dict, Optional, Sequence, Union
+
+import psycopg2
+from psycopg2 import extensions, pool
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+DB_POOL_MIN = 4                  # Idle connections kept (psycopg2 closes returned ones above this)
+DB_POOL_MAX = int(os.environ.get("SCANNER_DB_POOL_MAX", "10"))
+DB_ACQUIRE_TIMEOUT = 30          # Seconds waiting for a free pooled connection
+DB_CONNECT_TIMEOUT = 5
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("SCANNER_DB_STATEMENT_TIMEOUT_MS", "15000"))
+PGBOUNCER_PORTS = {"6432"}       # Transaction pooling: no session state (PREPARE / SET)
+
+Statement = namedtuple("Statement", ["name", "sql"])
+
+
+class PoolExhausted(Exception):
+    """No pooled connection became free within DB_ACQUIRE_TIMEOUT"""
+
+
+def _numbered_params(sql: str) -> str:
+    """%s placeholders → $1, $2, ... (PREPARE syntax)"""
+    parts = sql.split("%s")
+    return "".join(part + (f"${i}" if i < len(parts) else "") for i, part in enumerate(parts, 1))
+
+
+class ScannerDB:
+    """Thread-safe pooled access + statement timeout + prepared hot queries"""
+
+    def __init__(self, dsn: str, minconn: int = DB_POOL_MIN, maxconn: int = DB_POOL_MAX,
+                 statement_timeout_ms: int = DB_STATEMENT_TIMEOUT_MS, prepare: Optional[bool] = None):
+        self.dsn = dsn
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.statement_timeout_ms = statement_timeout_ms
+
+        port = str(extensions.parse_dsn(dsn).get("port", "5432"))
+        self.via_pgbouncer = port in PGBOUNCER_PORTS
+        self.prepare = (not self.via_pgbouncer) if prepare is None else prepare
+
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(maxconn)
+        self.prepared = weakref.WeakKeyDictionary()  # conn → prepared statement names (gone with the conn)
+        self.statements: Dict[str, Statement] = {}
+
+        self.stats_lock = threading.Lock()
+        self.stats = {"acquires": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0, "in_use": 0,
+                      "peak_in_use": 0, "errors": 0, "statement_timeouts": 0, "discarded": 0}
+
+    def _get_pool(self):
+        with self.pool_lock:
+            if self.pool is None:
+                kwargs = {"connect_timeout": DB_CONNECT_TIMEOUT}
+                if not self.via_pgbouncer and self.statement_timeout_ms:
+                    # Direct Postgres: session-level, set once per connection
+                    kwargs["options"] = f"-c statement_timeout={self.statement_timeout_ms}"
+                self.pool = pool.ThreadedConnectionPool(min(self.minconn, self.maxconn), self.maxconn,
+                                                        dsn=self.dsn, **kwargs)
+            return self.pool
+
+    def _acquire(self):
+        start = time.perf_counter()
+        if not self.slots.acquire(timeout=DB_ACQUIRE_TIMEOUT):
+            raise PoolExhausted(f"no free DB connection after {DB_ACQUIRE_TIMEOUT}s ({self.maxconn} in use)")
+        try:
+            conn = self._get_pool().getconn()
+        except Exception:
+            self.slots.release()
+            raise
+
+        wait_ms = (time.perf_counter() - start) * 1000
+        with self.stats_lock:
+            self.stats["acquires"] += 1
+            self.stats["wait_ms_total"] += wait_ms
+            self.stats["wait_ms_max"] = max(self.stats["wait_ms_max"], wait_ms)
+            self.stats["in_use"] += 1
+            self.stats["peak_in_use"] = max(self.stats["peak_in_use"], self.stats["in_use"])
+        return conn
+
+    def _release(self, conn, broken: bool):
+        try:
+            self.pool.putconn(conn, close=broken or bool(conn.closed))
+        finally:
+            self.slots.release()
+            with self.stats_lock:
+                self.stats["in_use"] -= 1
+                self.stats["discarded"] += 1 if broken else 0
+
+    @contextmanager
+    def transaction(self):
+        """Cursor in one transaction: commit on success, rollback on error, connection back to the pool"""
+        conn = self._acquire()
+        broken = False
+        cur = None
+        try:
+            cur = conn.cursor()
+            if self.via_pgbouncer and self.statement_timeout_ms:
+                # Transaction pooling: a session SET would leak to other clients → per transaction
+                cur.execute(f"SET LOCAL statement_timeout = {int(self.statement_timeout_ms)}")
+            yield cur
+            conn.commit()
+        except BaseException as e:
+            with self.stats_lock:
+                self.stats["errors"] += 1
+                if isinstance(e, extensions.QueryCanceledError):
+                    self.stats["statement_timeouts"] += 1
+            # Lost connection → discard (a statement timeout is an OperationalError too, but the conn is fine)
+            broken = bool(conn.closed) or (isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+                                           and not isinstance(e, extensions.QueryCanceledError))
+            if not broken:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            raise
+        finally:
+            if cur is not None and not cur.closed:
+                try:
+                    cur.close()
+                except psycopg2.Error:
+                    pass
+            self._release(conn, broken)
+
+    def statement(self, name: str, sql: str) -> Statement:
+        """Register a hot query (prepared per connection on first use, if enabled)"""
+        statement = Statement(name, sql)
+        self.statements[name] = statement
+        return statement
+
+    def run(self, cur, query: Union[str, Statement], params: Sequence = ()):
+        """Execute a plain SQL string or a registered Statement on cur"""
+        if not isinstance(query, Statement):
+            cur.execute(query, params or None)
+            return cur
+        if not self.prepare:
+            cur.execute(query.sql, params or None)
+            return cur
+
+        prepared = self.prepared.setdefault(cur.connection, set())
+        if query.name not in prepared:
+            cur.execute(f"PREPARE {query.name} AS {_numbered_params(query.sql)}")
+            prepared.add(query.name)
+        if params:
+            cur.execute(f"EXECUTE {query.name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cur.execute(f"EXECUTE {query.name}")
+        return cur
+
+    def fetchone(self, query: Union[str, Statement], params: Sequence = ()):
+        with self.transaction() as cur:
+            return self.run(cur, query, params).fetchone()
+
+    def fetchall(self, query: Union[str, Statement], params: Sequence = ()):
+        with self.transaction() as cur:
+            return self.run(cur, query, params).fetchall()
+
+    def execute(self, query: Union[str, Statement], params: Sequence = ()) -> int:
+        """Run a write, return its rowcount"""
+        with self.transaction() as cur:
+            return self.run(cur, query, params).rowcount
+
+    def get_stats(self) -> Dict:
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats["wait_ms_avg"] = round(stats["wait_ms_total"] / stats["acquires"], 2) if stats["acquires"] else 0.0
+        stats["maxconn"] = self.maxconn
+        stats["prepared"] = self.prepare
+        return stats
+
+    def summary_line(self) -> str:
+        stats = self.get_stats()
+        return (f"in use {stats['in_use']}/{self.maxconn} (peak {stats['peak_in_use']}) | "
+                f"acquires {stats['acquires']} | wait avg {stats['wait_ms_avg']:.1f}ms "
+                f"max {stats['wait_ms_max']:.0f}ms | timeouts {stats['statement_timeouts']} | "
+                f"errors {stats['errors']} | discarded {stats['discarded']}")
+
+    def close(self):
+        with self.pool_lock:
+            if self.pool is not None:
+                self.pool.closeall()
+                self.pool = None
+            self.prepared.clear()
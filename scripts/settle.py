@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Event-Driven Page Settle Detection (Playwright)
+===============================================
+
+Eddig domcontentloaded után MINDIG 500ms sleep, és +2000ms ha a HTML-ben
+szerepelt a 'widget' / 'drift' / 'intercom' szó (az oldalak jelentős
+részén igaz) → fix 0.5-2.5s / oldal, akár semmi sem történt.
+
+Helyette jelek alapján várunk:
+
+1. DOM mutation quiet period - MutationObserver az oldalban; kész, ha
+   SETTLE_QUIET_MS ideig nem változott a DOM
+2. AI widget hostok (Intercom, Drift, Crisp, ...) függő kérései - amíg
+   egy widget script / XHR úton van, várunk (utána még egy quiet period,
+   mert a widget DOM-ot injektál)
+3. Hard cap (SETTLE_CAP_MS) - ennél tovább soha (= a régi legrosszabb eset)
+
+Usage:
+    from settle import SettleTracker, SettleStats
+
+    tracker = SettleTracker(page)      # goto ELŐTT (widget kérések követése)
+    response = await page.goto(url, wait_until='domcontentloaded')
+    settle = await tracker.wait()      # {"settle_ms", "reason", "widget_requests", ...}
+    tracker.detach()                   # warm (pooled) page: listeners off
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+# ════════════════════════════════════════════════════════════════════
+# CONFIGURATION
+# ════════════════════════════════════════════════════════════════════
+
+SETTLE_QUIET_MS = 300                # No DOM mutation for this long → settled
+SETTLE_CAP_MS = 2500                 # Hard cap (old worst case: 500 + 2000ms)
+SETTLE_POLL_MS = 50
+WIDGET_REQUEST_MAX_MS = 1500         # Older pending widget requests = long-poll → ignored
+
+# AI chat / support widget hosts (suffix match) worth waiting for
+AI_WIDGET_HOSTS = [
+    "intercom.io", "intercomcdn.com", "intercomassets.com",
+    "drift.com", "driftt.com",
+    "crisp.chat",
+    "tidio.co", "tidiochat.com",
+    "zdassets.com", "zendesk.com",
+    "hs-scripts.com", "hubspot.com", "usemessages.com",
+    "livechatinc.com", "livechat.com",
+    "tawk.to",
+    "freshchat.com", "freshworks.com",
+    "olark.com",
+    "botpress.cloud",
+    "voiceflow.com",
+    "chatbase.co",
+    "landbot.io",
+    "manychat.com",
+    "ada.support",
+    "openai.com",
+]
+
+# Resolves when the DOM has been quiet for quietMs (or capMs elapsed)
+DOM_QUIET_SCRIPT = """
+({quietMs, capMs, pollMs}) => new Promise(resolve => {
+    const start = performance.now();
+    let last = start;
+    let mutations = 0;
+    const observer = new MutationObserver(records => {
+        mutations += records.length;
+        last = performance.now();
+    });
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    const tick = () => {
+        const now = performance.now();
+        if (now - last >= quietMs || now - start >= capMs) {
+            observer.disconnect();
+            resolve({elapsed: now - start, mutations, capped: now - last < quietMs});
+        } else {
+            setTimeout(tick, pollMs);
+        }
+    };
+    setTimeout(tick, pollMs);
+})
+"""
+
+
+def is_widget_url(url: str) -> bool:
+    host = (urlparse(url).hostname or "").lower()
+    return any(host == suffix or host.endswith("." + suffix) for suffix in AI_WIDGET_HOSTS)
+
+
+# ════════════════════════════════════════════════════════════════════
+# SETTLE TRACKER (one per page navigation)
+# ════════════════════════════════════════════════════════════════════
+
+class SettleTracker:
+    """Tracks AI widget requests of a page and waits for it to settle"""
+
+    def __init__(self, page, quiet_ms: int = SETTLE_QUIET_MS, cap_ms: int = SETTLE_CAP_MS):
+        self.page = page
+        self.quiet_ms = quiet_ms
+        self.cap_ms = cap_ms
+        self.pending: Dict[object, float] = {}  # widget request -> start (monotonic)
+        self.widget_requests = 0
+        self.widget_hosts = set()
+
+        self.page.on("request", self._on_request)
+        self.page.on("requestfinished", self._on_done)
+        self.page.on("requestfailed", self._on_done)
+
+    def _on_request(self, request):
+        if is_widget_url(request.url):
+            self.pending[request] = time.monotonic()
+            self.widget_requests += 1
+            self.widget_hosts.add(urlparse(request.url).hostname)
+
+    def _on_done(self, request):
+        self.pending.pop(request, None)
+
+    def outstanding_widget_requests(self) -> int:
+        """Pending widget requests that are not (yet) considered long-polls"""
+        cutoff = time.monotonic() - WIDGET_REQUEST_MAX_MS / 1000
+        return sum(1 for started in self.pending.values() if started >= cutoff)
+
+    async def _dom_quiet(self, remaining_ms: float) -> Optional[Dict]:
+        """Run the in-page quiet-period check (None if the page navigated away)"""
+        if remaining_ms <= 0:
+            return None
+        try:
+            return await self.page.evaluate(DOM_QUIET_SCRIPT, {
+                "quietMs": self.quiet_ms,
+                "capMs": remaining_ms,
+                "pollMs": SETTLE_POLL_MS,
+            })
+        except Exception:
+            # Client-side redirect destroyed the context → give the new document a chance
+            try:
+                await self.page.wait_for_load_state("domcontentloaded", timeout=max(remaining_ms, 1))
+            except Exception:
+                pass
+            return None
+
+    async def wait(self) -> Dict:
+        """
+        Wait until the page settled (or the cap is hit)
+
+        Returns: {"settle_ms", "reason": quiet | widget | cap, "mutations",
+                  "widget_requests", "widget_hosts"}
+        """
+        start = time.monotonic()
+        deadline = start + self.cap_ms / 1000
+
+        def remaining_ms() -> float:
+            return (deadline - time.monotonic()) * 1000
+
+        mutations = 0
+        dom = await self._dom_quiet(remaining_ms())
+        if dom is None and remaining_ms() > 0:
+            dom = await self._dom_quiet(remaining_ms())  # after a client-side redirect
+        if dom:
+            mutations += dom.get("mutations", 0)
+
+        # AI widget still loading → wait for it, then for the DOM it injects
+        waited_for_widget = False
+        while self.outstanding_widget_requests() and remaining_ms() > 0:
+            waited_for_widget = True
+            await asyncio.sleep(min(SETTLE_POLL_MS, remaining_ms()) / 1000)
+        if waited_for_widget:
+            dom = await self._dom_quiet(remaining_ms())
+            if dom:
+                mutations += dom.get("mutations", 0)
+
+        settle_ms = int((time.monotonic() - start) * 1000)
+        if remaining_ms() <= 0 or (dom and dom.get("capped")):
+            reason = "cap"
+        elif waited_for_widget:
+            reason = "widget"
+        else:
+            reason = "quiet"
+
+        return {
+            "settle_ms": settle_ms,
+            "reason": reason,
+            "mutations": mutations,
+            "widget_requests": self.widget_requests,
+            "widget_hosts": sorted(host for host in self.widget_hosts if host),
+        }
+
+    def detach(self):
+        """Remove the listeners (the page is reused by a PagePool)"""
+        for event, handler in (("request", self._on_request),
+                               ("requestfinished", self._on_done),
+                               ("requestfailed", self._on_done)):
+            try:
+                self.page.remove_listener(event, handler)
+            except Exception:
+                pass
+        self.pending.clear()
+
+
+# ════════════════════════════════════════════════════════════════════
+# SETTLE STATS (orchestrator status screens)
+# ════════════════════════════════════════════════════════════════════
+
+class SettleStats:
+    """Aggregated settle times (mean / max / by reason)"""
+
+    def __init__(self):
+        self.pages = 0
+        self.total_ms = 0
+        self.max_ms = 0
+        self.reasons: Dict[str, int] = {}
+
+    def add(self, settle: Dict):
+        self.pages += 1
+        self.total_ms += settle["settle_ms"]
+        self.max_ms = max(self.max_ms, settle["settle_ms"])
+        self.reasons[settle["reason"]] = self.reasons.get(settle["reason"], 0) + 1
+
+    def summary_line(self) -> str:
+        if not self.pages:
+            return "no pages yet"
+        reasons = ", ".join(f"{reason}: {count}" for reason, count in sorted(self.reasons.items()))
+        return (f"avg {self.total_ms / self.pages:.0f}ms | max {self.max_ms}ms | "
+                f"{reasons} (fixed sleeps were 500-2500ms)")
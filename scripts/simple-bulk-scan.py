@@ -2,6 +2,8 @@
 """
 SIMPLE BULK SCANNER - Direct scan without workers
 No queue, no workers, just direct API calls with controlled parallelism
+Completion: Postgres status events (LISTEN scan_status, scan_events.py),
+GET /api/scan/{id} only as fallback / missed-event check
 """
 
 import requests
@@ -10,6 +12,7 @@ import sys
 import json
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import signal
+from scan_events import ScanEventListener, ScanCompletionWaiter, EVENT_RECONCILE_INTERVAL
 
 # ========================================
 # CONFIGURATION
@@ -30,6 +33,9 @@ stats = {
 # Graceful shutdown
 shutdown = False
 
+# Scan completion events (None → API polling)
+waiter = None
+
 def signal_handler(sig, frame):
     global shutdown
     print("\n\n⚠️  Shutting down gracefully...")
@@ -69,18 +75,26 @@ def scan_domain(domain):
             print(f"  ❌ No scan ID: {domain}")
             return {'domain': domain, 'status': 'failed'}
 
-        # Wait for scan to complete (polling)
+        # Wait for scan to complete (status event, API check if none arrives)
         start_time = time.time()
         while not shutdown:
             # Check if timeout exceeded
-            if time.time() - start_time > SCAN_TIMEOUT:
+            remaining = SCAN_TIMEOUT - (time.time() - start_time)
+            if remaining <= 0:
                 print(f"  ⏱️  Timeout: {domain}")
                 return {'domain': domain, 'status': 'timeout'}
 
-            # Check scan status
-            check_resp = requests.get(f"{API_URL}/{scan_id}", timeout=10)
-            if check_resp.status_code == 200:
-                scan_data = check_resp.json()
+            scan_data = None
+            if waiter:
+                scan_data = waiter.wait(scan_id, timeout=min(remaining, EVENT_RECONCILE_INTERVAL))
+
+            # Check scan status (polling mode / no event yet - missed?)
+            if scan_data is None:
+                check_resp = requests.get(f"{API_URL}/{scan_id}", timeout=10)
+                if check_resp.status_code == 200:
+                    scan_data = check_resp.json()
+
+            if scan_data:
                 status = scan_data.get('status')
 
                 if status == 'COMPLETED':
@@ -96,8 +110,9 @@ def scan_domain(domain):
                     print(f"  ❌ Scan failed: {domain}")
                     return {'domain': domain, 'status': 'failed'}
 
-            # Wait before next check
-            time.sleep(5)
+            # Wait before next check (the event wait already waited)
+            if not waiter:
+                time.sleep(5)
 
     except Exception as e:
         print(f"  ❌ Error: {domain} - {str(e)[:50]}")
@@ -109,6 +124,8 @@ def scan_domain(domain):
 # MAIN FUNCTION
 # ========================================
 def main():
+    global waiter
+
     if len(sys.argv) < 2:
         print("Usage: python3 simple-bulk-scan.py domains.txt")
         sys.exit(1)
@@ -130,6 +147,14 @@ def main():
     print(f"   Parallel scans: {MAX_PARALLEL}")
     print(f"   Timeout per scan: {SCAN_TIMEOUT}s")
     print(f"   Delay between scans: {DELAY_BETWEEN_SCANS}s")
+
+    # Completion events (LISTEN) - API polling if unavailable
+    waiter = ScanCompletionWaiter(ScanEventListener())
+    if waiter.start():
+        print(f"   Completion: LISTEN {waiter.listener.channel} (push)")
+    else:
+        waiter = None
+        print(f"   Completion: API polling (LISTEN unavailable)")
     print(f"\n{'='*50}\n")
 
     results = []
@@ -180,6 +205,9 @@ def main():
                 else:
                     stats['failed'] += 1
 
+    if waiter:
+        waiter.stop()
+
     # Final report
     print(f"\n{'='*50}")
     print(f"\n✅ SCAN COMPLETE")
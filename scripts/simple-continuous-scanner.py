@@ -15,13 +15,14 @@ HASZNÁLAT:
 """
 
 import requests
-import psycopg2
 import time
 import sys
 import json
 import signal
 from datetime import datetime
 from typing import Dict, Set
+from scanner_db import ScannerDB
+from scan_counters import STATUS_COUNTS_SQL, CounterWindow, status_counts
 
 # ════════════════════════════════════════════════════════════════════
 # KONFIGURÁCIÓ
@@ -50,6 +51,9 @@ stats = {
     'last_index': -1
 }
 
+# Shared pooled DB access (no connect / close per status check)
+db = ScannerDB(DB_URL, minconn=1, maxconn=2)
+
 def signal_handler(sig, frame):
     """Ctrl+C handler - graceful shutdown"""
     global running
@@ -64,30 +68,22 @@ signal.signal(signal.SIGINT, signal_handler)
 # DATABASE HELPERS
 # ════════════════════════════════════════════════════════════════════
 
+# Count by status: trigger-maintained counters (ScanStatusCounter), O(1)
+# PENDING / SCANNING: every active scan, COMPLETED / FAILED: last 24 hours (counter snapshots)
+STATUS_COUNTS = db.statement("status_counts", STATUS_COUNTS_SQL)
+finished_last_day = CounterWindow(24 * 3600)
+
 def get_db_status() -> Dict:
     """Get current database status"""
     try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-        
-        # Count by status
-        cur.execute("""
-            SELECT status, COUNT(*) 
-            FROM "Scan" 
-            WHERE "createdAt" > NOW() - INTERVAL '24 hours'
-            GROUP BY status
-        """)
-        
-        status_counts = dict(cur.fetchall())
-        
-        cur.close()
-        conn.close()
+        counts = status_counts(db.fetchall(STATUS_COUNTS))
+        finished = finished_last_day.update(counts)
         
         return {
-            'pending': status_counts.get('PENDING', 0),
-            'scanning': status_counts.get('SCANNING', 0),
-            'completed': status_counts.get('COMPLETED', 0),
-            'failed': status_counts.get('FAILED', 0)
+            'pending': counts['pending'],
+            'scanning': counts['scanning'],
+            'completed': finished['completed'],
+            'failed': finished['failed']
         }
     except Exception as e:
         print(f"❌ DB Error: {e}")
@@ -222,6 +218,7 @@ def run_scanner(domain_file: str):
         print(f"    PENDING:  {pending:3d} / {TARGET_PENDING} target")
         print(f"    SCANNING: {scanning:3d} / {TARGET_SCANNING} target")
         print(f"    Total Active: {total_active}")
+        print(f"  🗄️  DB pool: {db.summary_line()}")
         print("─" * 80)
         print(f"  🎬 Action: Creating {scans_to_create} new scans...")
         print("═" * 80)
@@ -265,6 +262,7 @@ def run_scanner(domain_file: str):
     print("═" * 80 + "\n")
     
     save_progress()
+    db.close()
 
 # ════════════════════════════════════════════════════════════════════
 # ENTRY POINT
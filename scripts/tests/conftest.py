@@ -0,0 +1,6 @@
+"""pytest: the scanner helper modules live flat in scripts/ (imported by name)"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
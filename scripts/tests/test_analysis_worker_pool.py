@@ -0,0 +1,71 @@
+"""AnalysisWorkerPool: a cancelled / timed out scan never leaves its worker busy"""
+
+import asyncio
+import sys
+import textwrap
+import time
+
+from analysis_worker_pool import AnalysisWorkerPool
+
+# Same NDJSON protocol as src/worker/serve.ts; "slow" urls take 30s
+FAKE_WORKER = textwrap.dedent("""
+    import json, os, sys, time
+    print(json.dumps({"type": "ready", "pid": os.getpid(), "worker": "fake", "rssMb": 10}), flush=True)
+    for line in sys.stdin:
+        request = json.loads(line)
+        if "slow" in request["url"]:
+            time.sleep(30)
+        print(json.dumps({"id": request["id"], "ok": True, "durationMs": 1, "rssMb": 10,
+                          "scanId": request["scanId"], "pid": os.getpid()}), flush=True)
+""")
+
+
+def make_pool(tmp_path):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    return AnalysisWorkerPool(size=1, script=str(script), cwd=None, command=[sys.executable])
+
+
+def test_cancelled_scan_replaces_the_worker(tmp_path):
+    async def scenario():
+        pool = make_pool(tmp_path)
+        await pool.start()
+        first_worker = pool.workers[0]
+
+        # process_batch's wait_for(gather(...)) timeout cancels process_scan_full mid-analysis
+        slow = asyncio.create_task(pool.analyze("scan-slow", "https://slow.example", timeout=60))
+        await asyncio.sleep(0.3)
+        slow.cancel()
+        await asyncio.gather(slow, return_exceptions=True)
+
+        started = time.monotonic()
+        result = await pool.analyze("scan-next", "https://next.example", timeout=10)
+        assert result["ok"]
+        assert time.monotonic() - started < 10  # Not queued behind the abandoned 30s scan
+        assert pool.workers[0] is not first_worker
+        assert pool.get_stats()["recycled"]["cancelled"] == 1
+
+        await pool.close()
+        assert not first_worker.alive
+
+    asyncio.run(scenario())
+
+
+def test_timed_out_scan_replaces_the_worker(tmp_path):
+    async def scenario():
+        pool = make_pool(tmp_path)
+        await pool.start()
+        first_worker = pool.workers[0]
+
+        result = await pool.analyze("scan-slow", "https://slow.example", timeout=0.5)
+        assert result["timeout"]
+
+        result = await pool.analyze("scan-next", "https://next.example", timeout=10)
+        assert result["ok"]
+        assert pool.workers[0] is not first_worker
+        assert pool.get_stats()["recycled"]["timeout"] == 1
+
+        await pool.close()
+        assert not first_worker.alive
+
+    asyncio.run(scenario())
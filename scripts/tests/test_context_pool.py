@@ -0,0 +1,146 @@
+"""ContextPool: cancelled scans release their context, browser restarts never hang"""
+
+import asyncio
+import importlib.util
+import os
+
+import pytest
+
+pytest.importorskip("playwright")
+pytest.importorskip("psycopg2")
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "turbo-master-scanner.py")
+spec = importlib.util.spec_from_file_location("turbo_master_scanner", SCRIPT)
+turbo = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(turbo)
+
+
+class FakePage:
+    def __init__(self):
+        self.url = "about:blank"
+
+    def on(self, event, handler):
+        pass
+
+    def remove_listener(self, event, handler):
+        pass
+
+    async def goto(self, url, **kwargs):
+        await asyncio.sleep(3600)  # Hangs until the batch timeout cancels the scan
+
+
+class FakePagePool:
+    def __init__(self):
+        self.released = []
+
+    async def acquire(self, context):
+        return FakePage()
+
+    async def release(self, context, page, broken=False):
+        self.released.append(broken)
+
+
+class FakeContext:
+    def __init__(self):
+        self.closed = False
+        self.pages = []
+
+    async def clear_cookies(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.closed = False
+
+    def on(self, event, handler):
+        pass
+
+    async def new_context(self, **kwargs):
+        return FakeContext()
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeRecycler:
+    def __init__(self):
+        self.restart_pending = None
+        self.restarts = 0
+
+    def maybe_sample(self, usage):
+        pass
+
+    def retire_reason(self, context, uses, crashed):
+        return None
+
+    def retired(self, context, reason):
+        pass
+
+    def forget(self, context):
+        pass
+
+    def browser_crashed(self):
+        self.restart_pending = "crash"
+
+    def browser_restarted(self):
+        self.restart_pending = None
+        self.restarts += 1
+
+
+def make_pool():
+    recycler = FakeRecycler()
+
+    async def browser_factory():
+        return FakeBrowser()
+
+    pool = turbo.ContextPool(FakeBrowser(), max_size=2, recycler=recycler, browser_factory=browser_factory)
+    return pool, recycler
+
+
+def test_cancelled_scan_releases_its_context_and_restart_drains():
+    async def scenario():
+        pool, recycler = make_pool()
+        scanner = object.__new__(turbo.TurboMasterScanner)
+        scanner.context_pool = pool
+        scanner.page_pool = FakePagePool()
+
+        # process_batch: wait_for(gather(...)) timeout → the scan task is cancelled mid-navigation
+        scan = asyncio.create_task(scanner.scan_with_playwright("scan-1", "example.com"))
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(scan, timeout=0.1)
+
+        assert scan.cancelled()
+        assert not pool.busy
+        assert scanner.page_pool.released == [True]  # Cancelled mid-navigation → page discarded
+
+        recycler.restart_pending = "memory"
+        context = await asyncio.wait_for(pool.acquire(), timeout=2)
+        assert recycler.restarts == 1
+        await pool.release(context)
+
+    asyncio.run(scenario())
+
+
+def test_restart_force_closes_contexts_still_busy_after_the_drain_timeout(monkeypatch):
+    monkeypatch.setattr(turbo, "BROWSER_DRAIN_TIMEOUT", 0.2)
+
+    async def scenario():
+        pool, recycler = make_pool()
+        leaked = await pool.acquire()  # Never released
+
+        recycler.restart_pending = "crash"
+        context = await asyncio.wait_for(pool.acquire(), timeout=2)
+
+        assert recycler.restarts == 1
+        assert leaked.closed
+        assert pool.busy == {context}
+
+        # A late release of the force-closed context must not put it back in the pool
+        await pool.release(leaked)
+        assert pool.available.empty()
+
+    asyncio.run(scenario())
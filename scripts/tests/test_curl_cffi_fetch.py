@@ -0,0 +1,176 @@
+"""fetch_with_curl_cffi against a local keep-alive HTTP server"""
+
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("curl_cffi")
+
+import curl_cffi_fetch  # noqa: E402
+from curl_cffi_fetch import SessionPool, fetch_many, fetch_with_curl_cffi  # noqa: E402
+from validator_cache import ValidatorCache  # noqa: E402
+
+SLOW_SECONDS = 0.3
+ETAG = '"v1"'
+
+PAGES = {
+    "/": b"<html><head><title>Local</title></head><body>" + b"<p>content</p>" * 100 + b"</body></html>",
+    # JS-required marker first, Cloudflare marker later: the reason must follow precedence
+    "/challenge": (b"<html><head><noscript>Please enable JavaScript</noscript></head><body>"
+                   + b"<p>padding</p>" * 4000
+                   + b"<div id='challenge-platform'></div>" + b"<p>tail</p>" * 4000 + b"</body></html>"),
+    "/noscript": b"<html><body><noscript>x</noscript>" + b"<p>real page</p>" * 4000 + b"</body></html>",
+    "/slow": b"<html><body>" + b"<p>slow</p>" * 100 + b"</body></html>",
+    "/big": b"<html><body>" + b"a" * (256 * 1024) + b"</body></html>",
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(SLOW_SECONDS)
+        if self.path in ("/set-cookie", "/echo-cookie"):
+            body = (self.headers.get("Cookie") or "").encode()
+            self.send_response(200)
+            if self.path == "/set-cookie":
+                self.send_header("Set-Cookie", "session_id=scan-a; Path=/")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path == "/" and self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = PAGES.get(self.path.split("?")[0], b"not found")
+        self.send_response(200 if self.path.split("?")[0] in PAGES else 404)
+        if self.path == "/":
+            self.send_header("ETag", ETAG)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class CountingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    connections = 0
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+    def handle_error(self, request, client_address):
+        pass  # Early-aborted reads reset the connection
+
+
+@pytest.fixture
+def server():
+    httpd = CountingServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def pool():
+    pool = SessionPool()
+    yield pool
+    pool.close_all()
+
+
+def test_same_host_fetches_reuse_one_connection(server, pool):
+    httpd, base = server
+    for _ in range(6):
+        result = fetch_with_curl_cffi(f"{base}/", pool=pool)
+        assert result["success"] and result["html"] == PAGES["/"].decode()
+    assert httpd.connections == 1
+
+
+def test_early_stop_reason_follows_precedence(server, pool):
+    _, base = server
+    result = fetch_with_curl_cffi(f"{base}/challenge", pool=pool)
+    assert result["aborted_early"]
+    assert result["html_length"] < len(PAGES["/challenge"])
+    assert result["detection_reason"] == "Cloudflare challenge detected: challenge-platform"
+
+
+def test_js_required_marker_does_not_stop_the_read(server, pool):
+    _, base = server
+    result = fetch_with_curl_cffi(f"{base}/noscript", pool=pool)
+    assert not result["aborted_early"]
+    assert result["html_length"] == len(PAGES["/noscript"])
+    assert result["detection_reason"] == "JavaScript required: <noscript>"
+
+
+def test_body_cap(server, pool, monkeypatch):
+    _, base = server
+    monkeypatch.setattr(curl_cffi_fetch.StreamingBodyReader.__init__, "__defaults__", (64 * 1024,))
+    result = fetch_with_curl_cffi(f"{base}/big", pool=pool)
+    assert result["success"] and result["truncated"]
+    assert result["html_length"] == 64 * 1024
+
+
+def test_timing_is_read_before_the_handle_reset(server, pool):
+    _, base = server
+    result = fetch_with_curl_cffi(f"{base}/slow", pool=pool)
+    timing = result["timing"]
+    assert timing["total_ms"] >= SLOW_SECONDS * 1000
+    assert timing["total_ms"] == pytest.approx(result["elapsed_ms"], abs=100)
+    assert timing["ttfb_ms"] >= SLOW_SECONDS * 1000
+
+
+def test_async_timing_is_read_at_transfer_end(server):
+    _, base = server
+
+    async def collect():
+        return [result async for result in fetch_many([f"{base}/slow"], concurrency=1)]
+
+    result = asyncio.run(collect())[0]
+    assert result["success"]
+    assert result["timing"]["total_ms"] == pytest.approx(result["elapsed_ms"], abs=100)
+    assert result["timing"]["total_ms"] >= SLOW_SECONDS * 1000
+
+
+def test_connection_counts_are_read_at_transfer_end(server, pool):
+    _, base = server
+    for _ in range(6):
+        fetch_with_curl_cffi(f"{base}/", pool=pool)
+    stats = pool.get_stats()
+    assert stats["connections_new"] == 1
+    assert stats["connections_reused"] == 5
+
+
+def test_pooled_sessions_do_not_leak_cookies(server, pool):
+    _, base = server
+    first = fetch_with_curl_cffi(f"{base}/set-cookie", pool=pool)
+    assert [cookie["name"] for cookie in first["cookies"]] == ["session_id"]
+
+    second = fetch_with_curl_cffi(f"{base}/echo-cookie", pool=pool)
+    assert pool.get_stats()["sessions_reused"] == 1
+    assert second["html"] == ""
+
+
+def test_unconditional_fetch_skips_the_validators(server, pool, tmp_path):
+    _, base = server
+    validators = ValidatorCache(str(tmp_path / "validators.db"))
+    fetch_with_curl_cffi(f"{base}/", pool=pool, validators=validators)
+
+    cached = fetch_with_curl_cffi(f"{base}/", pool=pool, validators=validators)
+    assert cached["status_code"] == 304 and cached["not_modified"] and cached["html"] == ""
+
+    full = fetch_with_curl_cffi(f"{base}/", pool=pool, validators=validators, conditional=False)
+    assert full["status_code"] == 200 and full["html"] == PAGES["/"].decode()
+    validators.close()
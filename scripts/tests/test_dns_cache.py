@@ -0,0 +1,37 @@
+"""DnsResolver.run_ahead against a resolver that only answers EAI_AGAIN"""
+
+import asyncio
+import socket
+
+import dns_cache
+from dns_cache import DnsCache, DnsResolver
+
+HOSTS = [f"flaky{i}.example" for i in range(5)]
+
+
+def test_transient_failures_do_not_spin_the_lookahead(tmp_path, monkeypatch):
+    calls = []
+
+    def getaddrinfo(host, *args):
+        calls.append(host)
+        raise socket.gaierror(socket.EAI_AGAIN, "Temporary failure in name resolution")
+
+    monkeypatch.setattr(dns_cache.socket, "getaddrinfo", getaddrinfo)
+
+    async def run():
+        resolver = DnsResolver(DnsCache(str(tmp_path / "dns-cache.json")), concurrency=4)
+        task = asyncio.create_task(resolver.run_ahead(lambda: HOSTS, interval=0.05))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        resolver.close()
+        return resolver
+
+    resolver = asyncio.run(run())
+    assert sorted(calls) == HOSTS  # one lookup per host, then the short negative TTL holds
+    assert resolver.stats["unknown"] == len(HOSTS)
+    assert not resolver.is_dead(HOSTS[0])
+    assert resolver.cache.get(HOSTS[0])["status"] == "unknown"
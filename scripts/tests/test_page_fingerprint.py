@@ -0,0 +1,69 @@
+"""ParkedPageIndex: marker rules need every signal, real small sites stay real"""
+
+from page_fingerprint import ParkedPageIndex
+
+CPANEL_CONSULTING = """<html><head><title>cPanel and WHM Consulting | Kovacs Hosting</title></head>
+<body><h1>cPanel &amp; WHM consulting</h1>
+<p>Server hardening, Plesk to cPanel migrations and 24/7 support for small agencies.</p>
+<a href="/contact">Contact us</a></body></html>"""
+
+AFTERNIC_BROKER = """<html><head><title>Domain Brokerage - Acme Names</title></head>
+<body><h1>We buy and sell premium domains</h1>
+<p>Listings are syndicated to Afternic and Sedo. See our
+<a href="https://www.afternic.com/forsale/acme.com">Afternic listing</a>.</p>
+<p>Coming soon: escrow service.</p></body></html>"""
+
+COMING_SOON = """<html><head><title>Coming Soon</title></head>
+<body><h1>Our new bakery opens in May</h1></body></html>"""
+
+SEDO_PARKED = """<html><head><title>example-shop.com</title>
+<script src="https://img.sedoparking.com/js/park.js"></script></head>
+<body><h1>example-shop.com</h1><p>This domain may be for sale!</p>
+<a href="https://sedo.com/search/details/?domain=example-shop.com">Buy this domain</a></body></html>"""
+
+NGINX_DEFAULT = """<html><head><title>Welcome to nginx!</title></head>
+<body><h1>Welcome to nginx!</h1><p>If you see this page, the nginx web server is
+successfully installed and working.</p></body></html>"""
+
+
+def make_index(tmp_path):
+    return ParkedPageIndex(str(tmp_path / "parked-templates.json"))
+
+
+def test_cpanel_consulting_site_is_not_parked(tmp_path):
+    assert make_index(tmp_path).classify(CPANEL_CONSULTING, "kovacs-hosting.hu") is None
+
+
+def test_broker_page_mentioning_afternic_is_not_parked(tmp_path):
+    assert make_index(tmp_path).classify(AFTERNIC_BROKER, "acme-names.com") is None
+
+
+def test_coming_soon_title_alone_is_not_parked(tmp_path):
+    assert make_index(tmp_path).classify(COMING_SOON, "bakery.hu") is None
+
+
+def test_registrar_parking_page_needs_marker_tiny_page_and_title(tmp_path):
+    match = make_index(tmp_path).classify(SEDO_PARKED, "example-shop.com")
+    assert match["label"] == "sedo"
+    assert match["method"] == "marker"
+    assert match["reason"][0] == "marker:sedoparking"
+    assert match["reason"][1].startswith("tiny-page:")
+    assert match["reason"][2] == "title:domain"
+
+
+def test_parking_marker_on_large_page_is_not_parked(tmp_path):
+    html = SEDO_PARKED.replace("</body>", "<p>" + "real content " * 200 + "</p></body>")
+    assert make_index(tmp_path).classify(html, "example-shop.com") is None
+
+
+def test_server_default_title(tmp_path):
+    match = make_index(tmp_path).classify(NGINX_DEFAULT, "fresh-server.com")
+    assert match["label"] == "nginx-default"
+    assert match["reason"][0] == "default-title:welcome to nginx!"
+
+
+def test_marker_hits_are_not_learned(tmp_path):
+    index = make_index(tmp_path)
+    index.classify(SEDO_PARKED, "example-shop.com")
+    assert index.templates == []
+    assert not index.dirty
@@ -0,0 +1,49 @@
+"""dns-cache.json / parked-templates.json shared by several shard processes"""
+
+import json
+
+from dns_cache import DnsCache
+from page_fingerprint import ParkedPageIndex, page_tokens, simhash, visible_text
+
+TEMPLATE_HTML = """<html><head><title>{domain}</title></head>
+<body><h1>{domain}</h1><p>This domain is parked free of charge.</p></body></html>"""
+
+
+def test_dns_saves_merge_instead_of_last_writer_wins(tmp_path):
+    path = str(tmp_path / "dns-cache.json")
+    shard_a, shard_b = DnsCache(path), DnsCache(path)
+    shard_a.put("a.example", "ok", ["192.0.2.1"])
+    shard_b.put("b.example", "dead", reason="NXDOMAIN")
+
+    assert shard_a.save() and shard_b.save()
+
+    with open(path) as f:
+        assert set(json.load(f)) == {"a.example", "b.example"}
+    assert list(tmp_path.iterdir()) == [tmp_path / "dns-cache.json"]  # no tmp file left behind
+
+
+def test_dns_save_failure_is_reported_not_raised(tmp_path):
+    cache = DnsCache(str(tmp_path / "missing-dir" / "dns-cache.json"))
+    cache.put("a.example", "ok", ["192.0.2.1"])
+    assert cache.save() is False
+    assert cache.dirty
+
+
+def test_parked_hits_from_every_shard_add_up(tmp_path):
+    path = str(tmp_path / "parked-templates.json")
+    seed = ParkedPageIndex(path)
+    html = TEMPLATE_HTML.format(domain="seed.com")
+    seed.add(simhash(page_tokens(html, visible_text(html), "seed.com")), "parked-generic")
+    assert seed.save()
+
+    shard_a, shard_b = ParkedPageIndex(path), ParkedPageIndex(path)
+    for domain in ("one.com", "two.com"):
+        assert shard_a.classify(TEMPLATE_HTML.format(domain=domain), domain)["method"] == "simhash"
+    assert shard_b.classify(TEMPLATE_HTML.format(domain="three.com"), "three.com")["method"] == "simhash"
+
+    assert shard_a.save() and shard_b.save()
+
+    with open(path) as f:
+        templates = json.load(f)
+    assert len(templates) == 1
+    assert templates[0]["hits"] == 3
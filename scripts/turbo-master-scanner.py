@@ -7,10 +7,13 @@ KEY INNOVATIONS:
 1. Shared Browser Instance - 1 browser, multiple contexts (70% faster)
 2. Context Pool - Reuse contexts across scans (50-100ms vs 2-3s)
 3. Aggressive Resource Blocking - 30-50% faster page loads
-4. Smart Wait Strategy - domcontentloaded instead of networkidle
+4. Smart Wait Strategy - domcontentloaded + event-driven settle (DOM quiet / AI widgets)
 5. Python Asyncio - Native async (no subprocess overhead)
-6. M4 Pro Optimization - 12 parallel contexts (14 CPU cores)
+6. Host-Sized Pool - cores * 0.85 contexts, autoscaled by utilization + host load
 7. **NEW: Queue Control** - Prevents queue overflow (like master-scanner)
+8. Tiered Crawl - curl_cffi HTTP tier first, Chromium only for needs_browser pages
+9. Persistent Analysis Workers - N long-lived `tsx src/worker/index.ts --serve`
+   processes (no npx / tsx / analyzer startup per scan)
 
 PERFORMANCE:
 - OLD: ~10-15s per scan, 10 parallel → ~4-6 scans/min
@@ -27,6 +30,27 @@ QUEUE CONTROL (v4):
 - Timeout cleanup for stuck scans
 - Periodic cleanup every 5 minutes
 - Status monitoring before adding new scans
+
+TIERED CRAWL (http_tier.py):
+- Minden domain először az HTTP tieren megy át (perzisztens curl_cffi
+  AsyncSession, Chrome TLS fingerprint) - nincs context, nincs renderer
+- Csak az eszkalált oldalak (needs_browser, bot-fal státusz, TLS hiba,
+  sikertelen fetch) kerülnek a ContextPool-ba
+- Mindkét tier ugyanazt a CrawlerResult-ot adja (crawlTier: http | browser);
+  egy batch HTTP_TIER_SCANS_PER_CONTEXT × context scant visz
+
+SHARDED MODE:
+- Egy Chromium + egy event loop egy ponton túl nem skálázódik (DOM munka és
+  Playwright IPC egy böngésző processen keresztül szerializálódik)
+- --shards K → K külön process, mindegyik saját böngészővel, ContextPool
+  szelettel és event loop-pal; a domainek stride szerint oszlanak el
+- A szülő process aggregált státuszt mutat (stats + navigation timing)
+
+Usage:
+    python3 turbo-master-scanner.py domains.txt
+    python3 turbo-master-scanner.py domains.txt --shards 4 [--contexts 48]
+    python3 turbo-master-scanner.py domains.txt --contexts 8 --no-autoscale   # fixed pool
+    python3 turbo-master-scanner.py domains.txt --browser-only                # no HTTP tier
 """
 
 import asyncio
@@ -38,9 +62,25 @@ import os
 import json
 import time
 import subprocess
+import multiprocessing
+import queue as queue_module
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
+from dns_cache import DnsCache, DnsResolver, DNS_LOOKAHEAD
+from validator_cache import ValidatorCache
+from page_fingerprint import ParkedPageIndex
+from page_pool import PagePool
+from settle import SettleTracker, SettleStats
+from network_capture import NetworkCapture
+from page_extract import extract_page_data, ExtractionStats
+from blocklist import BlocklistRouter
+from browser_recycler import BrowserRecycler
+from pool_autoscaler import PoolAutoscaler, host_pool_bounds
+from curl_cffi_fetch import fetch_with_curl_cffi, StageHistograms
+from http_tier import HttpTier
+from analysis_worker_pool import AnalysisWorkerPool, ANALYSIS_WORKERS
+from scan_counters import read_status_counts
 
 # ════════════════════════════════════════════════════════════════════
 # CONFIGURATION
@@ -49,17 +89,46 @@ from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 API_URL = "http://localhost:3000/api/scan"
 DB_URL = os.environ.get("DATABASE_URL", "postgresql://localhost/ai_security_scanner")
 
-# M4 Pro Optimized Settings (14 CPU cores)
-MAX_PARALLEL_CONTEXTS = 12   # 14 cores * 0.85 = 12 optimal (same as MAX_SCANNING)
+# Context pool: host-derived size (cores * 0.85, memory bound), autoscaled between
+# the host bounds by utilization / acquire wait / host CPU + memory (pool_autoscaler.py)
+AUTOSCALE_CONTEXTS = True    # --no-autoscale → fixed pool size
+MAX_PARALLEL_CONTEXTS = host_pool_bounds()["initial"]   # Was 12 (hand-picked for a 14-core M4 Pro)
 MAX_SCANNING = 12            # Max concurrent scans in database (QUEUE CONTROL)
 MAX_PENDING = 8              # Max waiting scans in database (QUEUE CONTROL)
 SCAN_TIMEOUT = 120           # 120s per scan timeout
 CONTEXT_REUSE_LIMIT = 50     # Reuse context max 50 times (prevent memory leak)
+BROWSER_DRAIN_TIMEOUT = 30   # Browser restart: wait this long for busy contexts, then force-close them
+RSS_RECYCLING = True         # Also retire contexts / restart the browser by Chromium RSS (browser_recycler.py)
 CLEANUP_INTERVAL = 300       # 5 minutes - periodic cleanup
 
+# Sharded mode (--shards K): K browser processes share MAX_PARALLEL_CONTEXTS
+# (or --contexts N); queue limits scale with the total context count
+SHARD_STATUS_INTERVAL = 5    # Seconds between aggregated status screens
+
+# DNS pre-resolution (dead domains → FAILED without a browser context)
+DNS_PRECHECK = True
+DNS_CACHE_FILE = "dns-cache.json"
+
+# Conditional re-fetch: unchanged pages (304 / same hash) reuse the previous scan
+CONDITIONAL_RESCAN = True
+VALIDATOR_CACHE_FILE = "fetch-validators.db"
+
+# Tiered crawl: curl_cffi HTTP tier first, browser only for escalated pages (--browser-only → off)
+HTTP_TIER = True
+HTTP_TIER_SCANS_PER_CONTEXT = 3   # Scans per batch per browser context (most never need one)
+
+# TypeScript analysis: persistent worker pool (analysis_worker_pool.py)
+WORKER_CWD = '/Users/racz-akacosiattila/Desktop/10_M_USD/ai-security-scanner'
+WORKER_SCRIPT = 'src/worker/index.ts'
+
+# Parked / placeholder pages → lightweight result, no analysis worker (matched signals in metadata)
+PARKED_DETECTION = True
+PARKED_TEMPLATES_FILE = "parked-templates.json"
+
 # Browser Settings
 HEADLESS = True              # Headless mode (20-30% faster)
-RESOURCE_BLOCKING = True     # Block images, fonts, media (30-50% faster)
+RESOURCE_BLOCKING = True     # Compiled context routes: ad/tracker hosts + static resources (blocklist.py)
+PREWARM_PAGES = True         # Create all contexts + warm pages at startup (PagePool)
 
 # Colors
 class Colors:
@@ -73,6 +142,51 @@ class Colors:
     MAGENTA = '\033[95m'
     GRAY = '\033[90m'
 
+# ════════════════════════════════════════════════════════════════════
+# STAGE TIMING
+# ════════════════════════════════════════════════════════════════════
+
+def navigation_timing(request) -> Optional[Dict[str, float]]:
+    """
+    Playwright navigation request → stage timing (same keys as curl_cffi_fetch)
+
+    Walks the redirect chain (request.redirected_from); earlier hops are
+    folded into redirect_ms. Playwright reports -1 for phases that did not
+    happen (reused connection, plain http) → 0 here.
+    """
+    if request is None:
+        return None
+
+    chain = []
+    while request is not None:
+        chain.append(request)
+        request = request.redirected_from
+    chain.reverse()
+
+    first, final = chain[0].timing, chain[-1].timing
+    if not final or final.get("startTime", -1) < 0:
+        return None
+
+    def span(start: str, end: str) -> float:
+        a, b = final.get(start, -1), final.get(end, -1)
+        return round(b - a, 1) if a >= 0 and b >= a else 0.0
+
+    tcp_end = "secureConnectionStart" if final.get("secureConnectionStart", -1) >= 0 else "connectEnd"
+    response_end = final.get("responseEnd", -1)
+    own_total = response_end if response_end >= 0 else max(final.get("responseStart", -1), 0)
+    redirect_ms = max(final["startTime"] - first.get("startTime", final["startTime"]), 0)
+
+    return {
+        "dns_ms": span("domainLookupStart", "domainLookupEnd"),
+        "connect_ms": span("connectStart", tcp_end),
+        "tls_ms": span("secureConnectionStart", "connectEnd"),
+        "ttfb_ms": span("requestStart", "responseStart"),
+        "transfer_ms": span("responseStart", "responseEnd"),
+        "redirect_ms": round(redirect_ms, 1),
+        "total_ms": round(redirect_ms + own_total, 1),
+        "redirect_count": len(chain) - 1,
+    }
+
 # ════════════════════════════════════════════════════════════════════
 # CONTEXT POOL (Key Innovation!)
 # ════════════════════════════════════════════════════════════════════
@@ -83,48 +197,152 @@ class ContextPool:
 
     Context creation: 50-100ms (vs 2-3s for browser launch)
     Context reuse: INSTANT (just clear cookies)
+    With a PagePool: every new context gets its warm page right away
+    With a BlocklistRouter: compiled blocking routes installed once per context
+    With a BrowserRecycler: contexts retired by usage / renderer RSS / crash,
+    the whole browser restarted (drain + browser_factory) above the RSS limit
+    With a PoolAutoscaler: max_size grows / shrinks between bounds (autoscale())
     """
 
-    def __init__(self, browser: Browser, max_size: int = 12):
+    def __init__(self, browser: Browser, max_size: int = 12, page_pool: PagePool = None,
+                 router: BlocklistRouter = None, recycler: BrowserRecycler = None,
+                 browser_factory=None, autoscaler: PoolAutoscaler = None):
         self.browser = browser
         self.max_size = max_size
+        self.autoscaler = autoscaler
+        self.leased_at = {}  # context -> acquire time (busy time per lease)
+        self.page_pool = page_pool
+        self.router = router
+        self.recycler = recycler
+        self.browser_factory = browser_factory  # async () -> Browser (restarts)
         self.available = asyncio.Queue()
         self.busy = set()
-        self.context_usage = {}  # Track usage count
+        self.context_usage = {}  # context -> usage count (live contexts only)
+        self.restart_lock = asyncio.Lock()
+        self.closing = False
+        self._watch_browser()
+
+    def _watch_browser(self):
+        """Browser crash (disconnected without close_all / restart) → restart"""
+        if self.recycler and self.browser_factory:
+            self.browser.on("disconnected", self._on_disconnected)
+
+    def _on_disconnected(self, browser=None):
+        if not self.closing:
+            print(f"{Colors.RED}💥 Browser disconnected - restart scheduled{Colors.RESET}")
+            self.recycler.browser_crashed()
+
+    async def prewarm(self, count: int):
+        """Create contexts (+ warm pages) up front instead of on the first scans"""
+        count = min(count, self.max_size) - self.available.qsize()
+        if count <= 0:
+            return
+        contexts = await asyncio.gather(*[self._create_context() for _ in range(count)])
+        for context in contexts:
+            await self.available.put(context)
 
     async def acquire(self) -> BrowserContext:
         """Get available context or create new one"""
+        start = time.monotonic()
+        if self.recycler:
+            self.recycler.maybe_sample(self.context_usage)
+            await self._maybe_restart_browser()
 
-        # Try to reuse existing context
-        if not self.available.empty():
+        if self.available.empty() and len(self.busy) < self.max_size:
+            # Create new context if under limit
+            context = await self._create_context()
+        else:
+            # Reuse an existing context (wait for one if all are busy)
             context = await self.available.get()
+            context = await self._recycle_if_needed(context)
 
-            # Check if context hit reuse limit
-            if self.context_usage.get(id(context), 0) >= CONTEXT_REUSE_LIMIT:
-                await context.close()
-                context = await self._create_context()
+        self.busy.add(context)
+        self.context_usage[context] = self.context_usage.get(context, 0) + 1
+        self.leased_at[context] = time.monotonic()
+        if self.autoscaler:
+            self.autoscaler.record_acquire((self.leased_at[context] - start) * 1000)
+            self.autoscaler.busy_changed(len(self.busy), self.max_size)
+        return context
 
-            self.busy.add(context)
-            self.context_usage[id(context)] = self.context_usage.get(id(context), 0) + 1
+    async def autoscale(self) -> int:
+        """Apply the autoscaler decision (once per interval) → current max_size"""
+        if not self.autoscaler:
+            return self.max_size
+        new_size = self.autoscaler.decide(self.max_size)
+        if new_size is not None:
+            print(f"{Colors.CYAN}📐 Context pool {self.max_size} → {new_size} "
+                  f"({self.autoscaler.last_metrics['action']}){Colors.RESET}")
+            self.max_size = new_size
+            # Shrunk → close surplus idle contexts now (busy ones close on release)
+            while len(self.context_usage) > self.max_size and not self.available.empty():
+                await self._close_context(self.available.get_nowait())
+        return self.max_size
+
+    async def _recycle_if_needed(self, context: BrowserContext) -> BrowserContext:
+        """Retire the context (usage / memory / crash) and replace it"""
+        uses = self.context_usage.get(context, 0)
+        crashed = bool(self.page_pool) and context in self.page_pool.crashed_contexts
+        if self.recycler:
+            reason = self.recycler.retire_reason(context, uses, crashed)
+        else:
+            reason = "usage" if uses >= CONTEXT_REUSE_LIMIT else None
+        if not reason:
             return context
 
-        # Create new context if under limit
-        if len(self.busy) < self.max_size:
-            context = await self._create_context()
-            self.busy.add(context)
-            self.context_usage[id(context)] = 1
-            return context
+        await self._close_context(context)
+        if self.recycler:
+            self.recycler.retired(context, reason)
+        return await self._create_context()
 
-        # Wait for available context
-        context = await self.available.get()
-        self.busy.add(context)
-        self.context_usage[id(context)] = self.context_usage.get(id(context), 0) + 1
-        return context
+    async def _maybe_restart_browser(self):
+        """RSS over the browser limit / browser crash → drain, relaunch"""
+        if not (self.recycler.restart_pending and self.browser_factory):
+            return
+
+        async with self.restart_lock:
+            if not self.recycler.restart_pending:
+                return  # Another acquirer already restarted it
+
+            reason = self.recycler.restart_pending
+            print(f"{Colors.YELLOW}♻️  Restarting browser ({reason}) - draining {len(self.busy)} busy contexts...{Colors.RESET}")
+            deadline = time.monotonic() + BROWSER_DRAIN_TIMEOUT
+            while self.busy and time.monotonic() < deadline:
+                await asyncio.sleep(0.1)  # In-flight scans finish on the old browser
+
+            if self.busy:
+                # Leaked / stuck leases must not block the restart (their release() is ignored later)
+                print(f"{Colors.YELLOW}⚠️  {len(self.busy)} contexts still busy after {BROWSER_DRAIN_TIMEOUT}s - force closing{Colors.RESET}")
+                for context in list(self.busy):
+                    await self._close_context(context)
+
+            await self._close_idle_contexts()
+            self.closing = True
+            try:
+                await self.browser.close()
+            except Exception:
+                pass  # Already crashed / disconnected
+            self.closing = False
+
+            self.browser = await self.browser_factory()
+            self._watch_browser()
+            self.recycler.browser_restarted()
+            print(f"{Colors.GREEN}✓ Browser restarted ({reason}){Colors.RESET}")
 
     async def release(self, context: BrowserContext):
         """Return context to pool (clear cookies for clean state)"""
-        if context in self.busy:
-            self.busy.remove(context)
+        if context not in self.context_usage:
+            return  # Already force-closed (browser restart drain timeout)
+        self.busy.discard(context)
+        leased_at = self.leased_at.pop(context, None)
+        if self.autoscaler:
+            if leased_at is not None:
+                self.autoscaler.record_lease(time.monotonic() - leased_at)
+            self.autoscaler.busy_changed(len(self.busy), self.max_size)
+
+        # Shrunk pool → close the surplus instead of keeping it idle
+        if len(self.busy) + self.available.qsize() >= self.max_size:
+            await self._close_context(context)
+            return
 
         try:
             # Clear cookies for clean state
@@ -137,10 +355,7 @@ class ContextPool:
         except Exception as e:
             # Context broken, close it
             print(f"{Colors.YELLOW}⚠️  Context cleanup failed, closing: {e}{Colors.RESET}")
-            try:
-                await context.close()
-            except:
-                pass
+            await self._close_context(context)
 
     async def _create_context(self) -> BrowserContext:
         """Create new browser context with optimized settings"""
@@ -150,24 +365,55 @@ class ContextPool:
             bypass_csp=True,
             ignore_https_errors=True,  # For security analysis
         )
+        if self.router:
+            await self.router.install(context)
+        if self.page_pool:
+            await self.page_pool.warm(context)
         return context
 
+    async def _close_context(self, context: BrowserContext):
+        """Close a context and drop every reference to it"""
+        self.busy.discard(context)
+        self.context_usage.pop(context, None)
+        self.leased_at.pop(context, None)
+        if self.page_pool:
+            self.page_pool.forget(context)
+        if self.recycler:
+            self.recycler.forget(context)
+        try:
+            await context.close()
+        except:
+            pass
+
+    async def _close_idle_contexts(self):
+        while not self.available.empty():
+            await self._close_context(self.available.get_nowait())
+
+    def get_health(self) -> Dict[str, Any]:
+        """Pool health: live / busy / idle contexts + recycler metrics"""
+        health = {
+            "live_contexts": len(self.context_usage),
+            "busy": len(self.busy),
+            "idle": self.available.qsize(),
+            "max_uses": max(self.context_usage.values(), default=0),
+            "max_size": self.max_size,
+        }
+        if self.recycler:
+            health.update(self.recycler.health())
+        if self.autoscaler:
+            health["autoscale"] = self.autoscaler.metrics()
+        return health
+
     async def close_all(self):
         """Close all contexts (cleanup)"""
-        # Close busy contexts
-        for context in list(self.busy):
-            try:
-                await context.close()
-            except:
-                pass
+        self.closing = True
+        if self.page_pool:
+            await self.page_pool.close_all()
 
-        # Close available contexts
-        while not self.available.empty():
-            try:
-                context = self.available.get_nowait()
-                await context.close()
-            except:
-                pass
+        # Close busy + available contexts
+        for context in list(self.busy):
+            await self._close_context(context)
+        await self._close_idle_contexts()
 
         self.busy.clear()
         self.context_usage.clear()
@@ -177,11 +423,34 @@ class ContextPool:
 # ════════════════════════════════════════════════════════════════════
 
 class TurboMasterScanner:
-    def __init__(self, domains_file: str):
+    def __init__(self, domains_file: str, shard_index: int = 0, shard_count: int = 1,
+                 max_contexts: int = MAX_PARALLEL_CONTEXTS, total_contexts: int = None,
+                 status_queue=None, context_bounds: Optional[tuple] = None,
+                 http_tier: bool = HTTP_TIER):
         self.domains_file = domains_file
         self.domains = []
         self.domain_index = 0
 
+        # Sharding (shard_count=1 → classic single-browser mode)
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.max_contexts = max_contexts
+        self.status_queue = status_queue  # Sharded: status goes to the coordinator
+
+        # Autoscaling pool: (min, max) contexts of this shard (None → fixed size)
+        self.autoscaler = PoolAutoscaler(*context_bounds) if context_bounds else None
+
+        # Tiered crawl: curl_cffi HTTP tier in front of the ContextPool
+        # (a batch carries scans_per_context scans per browser context)
+        self.http_tier = HttpTier() if http_tier else None
+        self.scans_per_context = HTTP_TIER_SCANS_PER_CONTEXT if self.http_tier else 1
+
+        # Queue control limits grow with the total context count (all shards, upper bound)
+        total_contexts = total_contexts or (context_bounds[1] if context_bounds else max_contexts)
+        total_scans = total_contexts * self.scans_per_context
+        self.max_scanning = max(MAX_SCANNING, total_scans)
+        self.max_pending = max(MAX_PENDING, MAX_PENDING * total_scans // MAX_PARALLEL_CONTEXTS)
+
         # Stats
         self.stats = {
             "total": 0,
@@ -189,9 +458,43 @@ class TurboMasterScanner:
             "success": 0,
             "failed": 0,
             "timeout": 0,
-            "skipped": 0
+            "skipped": 0,
+            "dns_failed": 0,
+            "reused": 0,
+            "parked": 0
         }
 
+        # Per-stage timing histograms (DNS / connect / TLS / TTFB / transfer)
+        self.navigation_timing = StageHistograms()   # Playwright page.goto
+        self.precheck_timing = StageHistograms()     # curl_cffi conditional rescan
+
+        # Event-driven settle times (instead of fixed 500 / 2000ms sleeps)
+        self.settle_stats = SettleStats()
+
+        # Concurrent post-settle extraction (evaluate / cookies / security / headers)
+        self.extraction_stats = ExtractionStats()
+
+        # RSS-aware context / browser recycling (psutil samples of the Chromium tree)
+        self.recycler = BrowserRecycler(reuse_limit=CONTEXT_REUSE_LIMIT) if RSS_RECYCLING else None
+
+        # Warm pages (one per context) + compiled context-level blocking routes
+        self.page_pool = PagePool()
+        self.blocklist = BlocklistRouter() if RESOURCE_BLOCKING else None
+
+        # Parked page fingerprint index (simhash templates)
+        self.parked_index = ParkedPageIndex(PARKED_TEMPLATES_FILE) if PARKED_DETECTION else None
+
+        # Persistent TS analysis workers (this shard's share of ANALYSIS_WORKERS)
+        self.analysis_pool = AnalysisWorkerPool(size=max(1, ANALYSIS_WORKERS // shard_count),
+                                                script=WORKER_SCRIPT, cwd=WORKER_CWD)
+
+        # Conditional re-fetch (ETag / Last-Modified / content hash)
+        self.validators = ValidatorCache(VALIDATOR_CACHE_FILE) if CONDITIONAL_RESCAN else None
+
+        # DNS pre-resolution
+        self.dns = None
+        self.dns_task = None
+
         # Playwright
         self.playwright = None
         self.browser = None
@@ -200,7 +503,8 @@ class TurboMasterScanner:
         # Database
         self.conn = None
         self.running = True
-        self.progress_file = "turbo-scanner-progress.json"
+        self.progress_file = ("turbo-scanner-progress.json" if shard_count == 1 else
+                              f"turbo-scanner-progress.shard{shard_index}of{shard_count}.json")
 
         # Active scans tracking
         self.active_scans = {}  # scan_id -> {"domain": ..., "start": ..., "task": ...}
@@ -222,10 +526,43 @@ class TurboMasterScanner:
         # Database
         self.connect_db()
 
-        # Playwright + Browser (ONCE!)
+        # Playwright + Browser (ONCE - again only when the recycler restarts it)
         print(f"{Colors.CYAN}🚀 Launching shared browser...{Colors.RESET}")
         self.playwright = await async_playwright().start()
+        await self.launch_browser()
 
+        # Context Pool
+        self.context_pool = ContextPool(self.browser, max_size=self.max_contexts,
+                                        page_pool=self.page_pool, router=self.blocklist,
+                                        recycler=self.recycler, browser_factory=self.launch_browser,
+                                        autoscaler=self.autoscaler)
+        if PREWARM_PAGES:
+            await self.context_pool.prewarm(self.max_contexts)
+
+        # HTTP tier (one persistent curl_cffi AsyncSession)
+        if self.http_tier:
+            if await self.http_tier.start():
+                print(f"{Colors.GREEN}✓ HTTP tier ready (curl_cffi, {self.http_tier.concurrency} in flight){Colors.RESET}")
+            else:
+                print(f"{Colors.YELLOW}⚠ curl_cffi not installed - browser tier only{Colors.RESET}")
+                self.http_tier = None
+                self.scans_per_context = 1
+
+        # Analysis workers (startup paid once here, not per scan)
+        alive = await self.analysis_pool.start()
+        print(f"{Colors.GREEN if alive else Colors.YELLOW}✓ Analysis workers ready: "
+              f"{alive}/{self.analysis_pool.size} ({WORKER_SCRIPT} --serve){Colors.RESET}")
+
+        # DNS resolver (runs ahead of the domain cursor)
+        if DNS_PRECHECK:
+            self.dns = DnsResolver(DnsCache(DNS_CACHE_FILE))
+            print(f"{Colors.GREEN}✓ DNS pre-resolution enabled (lookahead: {DNS_LOOKAHEAD}){Colors.RESET}")
+
+        print(f"{Colors.GREEN}✓ Browser launched (shared instance){Colors.RESET}")
+        print(f"{Colors.GREEN}✓ Context pool ready ({self.max_contexts} slots){Colors.RESET}")
+
+    async def launch_browser(self) -> Browser:
+        """Launch the shared Chromium (startup + recycler restarts)"""
         self.browser = await self.playwright.chromium.launch(
             headless=HEADLESS,
             args=[
@@ -236,12 +573,7 @@ class TurboMasterScanner:
                 '--disable-extensions',
             ]
         )
-
-        # Context Pool
-        self.context_pool = ContextPool(self.browser, max_size=MAX_PARALLEL_CONTEXTS)
-
-        print(f"{Colors.GREEN}✓ Browser launched (shared instance){Colors.RESET}")
-        print(f"{Colors.GREEN}✓ Context pool ready ({MAX_PARALLEL_CONTEXTS} slots){Colors.RESET}")
+        return self.browser
 
     def connect_db(self):
         """PostgreSQL connection"""
@@ -254,20 +586,14 @@ class TurboMasterScanner:
             sys.exit(1)
 
     def get_queue_status(self):
-        """Get current queue status from database (QUEUE CONTROL v4)"""
+        """Get current queue status from the trigger-maintained counters (QUEUE CONTROL v4, O(1))"""
         cur = self.conn.cursor()
-        cur.execute('''
-            SELECT
-                COUNT(*) FILTER (WHERE status = 'PENDING') as pending,
-                COUNT(*) FILTER (WHERE status = 'SCANNING') as scanning
-            FROM "Scan"
-        ''')
-        result = cur.fetchone()
+        counts = read_status_counts(cur)
         cur.close()
 
         return {
-            'pending': result[0] or 0,
-            'scanning': result[1] or 0
+            'pending': counts['pending'],
+            'scanning': counts['scanning']
         }
 
     def cleanup_stuck_scans(self):
@@ -301,6 +627,8 @@ class TurboMasterScanner:
         if time.time() - self.last_cleanup > CLEANUP_INTERVAL:
             print(f"\n{Colors.YELLOW}🧹 Periodic cleanup (every {CLEANUP_INTERVAL}s)...{Colors.RESET}")
             self.cleanup_stuck_scans()
+            if self.parked_index:
+                self.parked_index.save()
             self.last_cleanup = time.time()
 
     def load_domains(self):
@@ -309,6 +637,10 @@ class TurboMasterScanner:
             self.domains = [line.strip() for line in f
                           if line.strip() and not line.startswith('#')]
 
+        # Sharded: every K-th domain (stable split → per-shard progress files resume)
+        if self.shard_count > 1:
+            self.domains = self.domains[self.shard_index::self.shard_count]
+
         # Load progress
         if os.path.exists(self.progress_file):
             with open(self.progress_file, 'r') as f:
@@ -330,6 +662,7 @@ class TurboMasterScanner:
         progress = {
             'last_index': self.domain_index,
             'stats': self.stats,
+            'pool_health': self.context_pool.get_health() if self.context_pool else {},
             'timestamp': datetime.now().isoformat()
         }
         with open(self.progress_file, 'w') as f:
@@ -359,6 +692,108 @@ class TurboMasterScanner:
             print(f"  {Colors.RED}✗ Request failed: {domain}{Colors.RESET}")
             return None
 
+    def mark_dns_failed(self, scan_id: str, reason: str):
+        """Unresolvable domain → FAILED right away (no browser context used)"""
+        cur = self.conn.cursor()
+        cur.execute('''
+            UPDATE "Scan"
+            SET status = 'FAILED', "completedAt" = NOW(),
+                metadata = jsonb_build_object('error', %s)
+            WHERE id = %s
+        ''', (reason, scan_id))
+        cur.close()
+
+    async def check_not_modified(self, domain: str) -> Dict[str, Any]:
+        """
+        Conditional fetch for domains scanned before (curl_cffi, no browser)
+
+        Returns the fetch result ({} if the domain has no previous scan).
+        result["not_modified"] + result["previous_scan_id"] → reuse findings.
+        """
+        url = f'https://{domain}' if not domain.startswith('http') else domain
+        entry = self.validators.lookup(url)
+        if not entry or not entry["scan_id"]:
+            return {}
+        return await asyncio.to_thread(fetch_with_curl_cffi, url, None, self.validators)
+
+    def reuse_previous_scan(self, scan_id: str, previous_scan_id: str) -> bool:
+        """Copy findings (+ AI Trust Scorecard) of an unchanged page's last scan"""
+        cur = self.conn.cursor()
+        cur.execute('''
+            UPDATE "Scan" AS s
+            SET status = 'COMPLETED',
+                "riskScore" = p."riskScore",
+                "riskLevel" = p."riskLevel",
+                "hasAI" = p."hasAI",
+                "detectedTech" = p."detectedTech",
+                findings = p.findings,
+                "completedAt" = NOW(),
+                metadata = jsonb_build_object('reused_from', p.id, 'not_modified', true)
+            FROM "Scan" AS p
+            WHERE s.id = %s AND p.id = %s AND p.status = 'COMPLETED'
+        ''', (scan_id, previous_scan_id))
+        reused = cur.rowcount == 1
+
+        if reused:
+            cur.execute('''
+                INSERT INTO "AiTrustScorecard"
+                SELECT (jsonb_populate_record(
+                    NULL::"AiTrustScorecard",
+                    to_jsonb(t) || jsonb_build_object('id', gen_random_uuid()::text, 'scanId', %s)
+                )).*
+                FROM "AiTrustScorecard" AS t
+                WHERE t."scanId" = %s
+            ''', (scan_id, previous_scan_id))
+
+        cur.close()
+        return reused
+
+    def record_validators(self, scan_id: str, domain: str, crawl_result: Dict[str, Any],
+                          precheck: Dict[str, Any]):
+        """Remember validators of a successfully analyzed page for the next rescan"""
+        url = f'https://{domain}' if not domain.startswith('http') else domain
+        headers = {k.lower(): v for k, v in (crawl_result.get("responseHeaders") or {}).items()}
+        self.validators.store(
+            url, crawl_result.get("finalUrl") or url,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            content_hash=precheck.get("content_hash"),
+            scan_id=scan_id,
+        )
+
+    def record_parked(self, scan_id: str, crawl_result: Dict[str, Any], parked: Dict[str, Any]):
+        """Parked / placeholder page → lightweight COMPLETED result (no analyzers)"""
+        report = {
+            "summary": {
+                "parked": True,
+                "parkedLabel": parked["label"],
+                "parkedReason": parked["reason"],
+                "message": "Parked / placeholder page - full analysis skipped",
+            },
+            "detectedTech": {},
+            "findings": [],
+        }
+        metadata = {
+            "parked": parked,
+            "finalUrl": crawl_result.get("finalUrl"),
+            "title": crawl_result.get("title"),
+            "statusCode": crawl_result.get("statusCode"),
+        }
+
+        cur = self.conn.cursor()
+        cur.execute('''
+            UPDATE "Scan"
+            SET status = 'COMPLETED',
+                "scanType" = 'PARKED',
+                "hasAI" = false,
+                "scanDuration" = %s,
+                findings = %s::jsonb,
+                metadata = %s::jsonb,
+                "completedAt" = NOW()
+            WHERE id = %s
+        ''', (crawl_result.get("loadTime"), json.dumps(report), json.dumps(metadata), scan_id))
+        cur.close()
+
     async def scan_with_playwright(self, scan_id: str, domain: str) -> Dict[str, Any]:
         """
         Perform Playwright scan (ultra-fast!)
@@ -367,25 +802,24 @@ class TurboMasterScanner:
         1. Shared browser (no launch overhead)
         2. Context from pool (50-100ms)
         3. Resource blocking (30-50% faster)
-        4. Smart wait (domcontentloaded, not networkidle)
+        4. Smart wait (domcontentloaded + settle detection, not networkidle)
+        5. Concurrent extraction (one evaluate + cookies / TLS / headers in parallel)
         """
         start_time = time.time()
         url = f'https://{domain}' if not domain.startswith('http') else domain
 
         # Get context from pool
         context = await self.context_pool.acquire()
+        page = None
+        page_broken = True  # Until the scan got through (failure / cancel mid-navigation)
+        tracker = None
+        capture = None
 
         try:
-            # Create page
-            page = await context.new_page()
-
-            # Resource blocking (HUGE speedup!)
-            if RESOURCE_BLOCKING:
-                await page.route('**/*', lambda route: (
-                    route.abort() if route.request.resource_type in [
-                        'image', 'media', 'font', 'stylesheet', 'websocket'
-                    ] else route.continue_()
-                ))
+            # Warm page (resource blocking route already installed)
+            page = await self.page_pool.acquire(context)
+            tracker = SettleTracker(page)  # Before goto: AI widget requests start during load
+            capture = NetworkCapture(page)
 
             # Navigate (with timeout)
             try:
@@ -393,33 +827,33 @@ class TurboMasterScanner:
                 status_code = response.status if response else 0
             except Exception as e:
                 print(f"  {Colors.RED}✗ Navigation failed: {domain} - {e}{Colors.RESET}")
-                await page.close()
-                await self.context_pool.release(context)
+                page_broken = False  # Page itself is fine → reset + reuse
                 return {"success": False, "error": str(e)}
 
-            # Smart wait (500ms for JS, 2s for AI widgets)
-            await page.wait_for_timeout(500)
-            html = await page.content()
+            # Settle: DOM quiet period + pending AI widget requests (hard cap)
+            settle = await tracker.wait()
+            tracker.detach()
+            capture.detach()
+            self.settle_stats.add(settle)
 
-            # Extra wait for AI widgets
-            if 'intercom' in html.lower() or 'drift' in html.lower() or 'widget' in html.lower():
-                await page.wait_for_timeout(2000)
-                html = await page.content()  # Refresh HTML
+            # ONE evaluate (HTML, title, script / link / meta lists) + cookies, security
+            # details and ALL main document headers (Set-Cookie included), concurrently
+            extracted = await extract_page_data(page, context, response)
+            self.extraction_stats.add(extracted)
 
-            # Collect data (same as current crawler)
-            title = await page.title()
-            final_url = page.url
-            cookies = await context.cookies()
-
-            # Get security details
-            security_details = await response.security_details() if response else None
+            # Stage timing of the navigation (redirect chain included)
+            timing = navigation_timing(response.request) if response else None
+            if timing:
+                self.navigation_timing.add({"timing": timing, "redirect_count": timing["redirect_count"]})
 
+            final_url = page.url
             elapsed = time.time() - start_time
 
-            print(f"  {Colors.GREEN}✅ Crawled: {domain} ({elapsed:.1f}s){Colors.RESET}")
+            network = capture.summary()
+            print(f"  {Colors.GREEN}✅ Crawled: {domain} ({elapsed:.1f}s, settle {settle['settle_ms']}ms {settle['reason']}, "
+                  f"{network['allowed']} requests / {network['blocked']} blocked){Colors.RESET}")
 
-            await page.close()
-            await self.context_pool.release(context)
+            page_broken = False
 
             # Format result to match TypeScript CrawlerResult interface (camelCase!)
             crawl_result = {
@@ -427,8 +861,8 @@ class TurboMasterScanner:
                 "url": url,
                 "finalUrl": final_url,  # camelCase!
                 "statusCode": status_code,  # camelCase!
-                "html": html,
-                "title": title,
+                "html": extracted["html"],
+                "title": extracted["title"],
                 "cookies": [
                     {
                         "name": c["name"],
@@ -438,36 +872,75 @@ class TurboMasterScanner:
                         "httpOnly": c.get("httpOnly", False),
                         "secure": c.get("secure", False),
                         "sameSite": c.get("sameSite", "Lax")
-                    } for c in cookies
+                    } for c in extracted["cookies"]
                 ],
-                "sslCertificate": security_details,  # camelCase!
+                "sslCertificate": extracted["securityDetails"],  # camelCase!
                 "loadTime": int(elapsed * 1000),  # Convert to ms (camelCase!)
+                "timingBreakdown": dict(timing or {}, settle_ms=settle["settle_ms"],
+                                        extract_ms=extracted["timing"]["total_ms"]),  # dns_ms / ... / settle_ms / extract_ms
+                "settle": settle,
                 "timestamp": datetime.now().isoformat(),
                 "userAgent": "TURBO Scanner v5 (Playwright/Python)",
 
                 # Mock crawler compatibility fields
                 "domain": domain,
-                "networkRequests": [],  # TODO: Could capture from Playwright
-                "scripts": [],  # TODO: Could extract from page
-                "responseHeaders": {}  # TODO: Could capture from response
+                "networkRequests": capture.serialize(),  # Bounded (MAX_NETWORK_REQUESTS)
+                "networkCapture": network,  # captured / dropped / failed / blocked / allowed
+                "scripts": extracted["scripts"],
+                "inlineScripts": extracted["inlineScripts"],  # CSP sha256 hashes
+                "links": extracted["links"],
+                "metaTags": extracted["metaTags"],
+                "responseHeaders": extracted["headers"]
             }
 
             return crawl_result
 
         except Exception as e:
             print(f"  {Colors.RED}✗ Scan failed: {domain} - {e}{Colors.RESET}")
-            try:
-                await page.close()
-            except:
-                pass
-            await self.context_pool.release(context)
             return {"success": False, "error": str(e)}
 
+        finally:
+            # Every exit - cancellation too (batch timeout: CancelledError is not an Exception),
+            # otherwise the context stays busy forever and a browser restart never drains
+            if tracker is not None:
+                tracker.detach()
+            if capture is not None:
+                capture.detach()
+            try:
+                if page is not None:
+                    await self.page_pool.release(context, page, broken=page_broken)
+            finally:
+                await self.context_pool.release(context)
+
+    async def crawl(self, scan_id: str, domain: str, precheck: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Tiered crawl: HTTP tier first, browser tier (ContextPool) only when
+        the HTTP tier escalates (needs_browser, bot wall, TLS, fetch error)
+
+        A full conditional rescan precheck is reused instead of fetching again.
+        """
+        escalation = None
+        if self.http_tier:
+            url = f'https://{domain}' if not domain.startswith('http') else domain
+            prefetched = precheck if precheck and not precheck.get("not_modified") else None
+            crawl_result, escalation = await self.http_tier.crawl(url, domain, prefetched)
+            if crawl_result:
+                print(f"  {Colors.GREEN}⚡ Fetched: {domain} ({crawl_result['loadTime']}ms, HTTP tier - no browser){Colors.RESET}")
+                return crawl_result
+            print(f"  {Colors.GRAY}🌐 Browser tier: {domain} - {escalation}{Colors.RESET}")
+
+        crawl_result = await self.scan_with_playwright(scan_id, domain)
+        if crawl_result.get("success"):
+            crawl_result["crawlTier"] = "browser"
+            if escalation:
+                crawl_result["escalationReason"] = escalation
+        return crawl_result
+
     async def process_scan_full(self, scan_id: str, domain: str):
         """
         Full scan processing:
-        1. Playwright crawl (fast!)
-        2. Call TypeScript worker for analysis (reuse existing worker)
+        1. Tiered crawl (curl_cffi → Playwright only when needed)
+        2. TypeScript analysis on a persistent worker (AnalysisWorkerPool)
         """
 
         # Update DB status
@@ -479,8 +952,20 @@ class TurboMasterScanner:
         ''', (scan_id,))
         cur.close()
 
-        # Playwright scan
-        crawl_result = await self.scan_with_playwright(scan_id, domain)
+        # Rescan of an unchanged page → reuse previous findings (no browser, no worker)
+        precheck = {}
+        if self.validators:
+            precheck = await self.check_not_modified(domain)
+            self.precheck_timing.add(precheck)
+            if precheck.get("not_modified") and precheck.get("previous_scan_id"):
+                if self.reuse_previous_scan(scan_id, precheck["previous_scan_id"]):
+                    print(f"  {Colors.GREEN}♻️  Not modified, reused previous scan: {domain}{Colors.RESET}")
+                    self.stats['reused'] += 1
+                    self.stats['success'] += 1
+                    return
+
+        # HTTP tier → browser tier on escalation
+        crawl_result = await self.crawl(scan_id, domain, precheck)
 
         if not crawl_result.get("success"):
             # Mark failed
@@ -495,59 +980,38 @@ class TurboMasterScanner:
             self.stats['failed'] += 1
             return
 
-        # Save crawl data to Scan (so worker can use it)
-        cur = self.conn.cursor()
-        cur.execute('''
-            UPDATE "Scan"
-            SET metadata = jsonb_build_object(
-                'crawl_result', %s::jsonb
-            )
-            WHERE id = %s
-        ''', (json.dumps(crawl_result), scan_id))
-        cur.close()
-
-        # TURBO v5 HYBRID: Call TypeScript worker exactly like master-scanner.py
-        # Worker will check metadata.crawl_result and skip crawling (FAST!)
+        # Parked / placeholder page → skip the analysis worker entirely
+        if self.parked_index:
+            parked = self.parked_index.classify(crawl_result["html"], domain)
+            if parked:
+                print(f"  {Colors.GRAY}🅿️  Parked page ({parked['label']}: {', '.join(parked['reason'])}): {domain}{Colors.RESET}")
+                self.record_parked(scan_id, crawl_result, parked)
+                self.stats['parked'] += 1
+                self.stats['success'] += 1
+                return
+
+        # TURBO v5 HYBRID: TypeScript analysis on a persistent worker (AnalysisWorkerPool)
+        # Crawl result (HTML included) goes over the worker's stdin - no metadata write / read,
+        # the DB only sees the final results
         try:
-            print(f"  {Colors.BLUE}📊 Starting worker (will use pre-crawled data)...{Colors.RESET}")
-
-            # CLI mode: Pass scan ID and URL as arguments (TURBO v5)
-            worker_cmd = [
-                'npx', 'tsx', 'src/worker/index.ts',
-                '--scan-id', scan_id,
-                '--url', f'https://{domain}'
-            ]
+            print(f"  {Colors.BLUE}📊 Analyzing (will use pre-crawled data)...{Colors.RESET}")
 
-            # Run worker async (non-blocking) - let asyncio handle it
-            process = await asyncio.create_subprocess_exec(
-                *worker_cmd,
-                cwd='/Users/racz-akacosiattila/Desktop/10_M_USD/ai-security-scanner',
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            result = await self.analysis_pool.analyze(
+                scan_id, f'https://{domain}',
+                timeout=SCAN_TIMEOUT - 10,  # Leave 10s buffer
+                crawl_result=crawl_result
             )
 
-            # Wait for worker to complete with timeout
-            try:
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(),
-                    timeout=SCAN_TIMEOUT - 10  # Leave 10s buffer
-                )
-
-                if process.returncode == 0:
-                    print(f"  {Colors.GREEN}✅ Analysis complete: {domain}{Colors.RESET}")
-                    self.stats['success'] += 1
-                else:
-                    error_msg = stderr.decode()[:200] if stderr else "Unknown error"
-                    print(f"  {Colors.RED}✗ Worker failed: {error_msg}{Colors.RESET}")
-                    self.stats['failed'] += 1
-
-            except asyncio.TimeoutError:
+            if result["ok"]:
+                print(f"  {Colors.GREEN}✅ Analysis complete: {domain} ({result['durationMs']}ms){Colors.RESET}")
+                self.stats['success'] += 1
+                if self.validators:
+                    self.record_validators(scan_id, domain, crawl_result, precheck)
+            elif result["timeout"]:
                 print(f"  {Colors.RED}⏱️  Worker timeout: {domain}{Colors.RESET}")
-                process.kill()
-                await process.wait()
                 self.stats['timeout'] += 1
 
-                # Mark as FAILED
+                # Mark as FAILED (the worker was killed mid-scan)
                 cur = self.conn.cursor()
                 cur.execute('''
                     UPDATE "Scan"
@@ -556,6 +1020,10 @@ class TurboMasterScanner:
                     WHERE id = %s
                 ''', (scan_id,))
                 cur.close()
+            else:
+                error_msg = (result["error"] or "Unknown error")[:200]
+                print(f"  {Colors.RED}✗ Worker failed: {error_msg}{Colors.RESET}")
+                self.stats['failed'] += 1
 
         except Exception as e:
             print(f"  {Colors.RED}✗ Worker error: {domain} - {e}{Colors.RESET}")
@@ -587,8 +1055,30 @@ class TurboMasterScanner:
                 del self.active_scans[scan_id]
                 self.stats['processed'] += 1
 
+    def report_status(self):
+        """Sharded mode: send a status snapshot to the coordinator process"""
+        try:
+            self.status_queue.put_nowait({
+                "shard": self.shard_index,
+                "pid": os.getpid(),
+                "stats": dict(self.stats),
+                "active": len(self.active_scans),
+                "max_contexts": self.max_contexts,
+                "max_active": self.max_contexts * self.scans_per_context,
+                "navigation": self.navigation_timing.summary(),
+                "tiers": self.http_tier.get_stats() if self.http_tier else {},
+                "analysis": self.analysis_pool.get_stats(),
+                "pool_health": self.context_pool.get_health() if self.context_pool else {},
+            })
+        except Exception:
+            pass  # Coordinator gone / queue full - status is best effort
+
     def show_status(self):
         """Terminal UI"""
+        if self.status_queue is not None:
+            self.report_status()
+            return
+
         os.system('clear')
 
         print(f"{Colors.CYAN}{'═'*80}{Colors.RESET}")
@@ -610,16 +1100,45 @@ class TurboMasterScanner:
         # Queue status (v4)
         queue = self.get_queue_status()
         total_queue = queue['pending'] + queue['scanning']
-        queue_pct = (total_queue / (MAX_PENDING + MAX_SCANNING) * 100) if (MAX_PENDING + MAX_SCANNING) > 0 else 0
+        queue_limit = self.max_pending + self.max_scanning
+        queue_pct = (total_queue / queue_limit * 100) if queue_limit > 0 else 0
 
         print(f"{Colors.YELLOW}📊 QUEUE STATUS:{Colors.RESET}")
-        print(f"  PENDING: {queue['pending']}/{MAX_PENDING} | ", end="")
-        print(f"SCANNING: {queue['scanning']}/{MAX_SCANNING} | ", end="")
-        print(f"Total: {total_queue}/{MAX_PENDING + MAX_SCANNING} ({queue_pct:.0f}%)")
+        print(f"  PENDING: {queue['pending']}/{self.max_pending} | ", end="")
+        print(f"SCANNING: {queue['scanning']}/{self.max_scanning} | ", end="")
+        print(f"Total: {total_queue}/{queue_limit} ({queue_pct:.0f}%)")
+        if self.dns:
+            print(f"  DNS: {self.stats['dns_failed']} dead skipped | ", end="")
+            print(f"cache hit rate: {self.dns.hit_rate() * 100:.0f}% | ", end="")
+            print(f"lookups: {self.dns.stats['lookups']}")
+        print()
+
+        # Where the time goes (mean ms per stage)
+        print(f"{Colors.YELLOW}⏱  STAGE TIMING (mean ms):{Colors.RESET}")
+        print(f"  Navigation: {self.navigation_timing.compact_line()}")
+        if self.http_tier:
+            print(f"  HTTP tier:  {self.http_tier.timing.compact_line()}")
+        if self.validators:
+            print(f"  Precheck:   {self.precheck_timing.compact_line()}")
+        print(f"  Settle:     {self.settle_stats.summary_line()}")
+        print(f"  Extract:    {self.extraction_stats.summary_line()}")
+        print(f"  Analysis:   {self.analysis_pool.summary_line()}")
+        pages = self.page_pool.get_stats()
+        print(f"  Page acquire: avg {pages['acquire_ms_avg']:.1f}ms | max {pages['acquire_ms_max']:.1f}ms | ", end="")
+        print(f"warm hits: {pages['warm_hit_rate'] * 100:.0f}% | reset avg {pages['reset_ms_avg']:.1f}ms | ", end="")
+        print(f"recycled: {pages['recycled']}")
+        if self.http_tier:
+            print(f"  Tiers: {self.http_tier.summary_line()}")
+        if self.blocklist:
+            print(f"  Blocklist: {self.blocklist.summary_line()}")
+        if self.recycler:
+            print(f"  Memory: {self.recycler.summary_line()}")
+        if self.autoscaler:
+            print(f"  Autoscale: {self.autoscaler.summary_line()}")
         print()
 
         # Active scans
-        print(f"{Colors.BLUE}🔄 ACTIVE SCANS ({len(self.active_scans)}/{MAX_PARALLEL_CONTEXTS}):{Colors.RESET}")
+        print(f"{Colors.BLUE}🔄 ACTIVE SCANS ({len(self.active_scans)}/{self.max_contexts * self.scans_per_context}):{Colors.RESET}")
 
         for scan_id, info in list(self.active_scans.items())[:10]:  # Show max 10
             elapsed = int(time.time() - info['start'])
@@ -647,21 +1166,38 @@ class TurboMasterScanner:
 
         print(f"\n{Colors.GREEN}🚀 TURBO Scanner v5 HYBRID starting{Colors.RESET}")
         print(f"  Domains: {len(self.domains)}")
-        print(f"  Parallel Contexts: {MAX_PARALLEL_CONTEXTS}")
-        print(f"  MAX_SCANNING: {MAX_SCANNING} (database limit)")
-        print(f"  MAX_PENDING: {MAX_PENDING} (queue limit)")
+        if self.shard_count > 1:
+            print(f"  Shard: {self.shard_index + 1}/{self.shard_count} (pid {os.getpid()})")
+        print(f"  Parallel Contexts: {self.max_contexts}", end="")
+        if self.autoscaler:
+            print(f" (autoscale {self.autoscaler.min_size}-{self.autoscaler.max_size})")
+        else:
+            print(" (fixed)")
+        print(f"  MAX_SCANNING: {self.max_scanning} (database limit)")
+        print(f"  MAX_PENDING: {self.max_pending} (queue limit)")
         print(f"  Resource Blocking: {RESOURCE_BLOCKING}")
+        print(f"  HTTP Tier: {bool(self.http_tier)}" +
+              (f" ({self.scans_per_context} scans / context)" if self.http_tier else ""))
         print(f"  Expected speedup: 3-4x faster!\n")
 
         # Initial cleanup
         print(f"{Colors.YELLOW}🧹 Initial cleanup of stuck scans...{Colors.RESET}")
         self.cleanup_stuck_scans()
 
+        # Resolve upcoming domains in the background (ahead of the cursor)
+        if self.dns:
+            self.dns_task = asyncio.create_task(self.dns.run_ahead(
+                lambda: self.domains[self.domain_index:self.domain_index + DNS_LOOKAHEAD]
+            ))
+
         # Process in batches with QUEUE CONTROL
         while self.running and self.domain_index < len(self.domains):
             # Periodic cleanup every 5 minutes
             self.periodic_cleanup()
 
+            # Pool size (= batch size) follows the autoscaler
+            self.max_contexts = await self.context_pool.autoscale()
+
             # Get current queue status
             queue = self.get_queue_status()
 
@@ -670,21 +1206,34 @@ class TurboMasterScanner:
 
             # Create batch - respect MAX_PENDING limit
             batch = []
-            while (len(batch) < MAX_PARALLEL_CONTEXTS and
+            while (len(batch) < self.max_contexts * self.scans_per_context and
                    self.domain_index < len(self.domains) and
-                   queue['pending'] < MAX_PENDING and
-                   total_in_queue < MAX_PENDING + MAX_SCANNING):
+                   queue['pending'] < self.max_pending and
+                   total_in_queue < self.max_pending + self.max_scanning):
 
                 domain = self.domains[self.domain_index]
+
+                # DNS precheck: usually already resolved by the run-ahead task
+                dns_entry = await self.dns.resolve(domain) if self.dns else None
+
                 scan_id = self.create_scan(domain)
 
-                if scan_id:
+                if scan_id and dns_entry and dns_entry["status"] == "dead":
+                    print(f"  {Colors.RED}✗ DNS: {domain} - {dns_entry['reason']}{Colors.RESET}")
+                    self.mark_dns_failed(scan_id, dns_entry["reason"])
+                    self.stats['dns_failed'] += 1
+                    self.stats['failed'] += 1
+                    self.stats['processed'] += 1
+                elif scan_id:
                     batch.append((scan_id, domain))
                     queue['pending'] += 1  # Update local counter
                     total_in_queue += 1
 
                 self.domain_index += 1
 
+            if self.dns:
+                self.dns.maybe_save()
+
             if batch:
                 # Process batch in parallel
                 await self.process_batch(batch)
@@ -707,14 +1256,53 @@ class TurboMasterScanner:
         print(f"  Success: {self.stats['success']}")
         print(f"  Failed: {self.stats['failed']}")
         print(f"  Skipped: {self.stats['skipped']}")
+        print(f"  DNS failed: {self.stats['dns_failed']}")
+        print(f"  Reused (not modified): {self.stats['reused']}")
+        print(f"  Parked (analysis skipped): {self.stats['parked']}")
+        if self.http_tier:
+            print(f"  Tiers: {self.http_tier.summary_line()}")
 
         await self.cleanup()
         self.save_progress()
 
+        if self.status_queue is not None:
+            self.report_status()
+
     async def cleanup(self):
         """Cleanup resources"""
         print(f"{Colors.CYAN}🧹 Cleaning up...{Colors.RESET}")
 
+        if self.dns_task:
+            self.dns_task.cancel()
+            try:
+                await self.dns_task
+            except asyncio.CancelledError:
+                pass
+
+        if self.dns:
+            self.dns.close()
+
+        if self.validators:
+            self.validators.close()
+
+        if self.http_tier:
+            await self.http_tier.close()
+
+        print(f"  Analysis workers: {self.analysis_pool.summary_line()}")
+        await self.analysis_pool.close()
+
+        if self.parked_index:
+            self.parked_index.save()
+
+        print(f"{Colors.YELLOW}⏱  Navigation stage timing:{Colors.RESET}")
+        for line in self.navigation_timing.format_lines():
+            print(f"  {line}")
+        print(f"  Page pool: {self.page_pool.get_stats()}")
+        if self.blocklist:
+            print(f"  Blocklist: {self.blocklist.summary_line()}")
+        if self.context_pool:
+            print(f"  Pool health: {self.context_pool.get_health()}")
+
         if self.context_pool:
             await self.context_pool.close_all()
 
@@ -726,13 +1314,224 @@ class TurboMasterScanner:
 
         print(f"{Colors.GREEN}✓ Cleanup complete{Colors.RESET}")
 
+# ════════════════════════════════════════════════════════════════════
+# SHARDED MODE (multi-process)
+# ════════════════════════════════════════════════════════════════════
+
+def context_bounds_for(initial: int, shard_count: int = 1, autoscale: bool = True) -> Optional[tuple]:
+    """(min, max) autoscale bounds of one pool: host bounds, widened to include initial"""
+    if not autoscale:
+        return None
+    bounds = host_pool_bounds(shards=shard_count)
+    return (min(bounds["min"], initial), max(bounds["max"], initial))
+
+
+def run_shard(domains_file: str, shard_index: int, shard_count: int,
+              max_contexts: int, total_contexts: int, status_queue,
+              context_bounds: Optional[tuple] = None, http_tier: bool = HTTP_TIER):
+    """Shard process entry point: own browser, own ContextPool, own event loop"""
+    scanner = TurboMasterScanner(
+        domains_file,
+        shard_index=shard_index,
+        shard_count=shard_count,
+        max_contexts=max_contexts,
+        total_contexts=total_contexts,
+        status_queue=status_queue,
+        context_bounds=context_bounds,
+        http_tier=http_tier,
+    )
+    asyncio.run(scanner.run())
+
+
+class ShardCoordinator:
+    """
+    Sharded TURBO scanner - K browser processes instead of one
+
+    Minden shard egy külön process (spawn), saját Chromium-mal, ContextPool
+    szelettel és event loop-pal. A coordinator nem crawl-ol: elindítja a
+    shardokat, gyűjti a státuszukat, és aggregált képernyőt mutat.
+    """
+
+    def __init__(self, domains_file: str, shard_count: int,
+                 total_contexts: int = MAX_PARALLEL_CONTEXTS, autoscale: bool = AUTOSCALE_CONTEXTS,
+                 http_tier: bool = HTTP_TIER):
+        self.domains_file = domains_file
+        self.shard_count = shard_count
+        self.http_tier = http_tier
+        self.total_contexts = max(total_contexts, shard_count)
+
+        # Split contexts as evenly as possible (first shards get the remainder)
+        base, extra = divmod(self.total_contexts, shard_count)
+        self.contexts_per_shard = [base + (1 if i < extra else 0) for i in range(shard_count)]
+
+        # Each shard autoscales its own pool within its share of the host bounds
+        self.bounds_per_shard = [context_bounds_for(contexts, shard_count, autoscale)
+                                 for contexts in self.contexts_per_shard]
+        if autoscale:
+            self.total_contexts = max(self.total_contexts, sum(high for _, high in self.bounds_per_shard))
+
+        self.mp = multiprocessing.get_context("spawn")  # No fork after Playwright threads
+        self.status_queue = self.mp.Queue()
+        self.processes = []
+        self.shard_status = {}  # shard index -> last status snapshot
+        self.stopping = False
+
+        signal.signal(signal.SIGINT, self.signal_handler)
+        signal.signal(signal.SIGTERM, self.signal_handler)
+
+    def signal_handler(self, sig, frame):
+        """Forward shutdown to every shard, then wait for them"""
+        if not self.stopping:
+            print(f"\n{Colors.YELLOW}🛑 Stopping {self.shard_count} shards gracefully...{Colors.RESET}")
+        self.stopping = True
+        for process in self.processes:
+            if process.is_alive():
+                try:
+                    os.kill(process.pid, signal.SIGTERM)
+                except OSError:
+                    pass
+
+    def start(self):
+        for shard_index in range(self.shard_count):
+            process = self.mp.Process(
+                target=run_shard,
+                args=(self.domains_file, shard_index, self.shard_count,
+                      self.contexts_per_shard[shard_index], self.total_contexts,
+                      self.status_queue, self.bounds_per_shard[shard_index], self.http_tier),
+                name=f"turbo-shard-{shard_index}",
+            )
+            process.start()
+            self.processes.append(process)
+            print(f"{Colors.GREEN}✓ Shard {shard_index} started "
+                  f"(pid {process.pid}, {self.contexts_per_shard[shard_index]} contexts){Colors.RESET}")
+
+    def drain_status(self, timeout: float):
+        """Collect status snapshots (blocks up to timeout for the first one)"""
+        try:
+            status = self.status_queue.get(timeout=timeout)
+        except queue_module.Empty:
+            return
+        while True:
+            self.shard_status[status["shard"]] = status
+            try:
+                status = self.status_queue.get_nowait()
+            except queue_module.Empty:
+                return
+
+    def aggregate(self) -> tuple:
+        """(summed stats, active scans, merged navigation histograms)"""
+        stats = {}
+        active = 0
+        navigation = StageHistograms()
+        for status in self.shard_status.values():
+            for key, value in status["stats"].items():
+                stats[key] = stats.get(key, 0) + value
+            active += status["active"]
+            navigation.merge_summary(status["navigation"])
+        return stats, active, navigation
+
+    def show_status(self):
+        """Aggregated terminal UI (all shards)"""
+        os.system('clear')
+        stats, active, navigation = self.aggregate()
+        total = stats.get('total', 0)
+        processed = stats.get('processed', 0)
+        progress_pct = (processed / total * 100) if total > 0 else 0
+
+        print(f"{Colors.CYAN}{'═'*80}{Colors.RESET}")
+        print(f"{Colors.BOLD}{Colors.MAGENTA}       🚀 TURBO MASTER SCANNER v5 HYBRID - SHARDED ({self.shard_count} browsers) 🚀{Colors.RESET}")
+        print(f"{Colors.CYAN}{'═'*80}{Colors.RESET}")
+
+        print(f"Progress: {processed}/{total} ({progress_pct:.1f}%) | ", end="")
+        print(f"✅ {Colors.GREEN}{stats.get('success', 0)}{Colors.RESET} | ", end="")
+        print(f"❌ {Colors.RED}{stats.get('failed', 0)}{Colors.RESET} | ", end="")
+        print(f"⏱  {Colors.YELLOW}{stats.get('timeout', 0)}{Colors.RESET} | ", end="")
+        print(f"⏭  {Colors.YELLOW}{stats.get('skipped', 0)}{Colors.RESET} | ", end="")
+        print(f"🔄 {active}/{self.total_contexts} active")
+        print(f"{Colors.CYAN}{'═'*80}{Colors.RESET}\n")
+
+        print(f"{Colors.BLUE}🧩 SHARDS:{Colors.RESET}")
+        for shard_index, process in enumerate(self.processes):
+            status = self.shard_status.get(shard_index)
+            if process.is_alive():
+                state = f"{Colors.GREEN}● running{Colors.RESET}"
+            elif process.exitcode == 0:
+                state = f"{Colors.GRAY}✓ done{Colors.RESET}"
+            else:
+                state = f"{Colors.RED}✗ exit {process.exitcode}{Colors.RESET}"
+
+            if status:
+                shard_stats = status["stats"]
+                health = status.get("pool_health") or {}
+                memory = f"{health['total_mb']:.0f}MB" if "total_mb" in health else "-"
+                restarts = sum((health.get("browser_restarts") or {}).values())
+                tiers = status.get("tiers") or {}
+                shard_total = shard_stats.get('total', 0) or 1
+                filled = int(20 * shard_stats.get('processed', 0) / shard_total)
+                bar = '█' * filled + '░' * (20 - filled)
+                print(f"  #{shard_index:<2} pid {process.pid:<7} [{bar}] "
+                      f"{shard_stats.get('processed', 0)}/{shard_stats.get('total', 0)} | "
+                      f"active {status['active']}/{status.get('max_active', status['max_contexts'])} | "
+                      f"✅ {shard_stats.get('success', 0)} ❌ {shard_stats.get('failed', 0)} | "
+                      f"⚡ {tiers.get('served', 0)} 🌐 {tiers.get('escalated', 0)} | "
+                      f"RSS {memory} ♻️ {restarts} | {state}")
+            else:
+                print(f"  #{shard_index:<2} pid {process.pid:<7} (starting...) | {state}")
+
+        print(f"\n{Colors.YELLOW}⏱  STAGE TIMING (mean ms):{Colors.RESET}")
+        print(f"  Navigation: {navigation.compact_line()}")
+
+        print(f"\n{Colors.CYAN}{'─'*80}{Colors.RESET}")
+        print(f"[Ctrl+C to stop all shards] [Per-shard progress files: turbo-scanner-progress.shard*of{self.shard_count}.json]")
+
+    def run(self):
+        self.start()
+
+        while any(process.is_alive() for process in self.processes):
+            self.drain_status(SHARD_STATUS_INTERVAL)
+            if not self.stopping:
+                self.show_status()
+
+        # Final snapshots sent right before the shards exited
+        self.drain_status(0.5)
+        for process in self.processes:
+            process.join()
+
+        stats, _, navigation = self.aggregate()
+        print(f"\n{Colors.GREEN}✅ All {self.shard_count} shards finished!{Colors.RESET}")
+        print(f"  Total: {stats.get('total', 0)}")
+        print(f"  Success: {stats.get('success', 0)}")
+        print(f"  Failed: {stats.get('failed', 0)}")
+        print(f"  Skipped: {stats.get('skipped', 0)}")
+        print(f"  DNS failed: {stats.get('dns_failed', 0)}")
+        print(f"  Reused (not modified): {stats.get('reused', 0)}")
+        print(f"  Parked (analysis skipped): {stats.get('parked', 0)}")
+        print(f"{Colors.YELLOW}⏱  Navigation stage timing (all shards):{Colors.RESET}")
+        for line in navigation.format_lines():
+            print(f"  {line}")
+
+        failed_shards = [i for i, p in enumerate(self.processes) if p.exitcode != 0]
+        if failed_shards:
+            print(f"{Colors.RED}✗ Shards exited with errors: {failed_shards}{Colors.RESET}")
+
 # ════════════════════════════════════════════════════════════════════
 # MAIN
 # ════════════════════════════════════════════════════════════════════
 
+def option_value(name: str, default: int) -> int:
+    """Integer value of a --name N command line option"""
+    if name not in sys.argv[2:]:
+        return default
+    index = sys.argv.index(name)
+    if index + 1 >= len(sys.argv):
+        print(f"{Colors.RED}Missing value for {name}{Colors.RESET}")
+        sys.exit(1)
+    return int(sys.argv[index + 1])
+
+
 async def main():
     if len(sys.argv) < 2:
-        print(f"{Colors.RED}Usage: python3 turbo-master-scanner.py domains.txt{Colors.RESET}")
+        print(f"{Colors.RED}Usage: python3 turbo-master-scanner.py domains.txt [--shards K] [--contexts N] [--no-autoscale] [--browser-only]{Colors.RESET}")
         sys.exit(1)
 
     domains_file = sys.argv[1]
@@ -757,9 +1556,22 @@ async def main():
         print(f"{Colors.YELLOW}Install: pip3 install playwright && playwright install chromium{Colors.RESET}")
         sys.exit(1)
 
+    shard_count = option_value("--shards", 1)
+    total_contexts = option_value("--contexts", MAX_PARALLEL_CONTEXTS)
+    autoscale = AUTOSCALE_CONTEXTS and "--no-autoscale" not in sys.argv
+    http_tier = HTTP_TIER and "--browser-only" not in sys.argv
+
+    # Sharded: K browser processes (the coordinator itself runs no browser)
+    if shard_count > 1:
+        return ShardCoordinator(domains_file, shard_count, total_contexts, autoscale, http_tier)
+
     # Run scanner
-    scanner = TurboMasterScanner(domains_file)
+    scanner = TurboMasterScanner(domains_file, max_contexts=total_contexts,
+                                 context_bounds=context_bounds_for(total_contexts, 1, autoscale),
+                                 http_tier=http_tier)
     await scanner.run()
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    coordinator = asyncio.run(main())
+    if coordinator:
+        coordinator.run()
@@ -29,6 +29,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Set
 import subprocess
 import threading
+from scan_events import ScanEventListener, EVENTS_DB_URL, EVENT_RECONCILE_INTERVAL, FINAL_STATUSES
+from scan_counters import read_status_counts
 
 # ════════════════════════════════════════════════════════════════════
 # KONFIGURÁCIÓ
@@ -43,7 +45,7 @@ WORKER_BATCH_SIZE = 5         # Scan-ek per worker batch
 SCAN_TIMEOUT = 120            # Timeout per scan (seconds)
 
 # Performance Settings
-POLL_INTERVAL = 0.1           # Main loop poll (100ms - 10× gyorsabb!)
+POLL_INTERVAL = 0.1           # Main loop max wait (100ms) - status events (LISTEN) wake it earlier
 BATCH_CREATE_SIZE = 10        # Hány scan-t hoz létre egyszerre
 CLEANUP_INTERVAL = 120        # Cleanup interval (seconds)
 
@@ -192,6 +194,11 @@ class TurboScanner:
         # Active scans tracking
         self.active_scans: Dict[str, Dict] = {}  # scan_id: {worker_id, start_time, domain}
 
+        # Scan status events (LISTEN scan_status) instead of per-scan status SELECTs
+        self.events = ScanEventListener(EVENTS_DB_URL)
+        self.event_statuses: Dict[str, str] = {}  # scan_id → final status (not processed yet)
+        self.last_reconcile = 0.0
+
         # Stats
         self.stats = {
             "total": 0,
@@ -271,16 +278,11 @@ class TurboScanner:
         cur = conn.cursor()
 
         try:
-            # PENDING
-            cur.execute("SELECT COUNT(*) FROM \"Scan\" WHERE status = 'PENDING'")
-            pending = cur.fetchone()[0]
-
-            # SCANNING
-            cur.execute("SELECT COUNT(*) FROM \"Scan\" WHERE status = 'SCANNING'")
-            scanning = cur.fetchone()[0]
+            # PENDING + SCANNING: trigger-maintained counters (no COUNT(*) over "Scan")
+            counts = read_status_counts(cur)
 
             conn.commit()
-            return {"pending": pending, "scanning": scanning}
+            return {"pending": counts["pending"], "scanning": counts["scanning"]}
 
         finally:
             cur.close()
@@ -370,43 +372,52 @@ class TurboScanner:
             cur.close()
             self.put_db_conn(conn)
 
+    def wait_for_events(self, timeout: float):
+        """Alvás a következő körig - egy scan státusz esemény (NOTIFY) azonnal felébreszt"""
+        for event in self.events.wait(timeout):
+            if event["id"] in self.active_scans and event.get("status") in FINAL_STATUSES:
+                self.event_statuses[event["id"]] = event["status"]
+
     def check_completed_scans(self):
-        """Befejezett scan-ek ellenőrzése"""
+        """Befejezett scan-ek ellenőrzése (események + ritka, egyetlen lekérdezéses egyeztetés)"""
         completed_scan_ids = []
+        statuses = self.event_statuses
+        self.event_statuses = {}
+
+        # Safety net: no LISTEN connection (polling), (re)connect or missed events → ONE query
+        now = time.time()
+        reconcile = (not self.events.connected or self.events.needs_resync()
+                     or now - self.last_reconcile >= EVENT_RECONCILE_INTERVAL)
+        if reconcile and self.active_scans:
+            self.last_reconcile = now
+            conn = self.get_db_conn()
+            cur = conn.cursor()
+            try:
+                cur.execute('SELECT id, status FROM "Scan" WHERE id = ANY(%s)', (list(self.active_scans),))
+                statuses.update(cur.fetchall())
+                conn.commit()
+            finally:
+                cur.close()
+                self.put_db_conn(conn)
 
-        conn = self.get_db_conn()
-        cur = conn.cursor()
-
-        try:
-            for scan_id, scan_info in self.active_scans.items():
-                # Check DB status
-                cur.execute('SELECT status FROM "Scan" WHERE id = %s', (scan_id,))
-                result = cur.fetchone()
-
-                if result:
-                    status = result[0]
-
-                    if status in ['COMPLETED', 'FAILED']:
-                        elapsed = int(time.time() - scan_info['start_time'])
-
-                        if status == 'COMPLETED':
-                            print(f"  {Colors.GREEN}✅{Colors.RESET} {scan_info['domain'][:40]:40} ({elapsed}s)")
-                            self.stats['success'] += 1
-                        else:
-                            print(f"  {Colors.RED}❌{Colors.RESET} {scan_info['domain'][:40]:40}")
-                            self.stats['failed'] += 1
+        for scan_id, status in statuses.items():
+            scan_info = self.active_scans.get(scan_id)
 
-                        # Release worker back to pool
-                        self.worker_pool.release_worker(scan_info['worker_id'])
+            if scan_info and status in FINAL_STATUSES:
+                elapsed = int(time.time() - scan_info['start_time'])
 
-                        completed_scan_ids.append(scan_id)
-                        self.stats['processed'] += 1
+                if status == 'COMPLETED':
+                    print(f"  {Colors.GREEN}✅{Colors.RESET} {scan_info['domain'][:40]:40} ({elapsed}s)")
+                    self.stats['success'] += 1
+                else:
+                    print(f"  {Colors.RED}❌{Colors.RESET} {scan_info['domain'][:40]:40}")
+                    self.stats['failed'] += 1
 
-            conn.commit()
+                # Release worker back to pool
+                self.worker_pool.release_worker(scan_info['worker_id'])
 
-        finally:
-            cur.close()
-            self.put_db_conn(conn)
+                completed_scan_ids.append(scan_id)
+                self.stats['processed'] += 1
 
         # Remove completed scans
         for scan_id in completed_scan_ids:
@@ -541,6 +552,7 @@ class TurboScanner:
         # Queue Status
         print(f"\n{Colors.YELLOW}⏳ QUEUE:{Colors.RESET}")
         print(f"  Pending: {queue['pending']} | Scanning: {queue['scanning']}")
+        print(f"  Events: {self.events.summary_line()}")
 
         print(f"\n{Colors.MAGENTA}{'─'*80}{Colors.RESET}")
         print(f"[Ctrl+C to stop] [Auto-save every 10 scans]")
@@ -552,11 +564,16 @@ class TurboScanner:
         self.load_domains()
         self.worker_pool.start()
 
+        if self.events.connect():
+            print(f"{Colors.GREEN}✓ Scan status events: LISTEN {self.events.channel}{Colors.RESET}")
+        else:
+            print(f"{Colors.YELLOW}⚠️  LISTEN nem elérhető ({EVENTS_DB_URL.rsplit('@', 1)[-1]}) → polling{Colors.RESET}")
+
         print(f"\n{Colors.GREEN}🚀 Turbo Scanner indítása{Colors.RESET}")
         print(f"  Domains: {len(self.domains)}")
         print(f"  Worker Pool: {MAX_WORKERS}")
         print(f"  Timeout: {SCAN_TIMEOUT}s")
-        print(f"  Poll Interval: {POLL_INTERVAL}s (10× gyorsabb!)\n")
+        print(f"  Poll Interval: {POLL_INTERVAL}s (status events wake earlier)\n")
 
         time.sleep(2)
 
@@ -588,8 +605,8 @@ class TurboScanner:
             if self.stats['processed'] % 10 == 0 and self.stats['processed'] > 0:
                 self.save_progress()
 
-            # 8. Sleep (10× gyorsabb mint master-scanner!)
-            time.sleep(POLL_INTERVAL)
+            # 8. Wait for status events (max POLL_INTERVAL)
+            self.wait_for_events(POLL_INTERVAL)
 
         # Wait for remaining scans
         print(f"\n{Colors.YELLOW}Várakozás a fennmaradó scan-ekre...{Colors.RESET}")
@@ -597,7 +614,7 @@ class TurboScanner:
             self.check_completed_scans()
             self.check_timeouts()
             self.show_status()
-            time.sleep(POLL_INTERVAL)
+            self.wait_for_events(POLL_INTERVAL)
 
         # Finish
         print(f"\n{Colors.GREEN}✅ Scan befejezve!{Colors.RESET}")
@@ -611,6 +628,7 @@ class TurboScanner:
         print(f"\n  {Colors.CYAN}Átlagos sebesség: {scans_per_hour} scan/óra{Colors.RESET}")
 
         self.worker_pool.shutdown()
+        self.events.close()
         self.save_progress()
 
 # ════════════════════════════════════════════════════════════════════
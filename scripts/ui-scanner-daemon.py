@@ -12,7 +12,7 @@ USAGE:
     python3 ui-scanner-daemon.py --stop   # Daemon leállítása
 """
 
-import psycopg2
+import json
 import subprocess
 import time
 import sys
@@ -21,6 +21,7 @@ import signal
 import threading
 from datetime import datetime
 from typing import Dict, List, Optional
+from scanner_db import ScannerDB
 
 # ════════════════════════════════════════════════════════════════════
 # CONFIGURATION - UI optimized (lightweight)
@@ -48,6 +49,9 @@ running = True
 active_workers: Dict[int, Dict] = {}  # pid -> {start_time, job_id}
 workers_lock = threading.Lock()
 
+# Shared pooled DB access (no connect / close per helper call)
+db = ScannerDB(DB_URL, minconn=1, maxconn=4)
+
 def signal_handler(sig, frame):
     """Ctrl+C handler"""
     global running
@@ -61,16 +65,29 @@ signal.signal(signal.SIGTERM, signal_handler)
 # DATABASE FUNCTIONS
 # ════════════════════════════════════════════════════════════════════
 
+PENDING_JOBS_COUNT = db.statement("pending_jobs_count", """
+    SELECT COUNT(*) FROM "Job" WHERE status = 'PENDING'
+""")
+
+# Atomic claim with FOR UPDATE SKIP LOCKED
+# IMPORTANT: ORDER BY createdAt DESC = newest first = UI scans get priority!
+CLAIM_JOB = db.statement("claim_job", """
+    UPDATE "Job"
+    SET status = 'PROCESSING', "startedAt" = NOW(), attempts = attempts + 1
+    WHERE id = (
+        SELECT id FROM "Job"
+        WHERE status = 'PENDING' AND attempts < "maxAttempts"
+        ORDER BY "createdAt" DESC
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, type, data
+""")
+
 def get_pending_jobs_count() -> int:
     """Get count of PENDING jobs in queue"""
     try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-        cur.execute('SELECT COUNT(*) FROM "Job" WHERE status = \'PENDING\'')
-        count = cur.fetchone()[0]
-        cur.close()
-        conn.close()
-        return count
+        return db.fetchone(PENDING_JOBS_COUNT)[0]
     except Exception as e:
         print(f"[UI-Daemon] DB Error: {e}")
         return 0
@@ -78,31 +95,9 @@ def get_pending_jobs_count() -> int:
 def get_pending_job() -> Optional[Dict]:
     """Get and claim one pending job atomically - NEWEST FIRST for UI priority!"""
     try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-
-        # Atomic claim with FOR UPDATE SKIP LOCKED
-        # IMPORTANT: ORDER BY createdAt DESC = newest first = UI scans get priority!
-        cur.execute("""
-            UPDATE "Job"
-            SET status = 'PROCESSING', "startedAt" = NOW(), attempts = attempts + 1
-            WHERE id = (
-                SELECT id FROM "Job"
-                WHERE status = 'PENDING' AND attempts < "maxAttempts"
-                ORDER BY "createdAt" DESC
-                LIMIT 1
-                FOR UPDATE SKIP LOCKED
-            )
-            RETURNING id, type, data
-        """)
-
-        row = cur.fetchone()
-        conn.commit()
-        cur.close()
-        conn.close()
+        row = db.fetchone(CLAIM_JOB)
 
         if row:
-            import json
             return {
                 'id': row[0],
                 'type': row[1],
@@ -116,21 +111,13 @@ def get_pending_job() -> Optional[Dict]:
 def cleanup_stuck_scans(timeout_seconds: int = 120) -> int:
     """Clean up scans stuck in SCANNING for too long"""
     try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-
-        cur.execute("""
+        cleaned = db.execute("""
             UPDATE "Scan"
             SET status = 'FAILED', "completedAt" = NOW()
             WHERE status = 'SCANNING'
             AND "createdAt" < NOW() - make_interval(secs => %s)
         """, (timeout_seconds,))
 
-        cleaned = cur.rowcount
-        conn.commit()
-        cur.close()
-        conn.close()
-
         if cleaned > 0:
             print(f"[UI-Daemon] Cleaned {cleaned} stuck SCANNING scans")
         return cleaned
@@ -141,21 +128,13 @@ def cleanup_stuck_scans(timeout_seconds: int = 120) -> int:
 def cleanup_stuck_jobs(timeout_seconds: int = 300) -> int:
     """Reset jobs stuck in PROCESSING back to PENDING"""
     try:
-        conn = psycopg2.connect(DB_URL)
-        cur = conn.cursor()
-
-        cur.execute("""
+        reset = db.execute("""
             UPDATE "Job"
             SET status = 'PENDING', "startedAt" = NULL
             WHERE status = 'PROCESSING'
             AND "startedAt" < NOW() - make_interval(secs => %s)
         """, (timeout_seconds,))
 
-        reset = cur.rowcount
-        conn.commit()
-        cur.close()
-        conn.close()
-
         if reset > 0:
             print(f"[UI-Daemon] Reset {reset} stuck PROCESSING jobs")
         return reset
@@ -332,6 +311,7 @@ def main():
                 cleanup_stuck_jobs(300)
                 kill_stuck_workers()
                 last_cleanup = now
+                print(f"[UI-Daemon] DB pool: {db.summary_line()}")
 
             # Clean up dead workers
             cleanup_dead_workers()
@@ -380,6 +360,7 @@ def main():
 
         clear_lock_files()
         remove_pid_file()
+        db.close()
         print("[UI-Daemon] Stopped")
 
 if __name__ == "__main__":
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Conditional Re-Fetch Cache (ETag / Last-Modified)
+=================================================
+
+Rescan esetén eddig mindig teljes letöltés + teljes 40-analyzer futás volt.
+
+Ez a cache URL-enként eltárolja az ETag / Last-Modified validátorokat,
+a tartalom hash-ét és az utolsó sikeres scan ID-ját. A fetcher ezekből
+feltételes kérést küld (If-None-Match / If-Modified-Since), és
+not_modified=true-t jelez → az orchestrator újrahasználhatja az előző
+scan eredményét.
+
+Storage: SQLite (stdlib, WAL mód) - 224k+ URL mellett a JSON fájl
+újraírása túl drága lenne.
+
+Usage:
+    from validator_cache import ValidatorCache
+
+    cache = ValidatorCache("fetch-validators.db")
+    headers = cache.conditional_headers(url)       # {} if nothing cached
+    cache.store(url, final_url, etag=..., last_modified=..., content_hash=..., scan_id=...)
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+VALIDATOR_CACHE_FILE = "fetch-validators.db"
+
+
+def content_hash(html: str) -> str:
+    """Stable content hash (sha256 of the UTF-8 body)"""
+    return hashlib.sha256(html.encode("utf-8", "replace")).hexdigest()
+
+
+class ValidatorCache:
+    """
+    Per-URL validator store (keyed by final URL, also findable by request URL)
+
+    Thread-safe (one connection + lock) - curl_cffi server mode fetches
+    from a thread pool.
+    """
+
+    def __init__(self, path: str = VALIDATOR_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS validators (
+                url TEXT PRIMARY KEY,
+                request_url TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                scan_id TEXT,
+                updated_at REAL
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_validators_request_url ON validators(request_url)"
+        )
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        """Entry for a final URL or a request URL (or None)"""
+        with self.lock:
+            row = self.conn.execute("""
+                SELECT url, request_url, etag, last_modified, content_hash, scan_id, updated_at
+                FROM validators
+                WHERE url = ? OR request_url = ?
+                ORDER BY updated_at DESC
+                LIMIT 1
+            """, (url, url)).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "url": row[0],
+            "request_url": row[1],
+            "etag": row[2],
+            "last_modified": row[3],
+            "content_hash": row[4],
+            "scan_id": row[5],
+            "updated_at": row[6],
+        }
+
+    def conditional_headers(self, url: str, entry: Optional[Dict] = None) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers for url ({} if none cached)"""
+        entry = entry if entry is not None else self.lookup(url)
+        headers = {}
+        if entry:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, request_url: str, final_url: str, etag: str = None,
+              last_modified: str = None, content_hash: str = None, scan_id: str = None):
+        """
+        Upsert validators for final_url
+
+        etag / last_modified always reflect the latest response (a server that
+        dropped its ETag must not get a stale If-None-Match). content_hash
+        passed as None keeps the previous value. scan_id passed as None keeps
+        the previous scan only while the content hash is unchanged - findings
+        of old content must never be reused for new content.
+        """
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO validators (url, request_url, etag, last_modified, content_hash, scan_id, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    request_url = excluded.request_url,
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    content_hash = COALESCE(excluded.content_hash, validators.content_hash),
+                    scan_id = CASE
+                        WHEN excluded.scan_id IS NOT NULL THEN excluded.scan_id
+                        WHEN excluded.content_hash IS NOT NULL
+                             AND excluded.content_hash IS NOT validators.content_hash THEN NULL
+                        ELSE validators.scan_id
+                    END,
+                    updated_at = excluded.updated_at
+            """, (final_url, request_url, etag, last_modified, content_hash, scan_id, time.time()))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
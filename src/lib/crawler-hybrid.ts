@@ -7,27 +7,41 @@
  *
  * Várható eredmény: ~70% CPU megtakarítás
  *
+ * Escalation cache: a needs_browser döntés domainenként megmarad
+ * (escalation-cache.ts) → ismert Cloudflare / SPA domaineknél a curl_cffi
+ * kísérlet kimarad, egyből Playwright.
+ *
+ * Validator cache (CURL_CFFI_VALIDATOR_CACHE): egy 304 not_modified válasz
+ * üres body-val jön. A crawler nem tud korábbi scant újrahasznosítani (az
+ * a turbo-master-scanner.py reuse_previous_scan() dolga, ott van scan id)
+ * → ilyenkor teljes, feltétel nélküli újrakérés, sosem üres oldal.
+ *
  * Visszaállítás: .env-ben USE_HYBRID_CRAWLER=false
  */
 
 import { CrawlerAdapter } from './crawler-adapter'
-import { fetchWithCurlCffi, isCurlCffiAvailable } from './curl-cffi-wrapper'
+import { fetchWithCurlCffi, isCurlCffiAvailable, closeCurlCffiServer } from './curl-cffi-wrapper'
 import { fetchSSLCertificate, extractHostname } from './ssl-certificate-fetcher'
+import { EscalationCache } from './escalation-cache'
 import type { CrawlerResult, CookieData } from './types/crawler-types'
 
 export class HybridCrawler {
   private playwrightCrawler: CrawlerAdapter
   private curlCffiAvailable: boolean | null = null
+  private escalationCache: EscalationCache | null
 
   // Statistics
   private stats = {
     curlCffiSuccess: 0,
     curlCffiFail: 0,
+    curlCffiSkipped: 0, // Escalation cache → straight to Playwright
+    notModifiedRefetch: 0, // Empty 304 → full (unconditional) re-fetch
     playwrightFallback: 0,
   }
 
   constructor() {
     this.playwrightCrawler = new CrawlerAdapter()
+    this.escalationCache = process.env.ESCALATION_CACHE === 'false' ? null : new EscalationCache()
   }
 
   /**
@@ -54,10 +68,35 @@ export class HybridCrawler {
     // Check if curl_cffi is available
     const hasCurlCffi = await this.checkCurlCffi()
 
-    if (hasCurlCffi) {
+    // Known browser-only domain (Cloudflare challenge, SPA shell) → skip curl_cffi
+    const decision = hasCurlCffi && this.escalationCache ? this.escalationCache.lookup(url) : null
+    const skipCurl = decision?.tier === 'browser'
+
+    if (skipCurl && decision) {
+      this.stats.curlCffiSkipped++
+      console.log(`[HybridCrawler] ⏭️ Learned browser route (${decision.scope}, ${decision.reason}): ${url}`)
+    }
+
+    if (hasCurlCffi && !skipCurl) {
       console.log(`[HybridCrawler] 🚀 Trying curl_cffi: ${url}`)
 
-      const curlResult = await fetchWithCurlCffi(url, 15000)
+      let curlResult = await fetchWithCurlCffi(url, 15000)
+
+      // 304 Not Modified has no body and there is no previous scan to reuse here → full fetch
+      if (curlResult.success && curlResult.not_modified && !curlResult.html) {
+        this.stats.notModifiedRefetch++
+        console.log(`[HybridCrawler] 🔁 304 Not Modified, nothing to reuse → full fetch: ${url}`)
+        curlResult = await fetchWithCurlCffi(url, 15000, { conditional: false })
+      }
+
+      // Remember the decision (fetch errors say nothing about the page → not recorded)
+      if (curlResult.success && this.escalationCache) {
+        this.escalationCache.record(
+          url,
+          curlResult.needs_browser ? 'browser' : 'curl',
+          curlResult.detection_reason || null
+        )
+      }
 
       if (curlResult.success && !curlResult.needs_browser) {
         // curl_cffi succeeded!
@@ -65,7 +104,7 @@ export class HybridCrawler {
         const elapsed = Date.now() - startTime
 
         console.log(`[HybridCrawler] ✅ curl_cffi success (${elapsed}ms, ${curlResult.html_length} bytes)`)
-        console.log(`[HybridCrawler] 📊 Stats: curl_cffi=${this.stats.curlCffiSuccess}, fallback=${this.stats.playwrightFallback}`)
+        console.log(`[HybridCrawler] 📊 Stats: curl_cffi=${this.stats.curlCffiSuccess}, fallback=${this.stats.playwrightFallback}, skipped=${this.stats.curlCffiSkipped}`)
 
         // Convert curl_cffi result to CrawlerResult format (includes SSL cert fetch)
         return await this.convertCurlCffiResult(url, curlResult)
@@ -85,7 +124,7 @@ export class HybridCrawler {
 
     const elapsed = Date.now() - startTime
     console.log(`[HybridCrawler] ✅ Playwright success (${elapsed}ms)`)
-    console.log(`[HybridCrawler] 📊 Stats: curl_cffi=${this.stats.curlCffiSuccess}, fallback=${this.stats.playwrightFallback}`)
+    console.log(`[HybridCrawler] 📊 Stats: curl_cffi=${this.stats.curlCffiSuccess}, fallback=${this.stats.playwrightFallback}, skipped=${this.stats.curlCffiSkipped}`)
 
     return playwrightResult
   }
@@ -175,6 +214,15 @@ export class HybridCrawler {
       loadTime: curlResult.elapsed_ms || 0,
       timingBreakdown: {
         curlCffi: curlResult.elapsed_ms || 0,
+        ...(curlResult.timing && {
+          dns: curlResult.timing.dns_ms,
+          connect: curlResult.timing.connect_ms,
+          tls: curlResult.timing.tls_ms,
+          ttfb: curlResult.timing.ttfb_ms,
+          transfer: curlResult.timing.transfer_ms,
+          redirect: curlResult.timing.redirect_ms,
+        }),
+        redirectCount: curlResult.redirect_count || 0,
       },
       timestamp: new Date(),
       userAgent: 'curl_cffi/chrome120',
@@ -209,6 +257,7 @@ export class HybridCrawler {
       total,
       curlCffiRate: `${curlCffiRate}%`,
       estimatedCpuSavings: `${curlCffiRate * 0.99}%`, // ~99% CPU savings per curl_cffi
+      escalationCache: this.escalationCache?.getStats() ?? null,
     }
   }
 
@@ -217,6 +266,8 @@ export class HybridCrawler {
    */
   async close(): Promise<void> {
     console.log(`[HybridCrawler] 📊 Final stats:`, this.getStats())
+    this.escalationCache?.save()
+    closeCurlCffiServer()
     await this.playwrightCrawler.close()
     console.log('[HybridCrawler] Closed')
   }
@@ -3,10 +3,17 @@
  *
  * Calls the Python curl_cffi_fetch.py script as a subprocess
  * and returns the result in a format compatible with CrawlerAdapter.
+ *
+ * Default: one resident `curl_cffi_fetch.py --server` process per Node
+ * process (NDJSON over stdin/stdout) → no interpreter startup + curl_cffi
+ * import per URL. Disable with CURL_CFFI_SERVER=false (one-shot spawn).
  */
 
-import { spawn } from 'child_process'
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process'
 import path from 'path'
+import readline from 'readline'
+
+const USE_CURL_CFFI_SERVER = process.env.CURL_CFFI_SERVER !== 'false'
 
 export interface CurlCffiResult {
   success: boolean
@@ -27,17 +34,178 @@ export interface CurlCffiResult {
   needs_browser?: boolean
   detection_reason?: string
   html_length?: number
+  truncated?: boolean
+  aborted_early?: boolean
+  not_modified?: boolean
+  content_hash?: string
+  previous_scan_id?: string | null
+  timing?: CurlCffiTiming | null
+  redirect_count?: number
+  hops?: Array<{
+    url: string
+    status_code: number
+    timing: CurlCffiTiming | null
+  }>
   error?: string
 }
 
+/**
+ * libcurl stage breakdown (ms) - stages add up to total_ms
+ */
+export interface CurlCffiTiming {
+  dns_ms: number
+  connect_ms: number
+  tls_ms: number
+  ttfb_ms: number
+  transfer_ms: number
+  redirect_ms: number
+  total_ms: number
+}
+
+/**
+ * Per-fetch options
+ */
+export interface CurlCffiFetchOptions {
+  /**
+   * false → no If-None-Match / If-Modified-Since from the validator cache,
+   * so the result always carries the full body (never an empty 304)
+   */
+  conditional?: boolean
+}
+
+interface PendingFetch {
+  resolve: (result: CurlCffiResult) => void
+  timer: NodeJS.Timeout
+}
+
+/**
+ * Persistent curl_cffi fetch server (one Python process, many fetches)
+ */
+class CurlCffiServer {
+  private process: ChildProcessWithoutNullStreams | null = null
+  private pending = new Map<string, PendingFetch>()
+  private nextId = 0
+
+  private start(): ChildProcessWithoutNullStreams {
+    const scriptPath = path.join(process.cwd(), 'scripts', 'curl_cffi_fetch.py')
+
+    const python = spawn('python3', [scriptPath, '--server'], {
+      cwd: process.cwd(),
+    })
+
+    readline.createInterface({ input: python.stdout }).on('line', (line) => {
+      let result: CurlCffiResult & { id?: string }
+      try {
+        result = JSON.parse(line)
+      } catch {
+        return
+      }
+
+      const entry = result.id !== undefined ? this.pending.get(result.id) : undefined
+      if (!entry) return
+
+      clearTimeout(entry.timer)
+      this.pending.delete(result.id!)
+      delete result.id
+      entry.resolve(result)
+    })
+
+    // Server logs go to stderr - ignore them, but keep the pipe drained
+    python.stderr.on('data', () => {})
+
+    // EPIPE after the server died is reported via 'close' below
+    python.stdin.on('error', () => {})
+
+    const onExit = (reason: string) => {
+      if (this.process !== python) return
+      this.process = null
+      this.failAll(reason)
+    }
+
+    python.on('close', (code) => onExit(`curl_cffi server exited (code ${code})`))
+    python.on('error', (err) => onExit(`Process error: ${err.message}`))
+
+    return python
+  }
+
+  private failAll(error: string) {
+    for (const [id, entry] of this.pending) {
+      clearTimeout(entry.timer)
+      entry.resolve({ success: false, error, needs_browser: true })
+      this.pending.delete(id)
+    }
+  }
+
+  fetch(url: string, timeoutMs: number, options: CurlCffiFetchOptions = {}): Promise<CurlCffiResult> {
+    if (!this.process) {
+      this.process = this.start()
+    }
+
+    const id = String(++this.nextId)
+    const python = this.process
+
+    return new Promise((resolve) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id)
+        resolve({
+          success: false,
+          error: `Timeout after ${timeoutMs}ms`,
+          needs_browser: true,
+        })
+      }, timeoutMs)
+
+      this.pending.set(id, { resolve, timer })
+      const request = options.conditional === false ? { id, url, conditional: false } : { id, url }
+      python.stdin.write(JSON.stringify(request) + '\n')
+    })
+  }
+
+  close() {
+    if (this.process) {
+      const python = this.process
+      this.process = null
+      this.failAll('curl_cffi server closed')
+      python.kill()
+    }
+  }
+}
+
+const curlCffiServer = new CurlCffiServer()
+
 /**
  * Fetch URL using curl_cffi Python script
  * @param url URL to fetch
  * @param timeoutMs Timeout in milliseconds (default: 15000)
+ * @param options conditional: false → full fetch even with a validator cache
  */
 export async function fetchWithCurlCffi(
   url: string,
-  timeoutMs: number = 15000
+  timeoutMs: number = 15000,
+  options: CurlCffiFetchOptions = {}
+): Promise<CurlCffiResult> {
+  if (USE_CURL_CFFI_SERVER) {
+    return curlCffiServer.fetch(url, timeoutMs, options)
+  }
+  return fetchWithCurlCffiOneShot(url, timeoutMs, options)
+}
+
+/**
+ * Stop the persistent curl_cffi fetch server (if running)
+ */
+export function closeCurlCffiServer(): void {
+  curlCffiServer.close()
+}
+
+/**
+ * Fetch URL by spawning a fresh curl_cffi_fetch.py process (legacy path)
+ * @param url URL to fetch
+ * @param timeoutMs Timeout in milliseconds (default: 15000)
+ * @param options conditional: false → full fetch even with a validator cache
+ */
+export async function fetchWithCurlCffiOneShot(
+  url: string,
+  timeoutMs: number = 15000,
+  options: CurlCffiFetchOptions = {}
 ): Promise<CurlCffiResult> {
   return new Promise((resolve) => {
     const scriptPath = path.join(process.cwd(), 'scripts', 'curl_cffi_fetch.py')
@@ -46,7 +214,8 @@ export async function fetchWithCurlCffi(
     let stderr = ''
     let resolved = false
 
-    const python = spawn('python3', [scriptPath, url], {
+    const args = options.conditional === false ? [scriptPath, url, '--no-conditional'] : [scriptPath, url]
+    const python = spawn('python3', args, {
       cwd: process.cwd(),
       timeout: timeoutMs,
     })
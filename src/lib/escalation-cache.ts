@@ -0,0 +1,254 @@
+/**
+ * Escalation Cache - learned curl_cffi → Playwright routing
+ *
+ * A HybridCrawler minden scan-nél először curl_cffi-t próbál, és csak
+ * needs_browser=true esetén vált Playwright-ra. Ez a döntés eddig elveszett
+ * → a Cloudflare mögötti és SPA domainek minden rescan-nél fizettek egy
+ * felesleges curl kísérletet.
+ *
+ * Ez a store domainenként (és regisztrálható domainenként) megjegyzi
+ * az eredményt (tier + reason + timestamp), időbeli lecsengéssel:
+ *
+ *   confidence = min(streak, STREAK_CAP) / STREAK_CAP * 0.5 ^ (age / HALF_LIFE)
+ *
+ * confidence >= MIN_CONFIDENCE és tier = browser → curl_cffi kihagyva.
+ * Egy friss, egyszeri döntés ~1 half-life-ig él, utána a domain újra
+ * curl_cffi-vel próbálkozik (pl. lekerült róla a Cloudflare challenge).
+ *
+ * Registrable domain (example.co.uk) szint: csak challenge típusú okok
+ * (Cloudflare) öröklődnek a subdomainekre - az SPA döntés host-specifikus.
+ *
+ * Storage: JSON fájl (ESCALATION_CACHE_FILE, default ./escalation-cache.json),
+ * mentéskor a lemezen lévő változattal merge-elve (több worker process).
+ */
+
+import fs from 'fs'
+import path from 'path'
+
+export type CrawlTier = 'curl' | 'browser'
+
+export interface EscalationEntry {
+  tier: CrawlTier
+  reason: string | null
+  updatedAt: number // ms epoch
+  streak: number // consecutive observations with the same tier
+}
+
+export interface EscalationDecision {
+  tier: CrawlTier
+  reason: string | null
+  confidence: number
+  scope: 'host' | 'registrable'
+}
+
+const ESCALATION_CACHE_FILE =
+  process.env.ESCALATION_CACHE_FILE || path.join(process.cwd(), 'escalation-cache.json')
+
+const HALF_LIFE_MS = 7 * 24 * 3600 * 1000 // Decision weight halves every 7 days
+const MAX_AGE_MS = 60 * 24 * 3600 * 1000 // Entries older than 60 days are dropped
+const STREAK_CAP = 3 // 3 consistent observations = full confidence
+const MIN_CONFIDENCE = 0.25 // Below this → probe curl_cffi again
+const SAVE_EVERY_UPDATES = 25
+const SAVE_INTERVAL_MS = 30 * 1000
+
+// Reasons that apply to the whole zone (registrable domain), not just one host
+const ZONE_WIDE_REASON_PATTERN = /cloudflare/i
+
+// Common multi-label public suffixes (no PSL dependency in this repo)
+const MULTI_LABEL_SUFFIXES = new Set([
+  'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'me.uk', 'ltd.uk', 'plc.uk',
+  'com.au', 'net.au', 'org.au', 'edu.au', 'gov.au',
+  'co.nz', 'org.nz', 'co.za', 'co.jp', 'ne.jp', 'or.jp',
+  'com.br', 'com.mx', 'com.ar', 'com.tr', 'com.cn', 'com.hk', 'com.sg', 'com.tw',
+  'co.in', 'co.il', 'co.kr', 'com.pl', 'com.ua', 'com.ro',
+  'co.hu', 'info.hu', 'org.hu',
+])
+
+/**
+ * Registrable domain (eTLD+1) - heuristic, covers the common multi-label suffixes
+ */
+export function registrableDomain(hostname: string): string {
+  const labels = hostname.toLowerCase().replace(/\.$/, '').split('.')
+  if (labels.length <= 2) return labels.join('.')
+
+  const lastTwo = labels.slice(-2).join('.')
+  if (MULTI_LABEL_SUFFIXES.has(lastTwo)) {
+    return labels.slice(-3).join('.')
+  }
+  return lastTwo
+}
+
+function hostnameOf(url: string): string {
+  try {
+    return new URL(url.includes('://') ? url : `https://${url}`).hostname.toLowerCase()
+  } catch {
+    return url.replace(/^https?:\/\//, '').split('/')[0].split(':')[0].toLowerCase()
+  }
+}
+
+export class EscalationCache {
+  private entries = new Map<string, EscalationEntry>()
+  private dirty = false
+  private updatesSinceSave = 0
+  private lastSave = Date.now()
+
+  private stats = {
+    lookups: 0,
+    hits: 0, // browser routed directly (curl_cffi skipped)
+    hostHits: 0,
+    registrableHits: 0,
+    expired: 0, // decision found but decayed below MIN_CONFIDENCE
+    recorded: 0,
+  }
+
+  constructor(private filePath: string = ESCALATION_CACHE_FILE) {
+    this.entries = this.readFile()
+  }
+
+  /**
+   * Decayed confidence of an entry (0..1)
+   */
+  static confidence(entry: EscalationEntry, now: number = Date.now()): number {
+    const age = Math.max(0, now - entry.updatedAt)
+    return (Math.min(entry.streak, STREAK_CAP) / STREAK_CAP) * Math.pow(0.5, age / HALF_LIFE_MS)
+  }
+
+  /**
+   * Learned tier for a URL (null → no confident decision, use the default path)
+   */
+  lookup(url: string): EscalationDecision | null {
+    this.stats.lookups++
+    const host = hostnameOf(url)
+    const now = Date.now()
+
+    const hostEntry = this.entries.get(host)
+    if (hostEntry) {
+      const confidence = EscalationCache.confidence(hostEntry, now)
+      if (confidence >= MIN_CONFIDENCE) {
+        if (hostEntry.tier === 'browser') {
+          this.stats.hits++
+          this.stats.hostHits++
+        }
+        return { tier: hostEntry.tier, reason: hostEntry.reason, confidence, scope: 'host' }
+      }
+      this.stats.expired++ // Stale host decision → the zone decision may still apply
+    }
+
+    const zoneEntry = this.entries.get(`*.${registrableDomain(host)}`)
+    if (zoneEntry && zoneEntry.tier === 'browser') {
+      const confidence = EscalationCache.confidence(zoneEntry, now)
+      if (confidence >= MIN_CONFIDENCE) {
+        this.stats.hits++
+        this.stats.registrableHits++
+        return { tier: 'browser', reason: zoneEntry.reason, confidence, scope: 'registrable' }
+      }
+      this.stats.expired++
+    }
+
+    return null
+  }
+
+  /**
+   * Record the outcome of a curl_cffi attempt
+   *
+   * tier = 'browser' → curl_cffi fetched the page but it needs a browser
+   * tier = 'curl'    → curl_cffi result was good enough
+   * (network errors are NOT recorded - they say nothing about the page)
+   */
+  record(url: string, tier: CrawlTier, reason: string | null = null): void {
+    const host = hostnameOf(url)
+    const now = Date.now()
+    this.stats.recorded++
+
+    this.update(host, tier, reason, now)
+
+    // Zone-wide challenges teach the registrable domain; a curl success on
+    // any host of that zone contradicts (and resets) the zone decision
+    const zoneKey = `*.${registrableDomain(host)}`
+    if (tier === 'browser' && reason && ZONE_WIDE_REASON_PATTERN.test(reason)) {
+      this.update(zoneKey, tier, reason, now)
+    } else if (tier === 'curl' && this.entries.has(zoneKey)) {
+      this.update(zoneKey, tier, reason, now)
+    }
+
+    this.updatesSinceSave++
+    this.maybeSave()
+  }
+
+  private update(key: string, tier: CrawlTier, reason: string | null, now: number): void {
+    const previous = this.entries.get(key)
+    this.entries.set(key, {
+      tier,
+      reason,
+      updatedAt: now,
+      streak: previous && previous.tier === tier ? previous.streak + 1 : 1,
+    })
+    this.dirty = true
+  }
+
+  /**
+   * Hit rate = lookups routed straight to the browser / all lookups
+   */
+  getStats() {
+    const hitRate = this.stats.lookups > 0
+      ? Math.round((this.stats.hits / this.stats.lookups) * 100)
+      : 0
+
+    return {
+      ...this.stats,
+      entries: this.entries.size,
+      hitRate: `${hitRate}%`,
+    }
+  }
+
+  private maybeSave(): void {
+    if (this.updatesSinceSave >= SAVE_EVERY_UPDATES || Date.now() - this.lastSave > SAVE_INTERVAL_MS) {
+      this.save()
+    }
+  }
+
+  /**
+   * Merge with the on-disk copy (newest entry wins) + atomic write
+   */
+  save(): void {
+    if (!this.dirty) return
+
+    try {
+      const onDisk = this.readFile()
+      for (const [key, entry] of onDisk) {
+        const mine = this.entries.get(key)
+        if (!mine || entry.updatedAt > mine.updatedAt) {
+          this.entries.set(key, entry)
+        }
+      }
+
+      const tmpPath = `${this.filePath}.${process.pid}.tmp`
+      fs.writeFileSync(tmpPath, JSON.stringify(Object.fromEntries(this.entries)))
+      fs.renameSync(tmpPath, this.filePath)
+
+      this.dirty = false
+      this.updatesSinceSave = 0
+      this.lastSave = Date.now()
+    } catch (error) {
+      console.error('[EscalationCache] ⚠️ Save failed:', error)
+    }
+  }
+
+  private readFile(): Map<string, EscalationEntry> {
+    const entries = new Map<string, EscalationEntry>()
+    if (!fs.existsSync(this.filePath)) return entries
+
+    try {
+      const raw = JSON.parse(fs.readFileSync(this.filePath, 'utf8')) as Record<string, EscalationEntry>
+      const cutoff = Date.now() - MAX_AGE_MS
+      for (const [key, entry] of Object.entries(raw)) {
+        if (entry && entry.updatedAt > cutoff) {
+          entries.set(key, entry)
+        }
+      }
+    } catch (error) {
+      console.error('[EscalationCache] ⚠️ Could not read cache file:', error)
+    }
+    return entries
+  }
+}
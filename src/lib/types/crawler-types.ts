@@ -15,6 +15,35 @@ export interface NetworkRequest {
   timestamp?: number // Optional for compatibility
   resourceType?: string
   status?: number // Optional status code for compatibility
+  responseHeaders?: Record<string, string> // API / script / document responses (Python crawler)
+  durationMs?: number // Request start → response end (Python crawler)
+  failure?: string // Failed / blocked request (Python crawler)
+}
+
+/**
+ * Inline script fingerprint (CSP source expression, Python crawler)
+ */
+export interface InlineScript {
+  hash: string | null // 'sha256-<base64>' (null above the size cap)
+  type: string
+  length: number
+}
+
+/**
+ * <a> / <link> element pre-extracted by the Python crawler
+ */
+export interface PageLink {
+  tag: 'a' | 'link'
+  href: string // Absolute URL
+  rel: string
+}
+
+/**
+ * <meta> tag pre-extracted by the Python crawler (name = name | property | http-equiv | 'charset')
+ */
+export interface MetaTag {
+  name: string
+  content: string
 }
 
 /**
@@ -81,6 +110,9 @@ export interface CrawlerResult {
   // Mock crawler compatibility fields
   networkRequests?: NetworkRequest[] // Alias for requests (from mock crawler)
   scripts?: string[] // Script URLs/content (from mock crawler)
+  inlineScripts?: InlineScript[] // Inline script hashes (from Python crawler)
+  links?: PageLink[] // Link elements (from Python crawler)
+  metaTags?: MetaTag[] // Meta tags (from Python crawler)
   domain?: string // Domain name (from mock crawler)
   responseHeaders?: Record<string, string> // Response headers (from mock crawler)
 
@@ -102,6 +134,8 @@ export interface CrawlerResult {
   timestamp?: Date // Optional for compatibility
   error?: string
   userAgent?: string // Optional for compatibility
+  crawlTier?: 'http' | 'browser' // Python orchestrator tier that produced the result
+  escalationReason?: string // Why the HTTP tier handed the page to the browser
   metadata?: {
     certificate?: any
     [key: string]: any
@@ -43,6 +43,7 @@ import { analyzeFrontendFramework } from './analyzers/frontend-framework-securit
 import { analyzePassiveAPIDiscovery } from './analyzers/passive-api-discovery-analyzer' // ⭐ NEW: Passive API discovery
 import { calculateSecurityScore } from './scoring-v3' // ✨ NEW: Professional scoring system v3 (100 = perfect)
 import { generateReport } from './report-generator'
+import { serveScans } from './serve'
 
 // Initialize worker manager
 const workerManager = WorkerManager.getInstance()
@@ -1149,5 +1150,10 @@ async function runSingleJob() {
   process.exit(0)
 }
 
-// Start single-job worker
-runSingleJob()
+if (process.argv.includes('--serve')) {
+  // Persistent worker: scans arrive as stdin frames (Python AnalysisWorkerPool)
+  serveScans(processScanJob, 'index-sqlite')
+} else {
+  // Start single-job worker
+  runSingleJob()
+}
@@ -2,6 +2,7 @@ import { prisma } from '../lib/db'
 import { scanQueue, ScanJobData } from '../lib/queue-mock'
 import { MockCrawler } from './crawler-mock'
 import { CrawlerAdapter } from '../lib/crawler-adapter'
+import type { CrawlerResult } from '../lib/types/crawler-types'
 import { analyzeAIDetection } from './analyzers/ai-detection'
 import { analyzeSecurityHeaders } from './analyzers/security-headers'
 import { analyzeClientRisks } from './analyzers/client-risks'
@@ -11,6 +12,7 @@ import { analyzeJSLibraries } from './analyzers/js-libraries-analyzer'
 import { analyzeAiTrust } from './analyzers/ai-trust-analyzer'
 import { calculateRiskScore } from './scoring'
 import { generateReport } from './report-generator'
+import { serveScans } from './serve'
 
 // Choose crawler based on environment variable
 const USE_REAL_CRAWLER = process.env.USE_REAL_CRAWLER === 'true'
@@ -18,44 +20,63 @@ const crawler = USE_REAL_CRAWLER ? new CrawlerAdapter() : new MockCrawler()
 
 console.log(`[Worker] Using ${USE_REAL_CRAWLER ? 'REAL Playwright' : 'MOCK'} crawler`)
 
-async function processScan(data: ScanJobData) {
-  const { scanId, url } = data
+// Scan row → SCANNING, then metadata.crawl_result (if a crawler stored one) or a fresh crawl
+async function loadOrCrawl(scanId: string, url: string): Promise<CrawlerResult> {
+  // Fetch scan to check if crawl_result already exists (TURBO v5 hybrid)
+  const scan = await prisma.scan.findUnique({
+    where: { id: scanId }
+  })
 
-  console.log(`[Worker] Processing scan ${scanId} for ${url}`)
+  if (!scan) {
+    throw new Error('Scan not found')
+  }
 
-  try {
-    // Fetch scan to check if crawl_result already exists (TURBO v5 hybrid)
-    const scan = await prisma.scan.findUnique({
-      where: { id: scanId }
+  // Update status to scanning (if not already)
+  if (scan.status !== 'SCANNING') {
+    await prisma.scan.update({
+      where: { id: scanId },
+      data: {
+        status: 'SCANNING',
+        startedAt: new Date(),
+      },
     })
+  }
 
-    if (!scan) {
-      throw new Error('Scan not found')
-    }
+  if (scan.metadata && typeof scan.metadata === 'object' && 'crawl_result' in scan.metadata) {
+    const storedResult = (scan.metadata as any).crawl_result
 
-    // Update status to scanning (if not already)
-    if (scan.status !== 'SCANNING') {
-      await prisma.scan.update({
-        where: { id: scanId },
-        data: {
-          status: 'SCANNING',
-          startedAt: new Date(),
-        },
-      })
+    // Older TURBO rows keep only an htmlRef into the removed HTML store → no page to analyze, crawl again
+    if (storedResult.htmlRef && !storedResult.html) {
+      console.log(`[Worker] Pre-crawled data has no inline HTML (htmlRef ${storedResult.htmlRef}), re-crawling`)
+    } else {
+      // TURBO v5: Use pre-crawled data (FAST PATH!)
+      console.log(`[Worker] Using pre-crawled data from TURBO scanner (FAST!)`)
+      return storedResult
     }
+  }
+
+  // Standard path: Crawl now
+  console.log(`[Worker] Crawling ${url}...`)
+  const crawlResult = await crawler.crawl(url)
+  console.log(`[Worker] Crawl completed in ${crawlResult.loadTime}ms`)
+  return crawlResult
+}
+
+async function processScan(data: ScanJobData & { crawlResult?: CrawlerResult }) {
+  const { scanId, url } = data
+
+  console.log(`[Worker] Processing scan ${scanId} for ${url}`)
 
+  try {
     // Step 1: Crawl the website (OR use pre-crawled data from TURBO scanner)
     let crawlResult
 
-    if (scan.metadata && typeof scan.metadata === 'object' && 'crawl_result' in scan.metadata) {
-      // TURBO v5: Use pre-crawled data (FAST PATH!)
-      console.log(`[Worker] Using pre-crawled data from TURBO scanner (FAST!)`)
-      crawlResult = (scan.metadata as any).crawl_result
+    if (data.crawlResult) {
+      // TURBO: crawl result handed over in the --serve frame (no metadata read, status already SCANNING)
+      console.log(`[Worker] Using handed-over crawl data from TURBO scanner (FAST!)`)
+      crawlResult = data.crawlResult
     } else {
-      // Standard path: Crawl now
-      console.log(`[Worker] Crawling ${url}...`)
-      crawlResult = await crawler.crawl(url)
-      console.log(`[Worker] Crawl completed in ${crawlResult.loadTime}ms`)
+      crawlResult = await loadOrCrawl(scanId, url)
     }
 
     // Step 2: Run all analyzers
@@ -219,7 +240,10 @@ async function processScan(data: ScanJobData) {
 const args = process.argv.slice(2)
 const scanIdArgIndex = args.indexOf('--scan-id')
 
-if (scanIdArgIndex !== -1 && args[scanIdArgIndex + 1]) {
+if (args.includes('--serve')) {
+  // SERVE MODE: persistent worker, scans arrive as stdin frames (Python AnalysisWorkerPool)
+  serveScans(processScan, 'index')
+} else if (scanIdArgIndex !== -1 && args[scanIdArgIndex + 1]) {
   // CLI MODE: Process single scan directly (for TURBO scanner)
   const scanId = args[scanIdArgIndex + 1]
   const urlArgIndex = args.indexOf('--url')
@@ -0,0 +1,86 @@
+/**
+ * Persistent Worker Mode (--serve)
+ *
+ * The Python orchestrator (scripts/analysis_worker_pool.py) keeps N of these
+ * processes alive instead of spawning `npx tsx` per scan (npx resolution,
+ * tsx transpilation and 40+ analyzer imports on every scan).
+ *
+ * Protocol: one JSON frame per line.
+ *   startup   → {"type": "ready", "pid": 123, "worker": "index", "rssMb": 180}
+ *   stdin     ← {"id": "7", "scanId": "...", "url": "https://...", "crawlResult": {...}}
+ *   stdout    → {"id": "7", "ok": true, "durationMs": 812, "rssMb": 310}
+ *             → {"id": "7", "ok": false, "error": "...", "durationMs": 95, "rssMb": 305}
+ *
+ * crawlResult (optional) is the Python crawler's result, HTML included - handed
+ * over here instead of a Scan.metadata write + read, the DB only sees the final
+ * results.
+ *
+ * Scans run one at a time, in arrival order. stdout carries ONLY frames -
+ * console output goes to stderr. stdin closed → finish the current scan, exit.
+ */
+
+import * as readline from 'readline'
+import type { CrawlerResult } from '../lib/types/crawler-types'
+
+export type ScanProcessor = (data: { scanId: string; url: string; crawlResult?: CrawlerResult }) => Promise<unknown>
+
+interface ScanRequest {
+  id: string
+  scanId: string
+  url: string
+  crawlResult?: CrawlerResult
+}
+
+function writeFrame(frame: Record<string, unknown>): void {
+  process.stdout.write(JSON.stringify(frame) + '\n')
+}
+
+function rssMb(): number {
+  return Math.round(process.memoryUsage().rss / (1024 * 1024))
+}
+
+export function serveScans(processScan: ScanProcessor, worker: string): void {
+  // The protocol owns stdout
+  console.log = console.error
+  console.info = console.error
+  console.warn = console.error
+  console.debug = console.error
+
+  let queue: Promise<void> = Promise.resolve()
+
+  const input = readline.createInterface({ input: process.stdin, terminal: false })
+
+  input.on('line', (line) => {
+    if (!line.trim()) return
+
+    let request: ScanRequest
+    try {
+      request = JSON.parse(line)
+    } catch {
+      writeFrame({ ok: false, error: 'Invalid frame' })
+      return
+    }
+
+    queue = queue.then(async () => {
+      const startedAt = Date.now()
+      try {
+        await processScan({ scanId: request.scanId, url: request.url, crawlResult: request.crawlResult })
+        writeFrame({ id: request.id, ok: true, durationMs: Date.now() - startedAt, rssMb: rssMb() })
+      } catch (error) {
+        writeFrame({
+          id: request.id,
+          ok: false,
+          error: error instanceof Error ? error.message : String(error),
+          durationMs: Date.now() - startedAt,
+          rssMb: rssMb(),
+        })
+      }
+    })
+  })
+
+  input.on('close', () => {
+    queue.then(() => process.exit(0))
+  })
+
+  writeFrame({ type: 'ready', pid: process.pid, worker, rssMb: rssMb() })
+}